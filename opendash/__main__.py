@@ -1,11 +1,11 @@
 #!python
 
 import argparse
-from opendash import bundle
+from opendash import bundle, deploy, loadtest, manifest, serve, workspace
 import os
 import sys
 
-from opendash.config import Config
+from opendash.config import Config, Workspace
 
 
 parser = argparse.ArgumentParser(description='Bundles Dash assets for deployment on AWS.')
@@ -16,29 +16,233 @@ bundle_parser.add_argument(
   '--config-path',
   '-c',
   type=str,
+  action='append',
   required=False,
-  help='Path to the open-dash.config.json configuration file.'
+  help='Path to the open-dash.config.json configuration file. Repeat to bundle several apps.'
+)
+bundle_parser.add_argument(
+  '--workspace',
+  '-w',
+  type=str,
+  required=False,
+  help='Path to an open-dash.workspace.json file that lists the configuration files of several apps.'
+)
+bundle_parser.add_argument('--workers', type=int, required=False, help='The number of apps to bundle concurrently.')
+bundle_parser.add_argument('--pip-workers', type=int, required=False, help='The number of concurrent pip installs.')
+bundle_parser.add_argument(
+  '--pip-cache-dir',
+  type=str,
+  required=False,
+  help='A pip cache directory shared by the apps. Defaults to a temporary directory shared for the run.'
+)
+
+diff_parser = subparsers.add_parser(
+  'diff',
+  help='Compare two open-dash.output.json files and list changed keys and CloudFront invalidation paths.'
+)
+diff_parser.add_argument('old', type=str, help='Path to the previous open-dash.output.json file or .open-dash directory.')
+diff_parser.add_argument('new', type=str, help='Path to the new open-dash.output.json file or .open-dash directory.')
+
+deploy_parser = subparsers.add_parser('deploy', help='Upload the static origin of a bundle to an S3 bucket.')
+deploy_parser.add_argument('--bucket', '-b', type=str, required=True, help='The name of the target S3 bucket.')
+deploy_parser.add_argument(
+  '--output-path',
+  '-o',
+  type=str,
+  required=False,
+  help='Path to the open-dash.output.json file or .open-dash directory. Defaults to the configured target base path.'
+)
+deploy_parser.add_argument(
+  '--config-path',
+  '-c',
+  type=str,
+  required=False,
+  help='Path to the open-dash.config.json configuration file. Used to locate the output if --output-path is not set.'
+)
+deploy_parser.add_argument('--prefix', type=str, default='', help='A folder to upload every object under, e.g. site.')
+deploy_parser.add_argument('--endpoint-url', type=str, required=False, help='The URL of an S3-compatible endpoint.')
+deploy_parser.add_argument('--concurrency', type=int, default=8, help='The maximum number of concurrent uploads.')
+deploy_parser.add_argument('--dry-run', action='store_true', help='List the objects to upload without uploading.')
+
+serve_parser = subparsers.add_parser('serve', help='Serve a bundle locally the way its CloudFront distribution would.')
+serve_parser.add_argument(
+  '--output-path',
+  '-o',
+  type=str,
+  required=False,
+  help='Path to the open-dash.output.json file or .open-dash directory. Defaults to the configured target base path.'
+)
+serve_parser.add_argument(
+  '--config-path',
+  '-c',
+  type=str,
+  required=False,
+  help='Path to the open-dash.config.json configuration file. Used to locate the output if --output-path is not set.'
+)
+serve_parser.add_argument('--host', type=str, default='127.0.0.1', help='The interface to listen on.')
+serve_parser.add_argument('--port', '-p', type=int, default=8000, help='The port to listen on.')
+serve_parser.add_argument(
+  '--domain-name',
+  type=str,
+  required=False,
+  help='The DOMAIN_NAME the server function sees. Defaults to the host and port.'
+)
+serve_parser.add_argument(
+  '--record',
+  type=str,
+  required=False,
+  help='Append every POST request to this file as a JSON line, to replay with open-dash loadtest.'
 )
 
+loadtest_parser = subparsers.add_parser(
+  'loadtest',
+  help='Replay page navigations and recorded requests against a bundle and report latency per route.'
+)
+loadtest_parser.add_argument(
+  '--output-path',
+  '-o',
+  type=str,
+  required=False,
+  help='Path to the open-dash.output.json file or .open-dash directory. Defaults to the configured target base path.'
+)
+loadtest_parser.add_argument(
+  '--config-path',
+  '-c',
+  type=str,
+  required=False,
+  help='Path to the open-dash.config.json configuration file. Used to locate the output if --output-path is not set.'
+)
+loadtest_parser.add_argument(
+  '--recording',
+  '-r',
+  type=str,
+  action='append',
+  required=False,
+  help='A file of requests recorded with open-dash serve --record. Repeat to replay several recordings.'
+)
+loadtest_parser.add_argument(
+  '--no-navigations',
+  action='store_true',
+  help='Leave the page navigations built from the page registry out of the workload.'
+)
+loadtest_parser.add_argument('--concurrency', type=int, default=4, help='The number of requests in flight at once.')
+loadtest_parser.add_argument(
+  '--count',
+  '-n',
+  type=int,
+  required=False,
+  help='The number of requests to send. The workload repeats until then. Defaults to one pass over the workload.'
+)
+loadtest_parser.add_argument(
+  '--duration',
+  '-d',
+  type=float,
+  required=False,
+  help='Repeat the workload for this many seconds instead of a number of requests.'
+)
+loadtest_parser.add_argument('--domain-name', type=str, default='localhost', help='The DOMAIN_NAME the function sees.')
+loadtest_parser.add_argument('--report', type=str, required=False, help='Write the report as JSON to this file.')
+
 
 def main():
   args = parser.parse_args()
 
   if args.command == 'bundle':
-    config = Config.from_path(args.config_path)
+    run = Workspace.from_path(args.workspace) if args.workspace else Workspace(config_paths=[])
+    run.config_paths.extend(args.config_path or [])
+    run.workers = args.workers or run.workers
+    run.pip_workers = args.pip_workers or run.pip_workers
+    run.pip_cache_dir = args.pip_cache_dir or run.pip_cache_dir
 
-    if not os.path.exists(os.path.join(config.source_path, 'app.py')):
-      print(f'Error: Source directory {config.source_path} does not contain an app.py file.')
-      sys.exit(1)
+    configs = [Config.from_path(config_path) for config_path in run.config_paths or [None]]
+    for config in configs:
+      if not os.path.exists(os.path.join(config.source_path, 'app.py')):
+        print(f'Error: Source directory {config.source_path} does not contain an app.py file.')
+        sys.exit(1)
+
+      if not os.path.exists(os.path.join(config.source_path, 'requirements.txt')):
+        print(f'Error: Source directory {config.source_path} does not contain a requirements.txt file.')
+        sys.exit(1)
 
-    if not os.path.exists(os.path.join(config.source_path, 'requirements.txt')):
-      print(f'Error: Source directory {config.source_path} does not contain a requirements.txt file.')
+    target_paths = [os.path.abspath(config.target_base_path) for config in configs]
+    if len(set(target_paths)) != len(target_paths):
+      print('Error: Each app needs its own target-base-path, because each app writes a .open-dash directory there.')
       sys.exit(1)
-    
-    bundle.create(config)
+
+    if len(configs) == 1:
+      bundle.create(configs[0], pip_cache_dir=run.pip_cache_dir)
+    else:
+      result = workspace.bundle_all(run)
+      print(result.summary())
+      if not result.succeeded:
+        sys.exit(1)
 
     print('Bundle complete.')
   
+  if args.command == 'deploy':
+    output_path = args.output_path
+    if not output_path:
+      output_path = os.path.join(Config.from_path(args.config_path).target_base_path, '.open-dash')
+
+    if not os.path.exists(output_path):
+      print(f'Error: {output_path} does not exist. Run open-dash bundle first.')
+      sys.exit(1)
+
+    result = deploy.deploy(
+      output_path,
+      bucket=args.bucket,
+      prefix=args.prefix,
+      dry_run=args.dry_run,
+      endpoint_url=args.endpoint_url,
+      concurrency=args.concurrency,
+    )
+    for key in result.would_upload:
+      print(f'Would upload {key}')
+    print(result.summary())
+
+  if args.command == 'serve':
+    output_path = args.output_path
+    if not output_path:
+      output_path = os.path.join(Config.from_path(args.config_path).target_base_path, '.open-dash')
+
+    if not os.path.exists(output_path):
+      print(f'Error: {output_path} does not exist. Run open-dash bundle first.')
+      sys.exit(1)
+
+    serve.serve(output_path, host=args.host, port=args.port, domain_name=args.domain_name, record_path=args.record)
+
+  if args.command == 'loadtest':
+    output_path = args.output_path
+    if not output_path:
+      output_path = os.path.join(Config.from_path(args.config_path).target_base_path, '.open-dash')
+
+    for path in [output_path, *(args.recording or [])]:
+      if not os.path.exists(path):
+        print(f'Error: {path} does not exist.')
+        sys.exit(1)
+
+    result = loadtest.load_test(
+      output_path,
+      recordings=args.recording,
+      navigations=not args.no_navigations,
+      concurrency=args.concurrency,
+      count=args.count,
+      duration=args.duration,
+      domain_name=args.domain_name,
+    )
+    print(result.summary())
+    if args.report:
+      with open(args.report, 'w') as f:
+        f.write(result.to_json())
+
+  if args.command == 'diff':
+    for path in [args.old, args.new]:
+      if not os.path.exists(path):
+        print(f'Error: {path} does not exist.')
+        sys.exit(1)
+
+    print(manifest.diff(manifest.Manifest.from_path(args.old), manifest.Manifest.from_path(args.new)).to_json())
+
   sys.exit(0)
 
 if __name__ == '__main__':
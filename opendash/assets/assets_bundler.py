@@ -6,16 +6,43 @@ script to create the OpenDash output. It statically extracts JavaScript dependen
 Flask test client to make requests to the Dash server for the layout and dependencies of each page.
 """
 from dash import _dash_renderer, Dash, dash_table, dcc, fingerprint, html, page_registry
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
 from flask.testing import FlaskClient
+import copy
+import hashlib
 import importlib
+import itertools
+import json
+import mimetypes
 import os
+import re
 import shutil
+import subprocess
 import sys
 import time
-
-from open_dash_output import CloudFrontBehavior, CloudFrontConfig, FunctionOrigin, MiscBundle, OpenDashOutput, S3Origin, S3OriginCopy
+from typing import Callable, Iterator
+from urllib.parse import urlparse
+import urllib.request
+
+import open_dash_callbacks
+import open_dash_html
+import open_dash_images
+import open_dash_prerender
+import open_dash_typed_arrays
+from open_dash_output import (
+  CachePolicy,
+  CloudFrontBehavior,
+  CloudFrontConfig,
+  FunctionOrigin,
+  ImageVariant,
+  MiscBundle,
+  OpenDashOutput,
+  S3Object,
+  S3Origin,
+  S3OriginCopy,
+)
+from open_dash_stages import Stage, run_stages
 
 # The create_app function should return a Dash instance.
 from app import create_app
@@ -24,6 +51,22 @@ from app import create_app
 app = create_app()
 global_fingerprint = int(time.time())
 
+# Trace types in each official plotly.js partial bundle, ordered by approximate minified size.
+PLOTLY_PARTIAL_BUNDLES = {
+  'basic': {'bar', 'pie', 'scatter'},
+  'finance': {
+    'bar', 'candlestick', 'funnel', 'funnelarea', 'histogram', 'indicator', 'ohlc', 'pie', 'scatter', 'waterfall',
+  },
+  'geo': {'choropleth', 'scatter', 'scattergeo'},
+  'cartesian': {
+    'bar', 'box', 'contour', 'heatmap', 'histogram', 'histogram2d', 'histogram2dcontour', 'image', 'pie', 'scatter',
+    'scatterternary', 'violin',
+  },
+  'mapbox': {'choroplethmapbox', 'densitymapbox', 'scatter', 'scattermapbox'},
+  'gl3d': {'cone', 'isosurface', 'mesh3d', 'scatter', 'scatter3d', 'streamtube', 'surface', 'volume'},
+  'gl2d': {'contourgl', 'heatmapgl', 'parcoords', 'pointcloud', 'scatter', 'scattergl', 'splom'},
+}
+
 
 @dataclass(kw_only=True)
 class PackagePaths:
@@ -58,6 +101,23 @@ class BundlerUtils:
         shutil.copy2(source_file, target_file)
 
 
+  @staticmethod
+  def copy_files(copies: list[tuple[str, str]]) -> None:
+    for source, target in copies:
+      os.makedirs(os.path.dirname(target), exist_ok=True)
+      shutil.copy2(source, target)
+
+
+  @staticmethod
+  def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+      for chunk in iter(lambda: f.read(1024 * 1024), b''):
+        digest.update(chunk)
+
+    return digest.hexdigest()
+
+
   @staticmethod
   def asset_file_name(version: str | None, dependency_path: str, source_path: str) -> str:
     timestamp = None
@@ -99,6 +159,15 @@ class DependencyLookup:
     os.path.join('dash', 'dash_table', ''),
   ]
 
+  # The namespaces that components of Dash's own libraries carry in layouts. Third-party libraries use their package
+  # name. Plotly.js is only used by dcc.Graph, so it is kept or pruned along with dcc.
+  component_namespaces = {
+    'dash.dcc': 'dash_core_components',
+    'dash.html': 'dash_html_components',
+    'dash.dash_table': 'dash_table',
+    'plotly': 'dash_core_components',
+  }
+
 
   def __init__(self, app: Dash):
     self.__app = app
@@ -120,6 +189,17 @@ class DependencyLookup:
     return None
 
 
+  def component_namespace(self, namespace: str) -> str | None:
+    """
+    Returns the layout namespace of the components a package provides, or None for the Dash renderer and its
+    dependencies, which every app needs.
+    """
+    if namespace == 'dash':
+      return None
+    
+    return self.component_namespaces.get(namespace, namespace)
+
+
   def get_internal_dependencies(self) -> list[PackagePaths]:
     """
     In the best case scenario, this particular function would live in the Dash repository and publicly accessible to 3P
@@ -221,9 +301,23 @@ class DashAssetsBundler:
     self.__open_dash_path = os.path.abspath(os.path.join(self.__static_path, '..'))
 
     self.__default_root_object = None
+    self.__early_hints: list[str] = []
+    self.__script_bundles: dict[tuple[str, ...], str] = {}
+    self.__pruned_paths: set[str] = set()
+    self.__swapped_paths: set[str] = set()
+    self.__inlined_endpoints: set[str] = set()
+    self.__exported_pages: dict[str, str] = {}
+    self.__static_callback_hashes: list[str] = []
+    self.__static_callback_outputs: set[str] = set()
+    self.__used_namespaces: set[str] | None = None
+    self.__responses: dict[tuple[str, str, str], tuple[int, bytes]] = {}
+    self.__typed_arrays = json.loads(os.environ['OPEN_DASH_EXPORT_TYPED_ARRAYS'])
+    self.__typed_array_savings = 0
     self.__dependency_lookup = DependencyLookup(app)
     self.__additional_bundles: dict[str, MiscBundle] = {}
     self.__cloud_front_behaviors: list[CloudFrontBehavior] = []
+    self.__page_document_behaviors: list[CloudFrontBehavior] = []
+    self.__cache_policies = self.__create_cache_policies(json.loads(os.environ['OPEN_DASH_CACHE_CONTROL']))
 
     origin_path_prefix = self.__app.config.get('url_base_pathname') or '/'
     if origin_path_prefix.startswith('/'):
@@ -246,13 +340,61 @@ class DashAssetsBundler:
 
 
   def bundle_assets(self) -> None:
+    if os.environ['OPEN_DASH_STATIC_ONLY'] == '1':
+      self.__check_static_only()
+
     # Create the static directory with the base URL, if it does not exist.
     os.makedirs(self.__static_path, exist_ok=True)
 
-    self.__export_js_dependencies()
+    if self.__typed_arrays['enabled']:
+      reason = open_dash_typed_arrays.unsupported_reason()
+      if reason:
+        print(f'Warning: Exported payloads are not encoded as typed arrays: {reason}.')
+        self.__typed_arrays['enabled'] = False
+
+    prune_components = json.loads(os.environ['OPEN_DASH_PRUNE_COMPONENTS'])
+    if prune_components['enabled']:
+      self.__used_namespaces = self.__collect_component_namespaces(prune_components['keep'])
+
+    # Everything that renders the app runs before the stages or in the pages stage, which stays on this thread with
+    # the Flask test client. The other stages copy and write files.
+    suite_copies = self.__export_js_dependencies()
+    stages = [Stage(name='suites', run=lambda: BundlerUtils.copy_files(suite_copies))]
+
+    plotly_bundle = json.loads(os.environ['OPEN_DASH_PLOTLY_BUNDLE'])
+    if plotly_bundle['enabled']:
+      swap = self.__plotly_bundle_swap(plotly_bundle)
+      if swap:
+        stages.append(Stage(name='plotly-bundle', run=swap, after=['suites']))
+
+    if 'OPEN_DASH_ASSETS_PATH' in os.environ:
+      stages.append(Stage(name='app-assets', run=self.__copy_assets_path))
+
+      optimize_images = json.loads(os.environ['OPEN_DASH_OPTIMIZE_IMAGES'])
+      if optimize_images['enabled']:
+        stages.append(Stage(
+          name='images',
+          run=lambda: self.__optimize_images(optimize_images),
+          after=['app-assets'],
+        ))
 
     if os.environ['OPEN_DASH_EXPORT_STATIC'] == '1':
-      self.__export_static_pages()
+      # Script bundles concatenate the exported suites, in their final form.
+      after = [stage.name for stage in stages if stage.name in ['suites', 'plotly-bundle']]
+      stages.append(Stage(
+        name='pages',
+        run=self.__export_static_pages,
+        main_thread=True,
+        after=after if os.environ['OPEN_DASH_BUNDLE_SCRIPTS'] == '1' else [],
+      ))
+
+    workers = int(os.environ.get('OPEN_DASH_BUILD_WORKERS', '1'))
+    timings = run_stages(stages, max_workers=workers, group='assets-bundler')
+    if self.__typed_array_savings:
+      print(f'Typed arrays made the exported payloads {self.__typed_array_savings} bytes smaller')
+    if 'OPEN_DASH_TIMELINE_PATH' in os.environ:
+      with open(os.environ['OPEN_DASH_TIMELINE_PATH'], 'w') as f:
+        json.dump([asdict(timing) for timing in timings], f)
     
     if 'OPEN_DASH_WARMER_FUNCTION_PATH' in os.environ:
       # The warmer function was already copied to the server functions directory so we just need to add it to the
@@ -263,14 +405,11 @@ class DashAssetsBundler:
       )
 
     if 'OPEN_DASH_ASSETS_PATH' in os.environ:
-      self.__copy_assets_path()
+      self.__add_assets_path_behavior()
     
     if 'OPEN_DASH_SOURCE_DATA_PATH' in os.environ:
-      BundlerUtils.copy_directory_contents(
-        os.environ['OPEN_DASH_SOURCE_DATA_PATH'],
-        os.path.join(self.__open_dash_path, 'data'),
-        []
-      )
+      # The data directory is copied by bundle.create while the app's dependencies are installed.
+      self.__write_data_manifest(os.path.join(self.__open_dash_path, 'data'))
 
       self.__additional_bundles['dataPath'] = MiscBundle(
         bundle=os.path.join('.open-dash', 'data'),
@@ -279,23 +418,126 @@ class DashAssetsBundler:
     self.__serialize_output_to_json()
   
   
-  def __serialize_output_to_json(self) -> None:
-    self.__origins['default'] = FunctionOrigin(
-      handler='index.handler',
-      dockerfile='Dockerfile',
-      bundle=os.path.join('.open-dash', os.environ['OPEN_DASH_SERVER_FUNCTIONS_PATH'].split('.open-dash/')[-1]),
+  """
+  Static-only bundles have no server function to fall back to, so every page must be exported. Pages with path
+  variables cannot be.
+  """
+  def __check_static_only(self) -> None:
+    templated_pages = [page.get('path_template') for page in page_registry.values() if page.get('path_template')]
+    if templated_pages:
+      print(f"Error: Pages with path variables need the server function: {', '.join(templated_pages)}")
+      print('Bundle the app without static-only, or give these pages static paths.')
+      sys.exit(1)
+
+
+  """
+  Callbacks other than Dash Pages routing fail in a static-only bundle unless their initial calls were exported as
+  static callbacks. Even then, later calls fail, so apps that only need the initial calls must opt in to them.
+  """
+  def __check_static_only_callbacks(self) -> None:
+    # Callbacks registered with dash.callback only join the app's list when it serves its first request.
+    url_base = self.__app.config.get('url_base_pathname') or '/'
+    _, dependencies = self.__request(url=f'{url_base}_dash-dependencies', method=RequestMethod.GET, params={})
+    server_callbacks = [
+      callback['output'] for callback in json.loads(dependencies)
+      if not callback.get('clientside_function') and '_pages_content.children' not in callback['output']
+      and callback['output'] not in self.__static_callback_outputs
+    ]
+    if not server_callbacks:
+      return
+
+    if os.environ['OPEN_DASH_ALLOW_SERVER_CALLBACKS'] == '1':
+      print(
+        'Warning: These callbacks run on the server, which static-only bundles do not have. Requests for them will '
+        f"fail: {', '.join(server_callbacks)}"
+      )
+      return
+
+    print(
+      'Error: These callbacks run on the server, which static-only bundles do not have, and were not exported as '
+      f"static callbacks: {', '.join(server_callbacks)}"
     )
-    self.__cloud_front_behaviors.append(CloudFrontBehavior(
-      origin='default',
-      pattern='*',
-    ))
+    print(
+      'List them in static-callbacks, bundle the app without static-only, or enable allow-server-callbacks to deploy '
+      'it with callbacks that fail.'
+    )
+    sys.exit(1)
+
+
+  """
+  CloudFront limits the number of cache behaviors per distribution, 25 unless the quota was raised. The default
+  behavior, *, is not counted.
+  """
+  def __check_behavior_quota(self) -> None:
+    quota = int(os.environ['OPEN_DASH_CLOUD_FRONT_BEHAVIOR_QUOTA'])
+    if len(self.__cloud_front_behaviors) > quota:
+      patterns = ', '.join(behavior.pattern for behavior in self.__cloud_front_behaviors)
+      print(
+        f'Error: The distribution needs {len(self.__cloud_front_behaviors)} cache behaviors, more than the CloudFront '
+        f'quota of {quota}: {patterns}. Request a quota increase and set cloud-front-behavior-quota to it.'
+      )
+      sys.exit(1)
+
+
+  """
+  Route the exported page documents to S3. Each page needs a behavior of its own, so the documents that do not fit in
+  the behavior quota are left to the server function, which renders the same pages.
+  """
+  def __add_page_document_behaviors(self) -> None:
+    available = int(os.environ['OPEN_DASH_CLOUD_FRONT_BEHAVIOR_QUOTA']) - len(self.__cloud_front_behaviors)
+    self.__cloud_front_behaviors.extend(self.__page_document_behaviors[:available])
+
+    skipped = [behavior.pattern for behavior in self.__page_document_behaviors[available:]]
+    if skipped:
+      print(
+        f'Warning: The CloudFront behavior quota leaves no room for {len(skipped)} page documents, which the server '
+        f"function serves instead: {', '.join(skipped)}. Raise cloud-front-behavior-quota to serve them from S3."
+      )
+
+
+  def __serialize_output_to_json(self) -> None:
+    if os.environ['OPEN_DASH_SERVICE_WORKER'] == '1' and self.__default_root_object:
+      self.__write_service_worker()
+
+    if os.environ['OPEN_DASH_STATIC_ONLY'] == '1':
+      # CloudFront needs a default behavior. Without a server function, it is the bucket, which denies unknown keys and
+      # serves the page documents without behaviors of their own.
+      self.__check_behavior_quota()
+      self.__cloud_front_behaviors.append(CloudFrontBehavior(
+        origin='s3',
+        pattern='*',
+        cache_policy='document',
+      ))
+    else:
+      self.__origins['default'] = FunctionOrigin(
+        handler='index.handler',
+        dockerfile='Dockerfile',
+        bundle=os.path.join('.open-dash', os.environ['OPEN_DASH_SERVER_FUNCTIONS_PATH'].split('.open-dash/')[-1]),
+      )
+      self.__check_behavior_quota()
+      self.__add_page_document_behaviors()
+      self.__cloud_front_behaviors.append(CloudFrontBehavior(
+        origin='default',
+        pattern='*',
+        cache_policy='function',
+      ))
+
+      if self.__background_callbacks():
+        # The server function queues background callbacks for a worker function deployed from the same bundle.
+        self.__additional_bundles['backgroundWorker'] = MiscBundle(
+          handler='index.worker_handler',
+          bundle=self.__origins['default'].bundle,
+        )
+    self.__origins['s3'].objects = self.__collect_s3_objects()
 
     output = OpenDashOutput(
+      early_hints=self.__early_hints,
       additional_bundles=self.__additional_bundles,
       global_fingerprint=global_fingerprint if os.environ['OPEN_DASH_FINGERPRINT_METHOD'] == 'global' else None,
       cloud_front_config=CloudFrontConfig(
         origins=self.__origins,
         behaviors=self.__cloud_front_behaviors,
+        cache_policies=self.__cache_policies,
         default_root_object=self.__default_root_object,
       ),
     )
@@ -304,22 +546,192 @@ class DashAssetsBundler:
       f.write(output.to_json())
 
 
+  """
+  Returns the outputs of the callbacks declared with background=True.
+  """
+  def __background_callbacks(self) -> list[str]:
+    url_base = self.__app.config.get('url_base_pathname') or '/'
+    status_code, dependencies = self.__request(url=f'{url_base}_dash-dependencies', method=RequestMethod.GET, params={})
+    if status_code != 200:
+      return []
+
+    return [
+      callback['output'] for callback in json.loads(dependencies)
+      # Dash 2 marks background callbacks with "long" and Dash 3 with "background".
+      if callback.get('long') or callback.get('background')
+    ]
+
+
+  """
+  Fingerprinted objects never change under the same key, so they are cached for as long as possible. Entry documents
+  are revalidated by browsers and only briefly cached at the edge because deployments change them in place. Object
+  Cache-Control metadata takes precedence over a behavior's default TTL, within the behavior's min and max TTLs, which
+  lets the unfingerprinted copies of async suites share the immutable component suites behavior.
+  """
+  def __create_cache_policies(self, cache_control: dict) -> dict[str, CachePolicy]:
+    document_max_ttl = max(cache_control['document_max_age'], cache_control['document_shared_max_age'])
+    return {
+      'immutable': CachePolicy(
+        min_ttl=0,
+        max_ttl=cache_control['immutable_max_age'],
+        default_ttl=cache_control['immutable_max_age'],
+        cache_control=f"public, max-age={cache_control['immutable_max_age']}, immutable",
+      ),
+      'document': CachePolicy(
+        min_ttl=0,
+        max_ttl=document_max_ttl,
+        default_ttl=cache_control['document_shared_max_age'],
+        cache_control=(
+          f"public, max-age={cache_control['document_max_age']}, "
+          f"s-maxage={cache_control['document_shared_max_age']}, must-revalidate"
+        ),
+      ),
+      'function': CachePolicy(
+        min_ttl=0,
+        max_ttl=cache_control['function_max_ttl'],
+        default_ttl=cache_control['function_default_ttl'],
+      ),
+    }
+
+
+  """
+  List every object the S3 copy directives emit, with its size, content hash and content type, so deployers can upload
+  and invalidate only what changed between releases.
+  """
+  def __collect_s3_objects(self) -> list[S3Object]:
+    target_base_path = os.path.abspath(os.path.join(self.__open_dash_path, '..'))
+
+    objects = []
+    for copy in self.__origins['s3'].copy:
+      source = os.path.join(target_base_path, copy.source)
+      if not os.path.exists(source):
+        print(f'Warning: Copy source {copy.source} not found, skipping...')
+        continue
+
+      if os.path.isdir(source):
+        sources = []
+        for root, _, filenames in os.walk(source):
+          sources.extend(os.path.join(root, filename) for filename in filenames)
+      else:
+        sources = [source]
+      
+      for path in sources:
+        relative_path = os.path.relpath(path, source)
+        key = copy.target if relative_path == '.' else '/'.join([copy.target, *relative_path.split(os.sep)])
+        content_type = self.__origins['s3'].mimetypes.get(key) or mimetypes.guess_type(key)[0]
+        if not content_type and key.endswith('.map'):
+          content_type = 'application/json'
+
+        # A swapped plotly.js bundle keeps the fingerprint of the full bundle it replaced, so its key no longer
+        # identifies its content.
+        is_fingerprinted = fingerprint.check_fingerprint(key)[1] and os.path.abspath(path) not in self.__swapped_paths
+        objects.append(S3Object(
+          key=key,
+          fingerprinted=is_fingerprinted,
+          size=os.path.getsize(path),
+          hash=BundlerUtils.file_hash(path),
+          cache_control=self.__cache_policies['immutable' if is_fingerprinted else 'document'].cache_control,
+          content_type=content_type or 'application/octet-stream',
+          source=os.path.relpath(path, target_base_path),
+        ))
+
+    return sorted(objects, key=lambda obj: obj.key)
+
+
+  """
+  Write sw.js next to index.html. The worker is generated from the exported objects: every fingerprinted object is
+  served cache-first, the scripts and stylesheets index.html loads are precached, and the exported page payloads are
+  served stale-while-revalidate. Page payloads are fetched from their _dash-update-component/<page> objects, so those
+  get their own behavior.
+  """
+  def __write_service_worker(self) -> None:
+    objects = self.__collect_s3_objects()
+    version = hashlib.sha256(
+      json.dumps([[obj.key, obj.hash] for obj in objects], separators=(',', ':')).encode('UTF-8')
+    ).hexdigest()[:16]
+
+    immutable = {f'/{obj.key}' for obj in objects if obj.fingerprinted and not obj.key.endswith('.map')}
+    with open(os.path.join(self.__static_path, 'index.html'), 'r') as f:
+      index_html = f.read()
+    
+    index_urls = [script.src for script in open_dash_html.script_tags(index_html)]
+    index_urls.extend(open_dash_html.link_hrefs(index_html, 'stylesheet'))
+    precache = [url for url in dict.fromkeys(index_urls) if urlparse(url).path in immutable and not urlparse(url).netloc]
+
+    with open(os.path.join(os.environ['OPEN_DASH_CLIENT_PATH'], 'service-worker.js'), 'r') as f:
+      service_worker = f.read().replace('__OPEN_DASH_CONFIG__', json.dumps({
+        'version': version,
+        'precache': precache,
+        'pages': self.__exported_pages,
+        'immutable': sorted(immutable),
+        'prefix': self.__app.config.requests_pathname_prefix,
+        'pagesOutput': self.update_components_params['output'],
+      }, indent=2))
+
+    with open(os.path.join(self.__static_path, 'sw.js'), 'w') as f:
+      f.write(service_worker)
+
+    index_item = self.__origins['s3'].find_copy(target_suffix='index.html')
+    self.__origins['s3'].copy.append(S3OriginCopy(
+      source=os.path.join(os.path.dirname(index_item.source), 'sw.js'),
+      target=BundlerUtils.join_path(os.path.dirname(index_item.target), 'sw.js'),
+    ))
+    self.__cloud_front_behaviors.append(CloudFrontBehavior(
+      origin='s3',
+      pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, 'sw.js'),
+      cache_policy='document',
+    ))
+    if self.__exported_pages:
+      self.__add_update_component_objects_behavior()
+
+
+  """
+  Write a manifest of the data bundle so the server function's open_dash_data module can key its cache on the data
+  version. The version changes whenever any file in the data directory changes.
+  """
+  def __write_data_manifest(self, data_path: str) -> None:
+    files = {}
+    for root, _, filenames in os.walk(data_path):
+      for filename in filenames:
+        path = os.path.join(root, filename)
+        if os.path.samefile(root, data_path) and filename == 'open-dash.data.json':
+          continue
+
+        files[os.path.relpath(path, data_path)] = {
+          'size': os.path.getsize(path),
+          'hash': BundlerUtils.file_hash(path),
+        }
+
+    version = hashlib.sha256(json.dumps(files, sort_keys=True).encode('UTF-8')).hexdigest()[:16]
+    with open(os.path.join(data_path, 'open-dash.data.json'), 'w') as f:
+      json.dump({'version': version, 'files': files}, f, sort_keys=True, indent=2)
+
+
   def __export_static_pages(self) -> None:
     self.__extract_static_pages_from_server()
 
-    if self.__origins['s3'].find_copy(target_prefix='_dash-update-component/'):
+    # Precomputed callback responses are fetched from their own keys, so only page payloads need this behavior.
+    has_page_payloads = any(
+      copy.target.startswith('_dash-update-component/')
+      and not copy.target.startswith('_dash-update-component/_callbacks/')
+      for copy in self.__origins['s3'].copy
+    )
+    if has_page_payloads:
       self.__cloud_front_behaviors.append(CloudFrontBehavior(
         origin='s3',
-        pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-update-component')
+        pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-update-component'),
+        cache_policy='document',
       ))
     
     self.__cloud_front_behaviors.append(CloudFrontBehavior(
       origin='s3',
       pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-layout'),
+      cache_policy='document',
     ))
     self.__cloud_front_behaviors.append(CloudFrontBehavior(
       origin='s3',
       pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-dependencies'),
+      cache_policy='document',
     ))
 
     index_item = self.__origins['s3'].find_copy(target_suffix='index.html')
@@ -328,15 +740,23 @@ class DashAssetsBundler:
   
 
   """
-  Copy JavaScript dependencies from Python static-packages and the app's assets directory to the static directory.
+  Lists the copies of JavaScript dependencies from Python static-packages to the static directory, as source and target
+  paths, and adds the component suites to the output. The files are copied by the suites stage.
   """
-  def __export_js_dependencies(self) -> None:
+  def __export_js_dependencies(self) -> list[tuple[str, str]]:
     components_path = os.path.join(
       self.__static_path,
       BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-component-suites')
     )
   
+    copies = []
+    pruned_namespaces = set()
     for pkg in self.__dependency_lookup.get_internal_dependencies():
+      if not self.__is_used(pkg.namespace):
+        pruned_namespaces.add(pkg.namespace)
+        self.__pruned_paths.update(path.replace(os.sep, '/') for path in pkg.relative_paths)
+        continue
+
       namespace_prefix = os.path.join(*f'{pkg.namespace}.'.split('.'))
       namespace_path = os.path.dirname(sys.modules[pkg.namespace].__file__)
       for dependency_path in pkg.relative_paths:
@@ -346,14 +766,12 @@ class DashAssetsBundler:
           continue
 
         target_directory = os.path.dirname(os.path.join(components_path, dependency_path))
-        os.makedirs(target_directory, exist_ok=True)
-
         filename = BundlerUtils.asset_file_name(
           self.__dependency_lookup.namespace_version(pkg.namespace), 
           dependency_path,
           source
         )
-        shutil.copy2(source, os.path.join(target_directory, filename))
+        copies.append((source, os.path.join(target_directory, filename)))
 
         if pkg.is_dynamic or pkg.is_async:
           # Copy the original filename if the dependency is dynamic or async because the client can potentially request 
@@ -361,8 +779,12 @@ class DashAssetsBundler:
           # 
           # NOTE: This creates a duplicate file in the assets directory so we should investigate if there is a way to
           #      determine ahead of time if the client will request the fingerprinted or unfingerprinted file.
-          shutil.copy2(source, os.path.join(target_directory, os.path.basename(dependency_path)))
+          copies.append((source, os.path.join(target_directory, os.path.basename(dependency_path))))
     
+    if pruned_namespaces:
+      print(f'Pruned unused component libraries: {", ".join(sorted(pruned_namespaces))}')
+      self.__write_pruned_paths()
+
     self.__origins['s3'].copy.append(S3OriginCopy(
       source=os.path.join('.open-dash', 'static', '_dash-component-suites'),
       target=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-component-suites'),
@@ -370,9 +792,211 @@ class DashAssetsBundler:
     self.__cloud_front_behaviors.append(CloudFrontBehavior(
       origin='s3',
       pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-component-suites/*'),
+      cache_policy='immutable',
     ))
+    return copies
 
   
+  def __is_used(self, namespace: str) -> bool:
+    if self.__used_namespaces is None:
+      return True
+
+    component_namespace = self.__dependency_lookup.component_namespace(namespace)
+    return component_namespace is None or bool({namespace, component_namespace} & self.__used_namespaces)
+
+
+  """
+  Collect the namespaces of the components in the layout and in each static page's payload. Components that callbacks
+  create at runtime, or that only appear on pages with path variables, cannot be found this way, so the keep list adds
+  their namespaces. Returns None, which disables pruning, if the layout cannot be rendered.
+  """
+  def __collect_component_namespaces(self, keep: list[str]) -> set[str] | None:
+    documents = self.__rendered_documents()
+    if documents is None:
+      print('Warning: Could not render the layout, skipping component pruning...')
+      return None
+
+    namespaces = set(keep)
+    namespaces.update(component['namespace'] for component in self.__components(documents))
+
+    # Dash Pages' own callbacks target components whose ids start with _pages_.
+    outputs = [output for output in self.__callback_outputs('children') if '_pages_' not in output]
+    if outputs:
+      print(
+        f'Callback outputs {", ".join(outputs)} can render components at runtime. Add their namespaces to '
+        'prune-components.keep if they do not appear in the exported layouts.'
+      )
+
+    return namespaces
+
+
+  """
+  Returns the parsed layout and the payload of each static page, or None if the layout cannot be rendered. Pages with
+  path variables are not exported, so they are not rendered either.
+  """
+  def __rendered_documents(self) -> list | None:
+    url_base = self.__app.config.get('url_base_pathname') or '/'
+    status_code, layout = self.__request(url=f'{url_base}_dash-layout', method=RequestMethod.GET, params={})
+    if status_code != 200:
+      return None
+
+    documents = [json.loads(layout)]
+    for page in page_registry.values():
+      if page.get('path_template'):
+        print(f"Warning: Components on page '{page.get('name')}' with path variables are not analyzed")
+        continue
+
+      params = copy.deepcopy(self.update_components_params)
+      params['inputs'][0]['value'] = page.get('relative_path')
+      status_code, payload = self.__request(
+        url=f'{url_base}_dash-update-component',
+        method=RequestMethod.POST,
+        params=params,
+      )
+      if status_code == 200:
+        documents.append(json.loads(payload))
+
+    return documents
+
+
+  def __components(self, documents: list) -> Iterator[dict]:
+    values = list(documents)
+    while values:
+      value = values.pop()
+      if isinstance(value, dict):
+        if isinstance(value.get('namespace'), str) and 'type' in value and 'props' in value:
+          yield value
+        values.extend(value.values())
+      elif isinstance(value, list):
+        values.extend(value)
+
+
+  """
+  Returns the outputs of the app's callbacks that update the given property.
+  """
+  def __callback_outputs(self, prop: str) -> list[str]:
+    url_base = self.__app.config.get('url_base_pathname') or '/'
+    status_code, dependencies = self.__request(
+      url=f'{url_base}_dash-dependencies',
+      method=RequestMethod.GET,
+      params={},
+    )
+    if status_code != 200:
+      return []
+
+    return [
+      callback['output'] for callback in json.loads(dependencies)
+      if re.search(rf'\.{re.escape(prop)}\b', callback['output'])
+    ]
+
+
+  """
+  Picks the plotly.js partial bundle that covers the trace types of the app's figures. Returns a function that
+  downloads it and writes it over the exported plotly.min.js, or None to keep the full bundle. The function runs once
+  the suites are copied.
+  """
+  def __plotly_bundle_swap(self, plotly_bundle: dict) -> Callable[[], None] | None:
+    if not self.__is_used('plotly'):
+      return None
+
+    documents = self.__rendered_documents()
+    if documents is None:
+      print('Warning: Could not render the layout, keeping the full plotly.js bundle...')
+      return None
+
+    if self.__callback_outputs('figure') and not plotly_bundle['trace_types']:
+      print(
+        'Callbacks create figures whose trace types are unknown, keeping the full plotly.js bundle. Declare them in '
+        'plotly-bundle.trace-types to use a partial bundle.'
+      )
+      return None
+
+    trace_types = set(plotly_bundle['trace_types'])
+    for component in self.__components(documents):
+      figure = component['props'].get('figure')
+      if component['type'] == 'Graph' and isinstance(figure, dict):
+        trace_types.update(trace.get('type', 'scatter') for trace in figure.get('data') or [])
+
+    name = next((name for name, types in PLOTLY_PARTIAL_BUNDLES.items() if trace_types <= types), None)
+    if not name:
+      print(f'No plotly.js partial bundle contains {", ".join(sorted(trace_types))}, keeping the full bundle')
+      return None
+
+    target_directory = os.path.join(
+      self.__static_path,
+      BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-component-suites'),
+      'plotly',
+      'package_data',
+    )
+
+    def swap() -> None:
+      if not os.path.isdir(target_directory):
+        return
+
+      from plotly.offline import get_plotlyjs_version
+      content = self.__read_plotly_bundle(name, get_plotlyjs_version(), plotly_bundle['bundles_path'])
+
+      # Both the fingerprinted and the unfingerprinted copies are exported because the bundle is loaded asynchronously.
+      for filename in os.listdir(target_directory):
+        if fingerprint.check_fingerprint(filename)[0] == 'plotly.min.js':
+          path = os.path.join(target_directory, filename)
+          with open(path, 'wb') as f:
+            f.write(content)
+          self.__swapped_paths.add(os.path.abspath(path))
+
+      print(f'Using the plotly.js {name} bundle for trace types {", ".join(sorted(trace_types)) or "(none)"}')
+
+    return swap
+
+
+  def __read_plotly_bundle(self, name: str, version: str, bundles_path: str | None) -> bytes:
+    filename = f'plotly-{name}-{version}.min.js'
+    if bundles_path:
+      path = os.path.join(bundles_path, filename)
+      if not os.path.exists(path):
+        print(f'Error: plotly.js partial bundle {filename} not found in {bundles_path}')
+        sys.exit(1)
+
+      with open(path, 'rb') as f:
+        content = f.read()
+    else:
+      try:
+        with urllib.request.urlopen(f'https://cdn.plot.ly/{filename}', timeout=60) as response:
+          content = response.read()
+      except OSError as error:
+        print(f'Error: Could not download plotly.js partial bundle {filename}: {error}')
+        print('Download it into a directory and set plotly-bundle.bundles-path to build offline.')
+        sys.exit(1)
+
+    # The license header names the version, e.g. "plotly.js (basic) v2.35.2". dcc expects the version that the plotly
+    # package ships, so a mismatched bundle is an error rather than a silent downgrade.
+    if f'v{version}'.encode('UTF-8') not in content[:512]:
+      print(f'Error: {filename} is not plotly.js v{version}')
+      sys.exit(1)
+
+    return content
+
+
+  """
+  The server function renders its own index pages, so it needs to leave out the same scripts as the static export.
+  """
+  def __write_pruned_paths(self) -> None:
+    if 'OPEN_DASH_SERVER_FUNCTIONS_PATH' not in os.environ:
+      return
+
+    with open(os.path.join(os.environ['OPEN_DASH_SERVER_FUNCTIONS_PATH'], 'open-dash.components.json'), 'w') as f:
+      json.dump({'pruned': sorted(self.__pruned_paths)}, f, indent=2)
+
+
+  def __is_pruned_resource(self, url: str) -> bool:
+    path = urlparse(url).path
+    suites_prefix = f'{self.__app.config.requests_pathname_prefix}_dash-component-suites/'
+    if not path.startswith(suites_prefix):
+      return False
+
+    return fingerprint.check_fingerprint(path[len(suites_prefix):])[0] in self.__pruned_paths
+
+
   """
   Export contents of the application's pages/ directory into the static folder. Dash fetches these pages by POSTing a
   request to the /_dash-update-component route with the pathname input set to the relative path of the page. The 
@@ -391,6 +1015,7 @@ class DashAssetsBundler:
     copy_target_prefix: str = None,
   ) -> None:
     has_custom_404 = False
+    document_source_prefix, document_target_prefix = copy_source_prefix, copy_target_prefix
     target_directory = os.path.join(self.__static_path, '_dash-update-component')
     copy_source_prefix = os.path.join(copy_source_prefix, '_dash-update-component')
     copy_target_prefix = os.path.join(copy_target_prefix, '_dash-update-component')
@@ -415,7 +1040,7 @@ class DashAssetsBundler:
       params = self.update_components_params.copy()
       # Note that the value of the pathname input is the relative path of the page which includes the base url.
       params['inputs'][0]['value'] = page.get('relative_path')
-      self.__cache_json_request(
+      is_exported = self.__cache_json_request(
         url=f'{url_base}_dash-update-component',
         target_file_path=os.path.join(target_directory, page_path),
         method=RequestMethod.POST,
@@ -423,6 +1048,16 @@ class DashAssetsBundler:
         copy_source_prefix=copy_source_prefix,
         copy_target_prefix=copy_target_prefix,
       )
+      if is_exported:
+        self.__exported_pages[page.get('relative_path')] = page_path
+
+      if is_exported and page.get('path') != '/':
+        self.__export_page_document(
+          page=page,
+          page_path=page_path,
+          copy_source_prefix=document_source_prefix,
+          copy_target_prefix=document_target_prefix,
+        )
     
     if not has_custom_404:
       self.__cache_json_request(
@@ -435,6 +1070,165 @@ class DashAssetsBundler:
       )
   
   
+  """
+  Precompute the initial responses of the callbacks listed in the static-callbacks config. Each callback runs with the
+  values its inputs and state have in the layout or the exported pages, as the renderer would send them on page load,
+  and its response is stored at _dash-update-component/_callbacks/<hash of the request>. The entry documents embed the
+  hashes with a shim that fetches a stored response when a request matches one and calls the server otherwise.
+
+  NOTE: Only list callbacks that return the same response for every visitor. Callbacks that depend on cookies, the
+        current time or data that changes after the build would serve stale responses.
+  """
+  def __export_static_callbacks(
+    self,
+    static_callbacks: list[str],
+    *,
+    url_base: str,
+    copy_source_prefix: str,
+    copy_target_prefix: str,
+  ) -> None:
+    status_code, dependencies = self.__request(
+      url=f'{url_base}_dash-dependencies',
+      method=RequestMethod.GET,
+      params={},
+    )
+    if status_code != 200:
+      return
+
+    # Callbacks run with the props of the layout's components and of the page the visitor lands on, so each page is
+    # looked up on its own. Pages that give a callback the same values share one response.
+    documents = self.__rendered_documents() or []
+    props_by_page = []
+    for page_documents in [documents[:1]] + [[documents[0], page] for page in documents[1:]]:
+      props_by_id = {}
+      for component in self.__components(page_documents):
+        component_id = component['props'].get('id')
+        if isinstance(component_id, str):
+          props_by_id.setdefault(component_id, component['props'])
+      props_by_page.append(props_by_id)
+
+    target_directory = os.path.join(self.__static_path, '_dash-update-component', '_callbacks')
+    os.makedirs(target_directory, exist_ok=True)
+    for callback in json.loads(dependencies):
+      # Multiple outputs are listed as ..<id>.<property>...<id>.<property>..
+      is_multi_output = callback['output'].startswith('..')
+      outputs = callback['output'][2:-2].split('...') if is_multi_output else [callback['output']]
+      if not any(output == callback['output'] or output in outputs for output in static_callbacks):
+        continue
+
+      if callback.get('clientside_function') or callback.get('prevent_initial_call'):
+        print(f"Warning: Callback '{callback['output']}' does not call the server on page load, skipping...")
+        continue
+
+      if callback.get('long') or callback.get('background'):
+        # The first response of a background callback is a job ID, which is only meaningful to the server function.
+        print(f"Warning: Callback '{callback['output']}' runs in the background, skipping...")
+        continue
+
+      requests = {}
+      output_dependencies = [dict(zip(['id', 'property'], output.rsplit('.', 1))) for output in outputs]
+      for props_by_id in props_by_page if '{' not in callback['output'] else []:
+        values = []
+        for dependency in callback['inputs'] + callback['state']:
+          if not isinstance(dependency['id'], str) or dependency['id'] not in props_by_id:
+            break
+
+          value = {'id': dependency['id'], 'property': dependency['property']}
+          if dependency['property'] in props_by_id[dependency['id']]:
+            value['value'] = props_by_id[dependency['id']][dependency['property']]
+          values.append(value)
+
+        if len(values) != len(callback['inputs']) + len(callback['state']):
+          continue
+
+        params = {
+          'output': callback['output'],
+          'outputs': output_dependencies if is_multi_output else output_dependencies[0],
+          'inputs': values[:len(callback['inputs'])],
+          'changedPropIds': [],
+        }
+        if callback['state']:
+          params['state'] = values[len(callback['inputs']):]
+        requests.setdefault(open_dash_callbacks.request_hash(params), params)
+
+      if not requests:
+        print(
+          f"Warning: Callback '{callback['output']}' uses pattern-matching ids or components that are not in the "
+          'exported layouts, skipping...'
+        )
+        continue
+
+      for request_hash, params in requests.items():
+        is_exported = self.__cache_json_request(
+          url=f'{url_base}_dash-update-component',
+          target_file_path=os.path.join(target_directory, request_hash),
+          method=RequestMethod.POST,
+          params=params,
+          copy_source_prefix=os.path.join(copy_source_prefix, '_dash-update-component', '_callbacks'),
+          copy_target_prefix=BundlerUtils.join_path(copy_target_prefix, '_dash-update-component/_callbacks'),
+        )
+        if is_exported:
+          self.__static_callback_hashes.append(request_hash)
+          self.__static_callback_outputs.add(callback['output'])
+        else:
+          print(f"Warning: Callback '{callback['output']}' did not return a response on page load, skipping...")
+
+    if self.__static_callback_hashes:
+      self.__add_update_component_objects_behavior()
+
+
+  """
+  Route the objects under _dash-update-component/, i.e. page payloads and precomputed callback responses, to S3. Both
+  static callbacks and the service worker need this behavior, so it is only added once.
+  """
+  def __add_update_component_objects_behavior(self) -> None:
+    pattern = BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-update-component/*')
+    if any(behavior.pattern == pattern for behavior in self.__cloud_front_behaviors):
+      return
+
+    self.__cloud_front_behaviors.append(CloudFrontBehavior(
+      origin='s3',
+      pattern=pattern,
+      cache_policy='document',
+    ))
+
+
+  """
+  Export an entry document for a static page so that deep links and reloads are served from S3 instead of the server
+  function. The document is stored at <page>/index.html and copied to the <page> key, which gets its own behavior when
+  the server function is the default behavior.
+  """
+  def __export_page_document(
+    self,
+    *,
+    page: dict,
+    page_path: str,
+    copy_source_prefix: str,
+    copy_target_prefix: str,
+  ) -> None:
+    response = self.__client.get(page.get('relative_path'))
+    if response.status_code != 200:
+      return
+
+    html = self.__rewrite_entry_document(response.data.decode('UTF-8'), page.get('relative_path'))
+    target_directory = os.path.join(self.__static_path, *page_path.split('/'))
+    os.makedirs(target_directory, exist_ok=True)
+    with open(os.path.join(target_directory, 'index.html'), 'w') as f:
+      f.write(html)
+
+    key = BundlerUtils.join_path(copy_target_prefix, page_path)
+    self.__origins['s3'].copy.append(S3OriginCopy(
+      target=key,
+      source=os.path.join(copy_source_prefix, *page_path.split('/'), 'index.html'),
+    ))
+    self.__origins['s3'].mimetypes[key] = 'text/html'
+    self.__page_document_behaviors.append(CloudFrontBehavior(
+      origin='s3',
+      pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, page_path),
+      cache_policy='document',
+    ))
+
+
   def __cache_json_request(
     self,
     *,
@@ -444,13 +1238,13 @@ class DashAssetsBundler:
     params: dict,
     copy_source_prefix: str = None,
     copy_target_prefix: str = None,
-  ):
-    response = self.__client.get(url) if method == RequestMethod.GET else self.__client.post(url, json=params)
-    if response.status_code != 200:
-      return 
+  ) -> bool:
+    status_code, data = self.__request(url=url, method=method, params=params)
+    if status_code != 200:
+      return False
     
     with open(target_file_path, 'w') as f:
-      f.write(response.data.decode('UTF-8'))
+      f.write(data.decode('UTF-8'))
 
     page_suffix = os.path.basename(target_file_path)
     self.__origins['s3'].copy.append(S3OriginCopy(
@@ -458,21 +1252,329 @@ class DashAssetsBundler:
       source=os.path.join(copy_source_prefix, page_suffix),
     ))
     self.__origins['s3'].mimetypes[BundlerUtils.join_path(copy_target_prefix, page_suffix)] = 'application/json'
+    return True
+
+
+  """
+  Responses are memoized because component pruning renders the layout and pages before they are exported. With
+  typed-arrays enabled, the figures in JSON responses are encoded here, so the exported and inlined payloads match.
+  """
+  def __request(self, *, url: str, method: RequestMethod, params: dict) -> tuple[int, bytes]:
+    key = (method.value, url, json.dumps(params, sort_keys=True))
+    if key not in self.__responses:
+      response = self.__client.get(url) if method == RequestMethod.GET else self.__client.post(url, json=params)
+      data = response.data
+      if self.__typed_arrays['enabled'] and response.status_code == 200 and response.mimetype == 'application/json':
+        data = open_dash_typed_arrays.encode_payload(data, self.__typed_arrays['min_length'])
+        self.__typed_array_savings += len(response.data) - len(data)
+      self.__responses[key] = (response.status_code, data)
+
+    return self.__responses[key]
+
+
+  def __rewrite_entry_document(self, html: str, pathname: str) -> str:
+    html = html.replace('http://localhost', f'https://{os.environ["OPEN_DASH_DOMAIN_NAME"]}')
+
+    # Dash renders a page's meta tags for its path but only sets its title on the client.
+    page = next((page for page in page_registry.values() if page.get('relative_path') == pathname), None)
+    title = page.get('title') if page else None
+    if callable(title):
+      title = title()
+    if title:
+      html = open_dash_html.set_title(html, title)
+
+    if self.__pruned_paths:
+      html = open_dash_html.remove_resources(html, self.__is_pruned_resource)
+
+    if os.environ['OPEN_DASH_BUNDLE_SCRIPTS'] == '1':
+      html = self.__bundle_scripts(html)
+
+    if os.environ['OPEN_DASH_PRERENDER'] == '1':
+      html = self.__prerender(html, pathname)
+
+    if os.environ['OPEN_DASH_INLINE_PAYLOADS'] == '1':
+      html = self.__inline_payloads(html, pathname)
+
+    if self.__static_callback_hashes:
+      with open(os.path.join(os.environ['OPEN_DASH_CLIENT_PATH'], 'static-callbacks.js'), 'r') as f:
+        static_callbacks = f.read().replace('__OPEN_DASH_CONFIG__', json.dumps({
+          'hashes': self.__static_callback_hashes,
+          'prefix': self.__app.config.requests_pathname_prefix,
+        }))
+      html = open_dash_html.insert_into_head(html, open_dash_html.inline_script(static_callbacks))
+
+    if os.environ['OPEN_DASH_SERVICE_WORKER'] == '1':
+      with open(os.path.join(os.environ['OPEN_DASH_CLIENT_PATH'], 'register-service-worker.js'), 'r') as f:
+        register_service_worker = f.read().replace('__OPEN_DASH_CONFIG__', json.dumps({
+          'url': f'{self.__app.config.requests_pathname_prefix}sw.js',
+          'scope': self.__app.config.requests_pathname_prefix,
+        }))
+      html = open_dash_html.insert_into_head(html, open_dash_html.inline_script(register_service_worker))
+
+    resource_hints = json.loads(os.environ['OPEN_DASH_RESOURCE_HINTS'])
+    if resource_hints['enabled']:
+      html = self.__add_resource_hints(html, resource_hints)
+
+    return html
+
+
+  """
+  Embed _dash-layout, _dash-dependencies and, for multi-page apps, the payload of the page at pathname in the entry
+  document, with a fetch shim that serves them to the renderer. This saves the round trips the renderer would otherwise
+  make after every script has loaded.
+  """
+  def __inline_payloads(self, html: str, pathname: str) -> str:
+    url_base = self.__app.config.get('url_base_pathname') or '/'
+    requests_prefix = self.__app.config.requests_pathname_prefix
+
+    payloads = []
+    for endpoint in ['_dash-layout', '_dash-dependencies']:
+      status_code, data = self.__request(url=f'{url_base}{endpoint}', method=RequestMethod.GET, params={})
+      if status_code == 200:
+        self.__inlined_endpoints.add(endpoint)
+        payloads.append({'method': 'GET', 'path': f'{requests_prefix}{endpoint}', 'body': json.loads(data)})
+
+    page_payload = self.__page_payload(pathname)
+    if page_payload:
+      payloads.append({
+        'method': 'POST',
+        'pathname': pathname,
+        'body': page_payload,
+        'output': self.update_components_params['output'],
+        'path': f'{requests_prefix}_dash-update-component',
+      })
+
+    if not payloads:
+      return html
+
+    return open_dash_html.insert_into_head(
+      html,
+      open_dash_html.json_script(open_dash_html.INLINE_PAYLOADS_ID, payloads) +
+      open_dash_html.inline_script(open_dash_html.INLINE_PAYLOADS_SHIM),
+    )
+
+
+  """
+  Returns the parsed Dash Pages payload for the static page at pathname, or None if there is no such page.
+  """
+  def __page_payload(self, pathname: str) -> dict | None:
+    page = next(
+      (
+        page for page in page_registry.values()
+        if page.get('relative_path') == pathname and not page.get('path_template')
+      ),
+      None,
+    )
+    if not page:
+      return None
+
+    params = copy.deepcopy(self.update_components_params)
+    params['inputs'][0]['value'] = pathname
+    status_code, data = self.__request(
+      url=f'{self.__app.config.get("url_base_pathname") or "/"}_dash-update-component',
+      method=RequestMethod.POST,
+      params=params,
+    )
+    return json.loads(data) if status_code == 200 else None
+
+
+  """
+  Replace Dash's "Loading..." placeholder with a static snapshot of the layout, filled with the page's content for
+  multi-page apps, so the document has content to paint before the scripts load. The renderer replaces the snapshot
+  when React mounts.
+  """
+  def __prerender(self, html: str, pathname: str) -> str:
+    url_base = self.__app.config.get('url_base_pathname') or '/'
+    status_code, layout = self.__request(url=f'{url_base}_dash-layout', method=RequestMethod.GET, params={})
+    if status_code != 200:
+      print('Warning: Could not render the layout, skipping prerendering...')
+      return html
+
+    layout = json.loads(layout)
+    page_payload = self.__page_payload(pathname)
+    if page_payload:
+      open_dash_prerender.apply_updates(layout, page_payload.get('response', {}))
+
+    return open_dash_html.replace_loading_placeholder(html, open_dash_prerender.render(layout))
+
+
+  """
+  Concatenate runs of adjacent, synchronous component suite scripts into content-hashed bundles and point the entry
+  document at them. The React dependencies are bundled separately from the component libraries because they change
+  less often. Async chunks are loaded on demand by the component libraries, so they are left as they are.
+  """
+  def __bundle_scripts(self, html: str) -> str:
+    scripts = [
+      script for script in open_dash_html.script_tags(html)
+      if script.is_blocking and script.is_plain and self.__component_suite_path(script.src)
+    ]
+
+    runs = []
+    for run in open_dash_html.script_runs(html, scripts):
+      for _, group in itertools.groupby(run, key=lambda script: '/_dash-component-suites/dash/deps/' in script.src):
+        runs.append(list(group))
+
+    # Replace from the end of the document so that the offsets of earlier runs stay valid.
+    for run in reversed(runs):
+      if len(run) > 1:
+        html = open_dash_html.replace_scripts(html, run, self.__write_script_bundle(run))
+
+    return html
+
+
+  def __write_script_bundle(self, scripts: list[open_dash_html.ScriptTag]) -> str:
+    key = tuple(script.src for script in scripts)
+    if key in self.__script_bundles:
+      return self.__script_bundles[key]
+
+    sources = []
+    for script in scripts:
+      with open(self.__component_suite_path(script.src), 'r', encoding='UTF-8') as f:
+        sources.append((script.src, f.read()))
+
+    content = open_dash_html.concatenate_scripts(sources)
+    name = 'deps' if '/_dash-component-suites/dash/deps/' in scripts[0].src else 'components'
+    filename = f'{name}.v0m{hashlib.sha256(content.encode("UTF-8")).hexdigest()[:16]}.js'
+
+    target_directory = os.path.join(
+      self.__static_path,
+      BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, '_dash-component-suites'),
+      'open-dash',
+    )
+    os.makedirs(target_directory, exist_ok=True)
+    with open(os.path.join(target_directory, filename), 'w', encoding='UTF-8') as f:
+      f.write(content)
+
+    self.__script_bundles[key] = (
+      f'{self.__app.config.requests_pathname_prefix}_dash-component-suites/open-dash/{filename}'
+    )
+    return self.__script_bundles[key]
+
+
+  """
+  Returns the exported file for a same-origin component suite URL, or None if the URL points anywhere else.
+  """
+  def __component_suite_path(self, src: str) -> str | None:
+    url = urlparse(src)
+    suites_prefix = f'{self.__app.config.requests_pathname_prefix}_dash-component-suites/'
+    if url.netloc or not url.path.startswith(suites_prefix):
+      return None
+
+    path = os.path.join(
+      self.__static_path,
+      BundlerUtils.join_path(
+        self.__origins['s3'].origin_path_prefix,
+        url.path[len(self.__app.config.requests_pathname_prefix):],
+      ),
+    )
+    return path if os.path.exists(path) else None
+
+
+  """
+  Dash renders its scripts at the end of the body and the renderer only requests /_dash-layout and /_dash-dependencies
+  once every script has executed. Preloading them from the head lets the browser fetch everything in parallel as soon
+  as it receives the document. Scripts listed in defer-scripts are deferred instead of preloaded.
+  """
+  def __add_resource_hints(self, html: str, resource_hints: dict) -> str:
+    hints: list[dict] = []
+    for script in open_dash_html.script_tags(html):
+      script_path = fingerprint.check_fingerprint(urlparse(script.src).path)[0]
+      if any(script_path.endswith(pattern) for pattern in resource_hints['defer_scripts']):
+        html = open_dash_html.add_script_attribute(html, script, 'defer')
+        continue
+
+      if not script.is_blocking:
+        continue
+
+      url = urlparse(script.src)
+      if url.netloc:
+        origin = f'{url.scheme or "https"}://{url.netloc}'
+        if not any(hint['href'] == origin for hint in hints):
+          hints.insert(0, {'href': origin, 'rel': 'preconnect'})
+
+      hints.append({'href': script.src, 'rel': 'preload', 'as_type': 'script', 'crossorigin': 'crossorigin' in script.attributes})
+
+    # The renderer fetches these in CORS mode with same-origin credentials, which the crossorigin attribute matches.
+    for endpoint in ['_dash-layout', '_dash-dependencies']:
+      if endpoint in self.__inlined_endpoints:
+        continue
+
+      hints.append({
+        'rel': 'preload',
+        'as_type': 'fetch',
+        'crossorigin': True,
+        'href': f'{self.__app.config.requests_pathname_prefix}{endpoint}',
+      })
+
+    if resource_hints['early_hints'] and not self.__early_hints:
+      self.__early_hints = [open_dash_html.link_header(**hint) for hint in hints]
+
+    return open_dash_html.insert_into_head(html, ''.join(open_dash_html.link_tag(**hint) for hint in hints))
 
 
   def __copy_assets_path(self) -> None:
     # Copy the assets directory into the .open-dash/static directory. Note that the server functions directory
     # has a copy of the assets directory as well, if it exists, to ensure that the assets are available to the
     # fallback server function.
-    BundlerUtils.copy_directory_contents(
-      os.environ['OPEN_DASH_ASSETS_PATH'],
-      os.path.join(self.__static_path, BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, 'assets')),
-      []
+    BundlerUtils.copy_directory_contents(os.environ['OPEN_DASH_ASSETS_PATH'], self.__static_assets_path(), [])
+
+
+  def __static_assets_path(self) -> str:
+    return os.path.join(self.__static_path, BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, 'assets'))
+
+
+  """
+  Recompresses the images in the exported assets directory and writes their WebP and AVIF variants next to them. The
+  server function's copy of the assets is left as it is. open_dash_images runs in its own interpreter, so that its
+  process pool neither forks this multi-threaded process nor imports the app.
+  """
+  def __optimize_images(self, settings: dict) -> None:
+    result = subprocess.run(
+      [sys.executable, open_dash_images.__file__],
+      input=json.dumps({**settings, 'directory': self.__static_assets_path()}),
+      text=True,
+      capture_output=True,
+    )
+    if result.returncode != 0:
+      print(result.stderr)
+      print('Error: Image optimization failed.')
+      sys.exit(1)
+
+    response = json.loads(result.stdout)
+    if 'error' in response:
+      print(f"Warning: Images were not optimized: {response['error']}. Install Pillow in the app's environment.")
+      return
+
+    prefix = BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, 'assets')
+    images = response['results']
+    for image in images:
+      if image['error']:
+        print(f"Warning: {image['path']} was not optimized: {image['error']}")
+
+      if image['variants']:
+        self.__origins['s3'].image_variants[BundlerUtils.join_path(prefix, image['path'].replace(os.sep, '/'))] = [
+          ImageVariant(
+            key=BundlerUtils.join_path(prefix, path.replace(os.sep, '/')),
+            content_type=open_dash_images.CONTENT_TYPES[os.path.splitext(path)[1]],
+            size=size,
+          )
+          for path, size in image['variants'].items()
+        ]
+
+    original_bytes = sum(image['original_size'] for image in images)
+    optimized_bytes = sum(image['size'] for image in images)
+    print(
+      f'Optimized {len(images)} images from {original_bytes} to {optimized_bytes} bytes and wrote '
+      f"{sum(len(image['variants']) for image in images)} variants. "
+      f"{sum(1 for image in images if image['cached'])} were copied from the cache."
     )
 
+
+  def __add_assets_path_behavior(self) -> None:
     self.__cloud_front_behaviors.append(CloudFrontBehavior(
       origin='s3',
       pattern=BundlerUtils.join_path(self.__origins['s3'].origin_path_prefix, 'assets/*'),
+      cache_policy='document',
     ))
     self.__origins['s3'].copy.append(S3OriginCopy(
       source=os.path.join('.open-dash', 'static', 'assets'),
@@ -501,12 +1603,25 @@ class DashAssetsBundler:
       copy_source_prefix = os.path.join(copy_source_prefix, *url_base_components)
     
     copy_target_prefix = url_base.replace('/', '', 1) if url_base.startswith('/') else None
-    
+
+    # The entry documents embed the hashes of the precomputed responses, so they are exported first.
+    static_callbacks = json.loads(os.environ['OPEN_DASH_STATIC_CALLBACKS'])
+    if static_callbacks:
+      self.__export_static_callbacks(
+        static_callbacks,
+        url_base=url_base,
+        copy_source_prefix=copy_source_prefix,
+        copy_target_prefix=copy_target_prefix,
+      )
+
+    if os.environ['OPEN_DASH_STATIC_ONLY'] == '1':
+      self.__check_static_only_callbacks()
+
     # Capture index.html and write it to static directory to optionally make it the CloudFront default object.
     # Note that the default fingerprint for all static files matches the index.html references.
     with open(os.path.join(self.__static_path, 'index.html'), 'w') as f:
       index_html = self.__client.get(url_base).data.decode('UTF-8')
-      f.write(index_html.replace('http://localhost', f'https://{os.environ["OPEN_DASH_DOMAIN_NAME"]}'))
+      f.write(self.__rewrite_entry_document(index_html, url_base))
       self.__origins['s3'].copy.append(S3OriginCopy(
         source=os.path.join(copy_source_prefix, 'index.html'),
         target=BundlerUtils.join_path(copy_target_prefix, 'index.html'),
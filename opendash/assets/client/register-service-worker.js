@@ -0,0 +1,65 @@
+(function () {
+  var CONFIG = __OPEN_DASH_CONFIG__;
+  if (!('serviceWorker' in navigator)) {
+    return;
+  }
+
+  window.addEventListener('load', function () {
+    navigator.serviceWorker.register(CONFIG.url, { scope: CONFIG.scope }).catch(function () {});
+  });
+
+  // Ask the worker to cache the payloads of linked pages, once per page, so navigating to them does not wait on the
+  // network. The worker ignores links that are not exported pages.
+  var requested = {};
+  function prefetch(href) {
+    var worker = navigator.serviceWorker.controller;
+    var url = new URL(href, document.baseURI);
+    if (!worker || url.origin !== window.location.origin || url.search || requested[url.pathname]) {
+      return;
+    }
+
+    requested[url.pathname] = true;
+    worker.postMessage({ type: 'open-dash-prefetch', pathname: url.pathname });
+  }
+
+  function prefetchLinks() {
+    Array.prototype.forEach.call(document.querySelectorAll('a[href]'), function (link) {
+      prefetch(link.href);
+    });
+  }
+
+  var scheduled = false;
+  function schedulePrefetch() {
+    if (scheduled) {
+      return;
+    }
+
+    scheduled = true;
+    function run() {
+      scheduled = false;
+      prefetchLinks();
+    }
+
+    // Both are called as methods of window, which requestIdleCallback requires.
+    if (window.requestIdleCallback) {
+      window.requestIdleCallback(run, { timeout: 2000 });
+    } else {
+      window.setTimeout(run, 200);
+    }
+  }
+
+  // Dash renders links after the scripts load and re-renders them on navigation, so rescan whenever the DOM changes.
+  window.addEventListener('load', function () {
+    new MutationObserver(schedulePrefetch).observe(document.body, { childList: true, subtree: true });
+    schedulePrefetch();
+  });
+
+  ['mouseover', 'touchstart', 'focusin'].forEach(function (type) {
+    document.addEventListener(type, function (event) {
+      var link = event.target.closest && event.target.closest('a[href]');
+      if (link) {
+        prefetch(link.href);
+      }
+    }, { passive: true });
+  });
+})();
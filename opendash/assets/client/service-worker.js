@@ -0,0 +1,133 @@
+/**
+ * Generated by OpenDash. Fingerprinted objects never change under the same URL, so they are served cache-first. Dash
+ * Pages payloads are served stale-while-revalidate from their exported _dash-update-component/<page> objects, and
+ * pages linked from the current page are prefetched when the page asks for them. The cache name includes the build
+ * version, so activating a new deployment's worker drops the previous deployment's entries.
+ */
+var CONFIG = __OPEN_DASH_CONFIG__;
+var CACHE_PREFIX = 'open-dash-';
+var CACHE = CACHE_PREFIX + CONFIG.version;
+var IMMUTABLE = new Set(CONFIG.immutable);
+var UPDATE_COMPONENT = CONFIG.prefix + '_dash-update-component';
+
+function pagePath(pathname) {
+  var key = CONFIG.pages[pathname];
+  return key ? UPDATE_COMPONENT + '/' + key : null;
+}
+
+function isPagePath(pathname) {
+  return Object.keys(CONFIG.pages).some(function (page) {
+    return pagePath(page) === pathname;
+  });
+}
+
+// Returns the exported page payload that answers a Dash Pages callback request, or null for any other callback.
+function pagePathFromCallback(body) {
+  var request;
+  try {
+    request = JSON.parse(body);
+  } catch (e) {
+    return null;
+  }
+
+  var location = {};
+  (request.inputs || []).forEach(function (input) {
+    if (input.id === '_pages_location') {
+      location[input.property] = input.value;
+    }
+  });
+  if (request.output !== CONFIG.pagesOutput || location.search) {
+    return null;
+  }
+
+  return pagePath(location.pathname);
+}
+
+function fetchAndCache(cache, request) {
+  return fetch(request, { credentials: 'same-origin' }).then(function (response) {
+    if (!response.ok) {
+      return response;
+    }
+
+    return cache.put(request, response.clone()).then(function () {
+      return response;
+    });
+  });
+}
+
+function cacheFirst(request) {
+  return caches.open(CACHE).then(function (cache) {
+    return cache.match(request).then(function (cached) {
+      return cached || fetchAndCache(cache, request);
+    });
+  });
+}
+
+function staleWhileRevalidate(path, event) {
+  return caches.open(CACHE).then(function (cache) {
+    return cache.match(path).then(function (cached) {
+      var network = fetchAndCache(cache, path);
+      if (!cached) {
+        return network;
+      }
+
+      event.waitUntil(network.catch(function () {}));
+      return cached;
+    });
+  });
+}
+
+self.addEventListener('install', function (event) {
+  // A precache miss should not stop the worker from installing; the object is cached on first use instead.
+  event.waitUntil(caches.open(CACHE).then(function (cache) {
+    return Promise.all(CONFIG.precache.map(function (url) {
+      return cache.add(url).catch(function () {});
+    }));
+  }).then(function () {
+    return self.skipWaiting();
+  }));
+});
+
+self.addEventListener('activate', function (event) {
+  event.waitUntil(caches.keys().then(function (keys) {
+    return Promise.all(keys.filter(function (key) {
+      return key.indexOf(CACHE_PREFIX) === 0 && key !== CACHE;
+    }).map(function (key) {
+      return caches.delete(key);
+    }));
+  }).then(function () {
+    return self.clients.claim();
+  }));
+});
+
+self.addEventListener('fetch', function (event) {
+  var request = event.request;
+  var url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (request.method === 'GET' && IMMUTABLE.has(url.pathname)) {
+    event.respondWith(cacheFirst(request));
+  } else if (request.method === 'GET' && isPagePath(url.pathname)) {
+    event.respondWith(staleWhileRevalidate(url.pathname, event));
+  } else if (request.method === 'POST' && url.pathname === UPDATE_COMPONENT) {
+    event.respondWith(request.clone().text().then(function (body) {
+      var path = pagePathFromCallback(body);
+      return path ? staleWhileRevalidate(path, event) : fetch(request);
+    }));
+  }
+});
+
+self.addEventListener('message', function (event) {
+  var path = event.data && event.data.type === 'open-dash-prefetch' ? pagePath(event.data.pathname) : null;
+  if (!path) {
+    return;
+  }
+
+  event.waitUntil(caches.open(CACHE).then(function (cache) {
+    return cache.match(path).then(function (cached) {
+      return cached || fetchAndCache(cache, path);
+    });
+  }).catch(function () {}));
+});
@@ -0,0 +1,83 @@
+(function () {
+  var CONFIG = __OPEN_DASH_CONFIG__;
+  // Hashing needs SubtleCrypto, which browsers only expose to secure contexts. Without it every request goes to the
+  // server function, as it would without the shim.
+  if (!window.crypto || !window.crypto.subtle || !window.TextEncoder) {
+    return;
+  }
+
+  var hashes = {};
+  CONFIG.hashes.forEach(function (hash) {
+    hashes[hash] = true;
+  });
+  var endpoint = CONFIG.prefix + '_dash-update-component';
+  var fetch = window.fetch;
+
+  // Serializes a value as JSON with sorted keys, like the bundler's open_dash_callbacks.canonical_json, so the same
+  // request has the same hash in both.
+  function canonical(value) {
+    if (Array.isArray(value)) {
+      return '[' + value.map(function (item) {
+        return item === undefined ? 'null' : canonical(item);
+      }).join(',') + ']';
+    }
+    if (value !== null && typeof value === 'object') {
+      return '{' + Object.keys(value).sort().filter(function (key) {
+        return value[key] !== undefined;
+      }).map(function (key) {
+        return JSON.stringify(key) + ':' + canonical(value[key]);
+      }).join(',') + '}';
+    }
+    return JSON.stringify(value);
+  }
+
+  // Only the callback and the values it runs with identify a response. Which inputs triggered it does not.
+  function dependencies(items) {
+    return (items || []).map(function (item) {
+      return { id: item.id, property: item.property, value: item.value };
+    });
+  }
+
+  function hash(request) {
+    var body = canonical({
+      output: request.output,
+      inputs: dependencies(request.inputs),
+      state: dependencies(request.state),
+    });
+    return window.crypto.subtle.digest('SHA-256', new TextEncoder().encode(body)).then(function (digest) {
+      return Array.prototype.map.call(new Uint8Array(digest), function (byte) {
+        return ('0' + byte.toString(16)).slice(-2);
+      }).join('');
+    });
+  }
+
+  window.fetch = function (input, init) {
+    var args = arguments;
+    var url = new URL(typeof input === 'string' ? input : input.url, document.baseURI);
+    var method = ((init && init.method) || input.method || 'GET').toUpperCase();
+    if (url.origin !== window.location.origin || url.pathname !== endpoint || method !== 'POST') {
+      return fetch.apply(window, args);
+    }
+
+    var request;
+    try {
+      request = JSON.parse(init.body);
+    } catch (e) {
+      return fetch.apply(window, args);
+    }
+
+    return hash(request).then(function (key) {
+      if (!hashes[key]) {
+        return fetch.apply(window, args);
+      }
+
+      return fetch(endpoint + '/_callbacks/' + key, { credentials: 'same-origin' }).then(function (response) {
+        return response.ok ? response : fetch.apply(window, args);
+      }, function () {
+        return fetch.apply(window, args);
+      });
+    }, function () {
+      return fetch.apply(window, args);
+    });
+  };
+})();
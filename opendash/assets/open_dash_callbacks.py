@@ -0,0 +1,82 @@
+"""
+Hashes _dash-update-component requests the way the static callbacks client shim, client/static-callbacks.js, hashes
+them, so that a response the bundler precomputes is found under the hash of the request the renderer sends. Both sides
+serialize the request's output and the values of its inputs and state as JSON with sorted keys and no whitespace, and
+numbers are written the way JavaScript's JSON.stringify writes them.
+"""
+from decimal import Decimal
+import hashlib
+import json
+import math
+
+
+# JavaScript numbers are doubles, so larger integers lose precision when the browser parses them.
+MAX_SAFE_INTEGER = 2 ** 53
+
+
+def js_number(value: float) -> str:
+  """
+  Formats a finite number like JavaScript's Number.prototype.toString. Python and JavaScript print the same digits, but
+  they switch to exponents at different magnitudes and write them differently, e.g. 1e-07 and 1e-7.
+  """
+  if value == 0:
+    return '0'
+  if value < 0:
+    return f'-{js_number(-value)}'
+
+  # repr gives the shortest digits that round-trip. The value is 0.<digits> * 10 ** point.
+  _, digits, exponent = Decimal(repr(float(value))).normalize().as_tuple()
+  digits = ''.join(str(digit) for digit in digits)
+  point = exponent + len(digits)
+
+  if len(digits) <= point <= 21:
+    return digits + '0' * (point - len(digits))
+  if 0 < point <= 21:
+    return f'{digits[:point]}.{digits[point:]}'
+  if -6 < point <= 0:
+    return f'0.{"0" * -point}{digits}'
+
+  exponent = point - 1
+  mantissa = digits if len(digits) == 1 else f'{digits[0]}.{digits[1:]}'
+  return f'{mantissa}e{"+" if exponent >= 0 else "-"}{abs(exponent)}'
+
+
+def canonical_json(value) -> str:
+  """
+  Serializes a value like the shim's canonical function: sorted keys, no whitespace, JavaScript number formatting, and
+  null for NaN and infinities.
+  """
+  if value is None or isinstance(value, bool):
+    return json.dumps(value)
+  if isinstance(value, int):
+    return str(value) if abs(value) <= MAX_SAFE_INTEGER else js_number(float(value))
+  if isinstance(value, float):
+    return js_number(value) if math.isfinite(value) else 'null'
+  if isinstance(value, str):
+    return json.dumps(value, ensure_ascii=False)
+  if isinstance(value, (list, tuple)):
+    return f'[{",".join(canonical_json(item) for item in value)}]'
+  if isinstance(value, dict):
+    items = sorted(value.items())
+    return f'{{{",".join(f"{canonical_json(str(key))}:{canonical_json(item)}" for key, item in items)}}}'
+
+  raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def canonical_request(body: dict) -> str:
+  """
+  Serializes a request body by its output and the values of its inputs and state. Which inputs triggered the request
+  does not identify its response.
+  """
+  def dependencies(items: list | None) -> list[dict]:
+    return [{key: item[key] for key in ['id', 'property', 'value'] if key in item} for item in items or []]
+
+  return canonical_json({
+    'output': body['output'],
+    'inputs': dependencies(body.get('inputs')),
+    'state': dependencies(body.get('state')),
+  })
+
+
+def request_hash(body: dict) -> str:
+  return hashlib.sha256(canonical_request(body).encode('UTF-8')).hexdigest()
@@ -0,0 +1,305 @@
+"""
+Helpers for rewriting the entry documents that Dash renders. Dash's index template is stable enough to rewrite with
+regular expressions: external scripts are rendered as empty <script src="..."></script> tags in the footer, followed by
+the inline _dash-config and _dash-renderer scripts.
+"""
+from dataclasses import dataclass
+import html as html_escape
+from typing import Callable
+import json
+import re
+
+
+SCRIPT_TAG = re.compile(r'<script\b(?P<attributes>[^>]*)>\s*</script>\n?')
+SRC_ATTRIBUTE = re.compile(r'\bsrc="(?P<src>[^"]+)"')
+LINK_TAG = re.compile(r'<link\b(?P<attributes>[^>]*)>\n?')
+HREF_ATTRIBUTE = re.compile(r'\bhref="(?P<href>[^"]+)"')
+ATTRIBUTE = re.compile(
+  r'(?P<name>[^\s"\'<>/=]+)'
+  r'(?:\s*=\s*(?:"(?P<double>[^"]*)"|\'(?P<single>[^\']*)\'|(?P<bare>[^\s"\'=<>`]+)))?'
+)
+HEAD_END = re.compile(r'</head>', re.IGNORECASE)
+TITLE_TAG = re.compile(r'<title>.*?</title>', re.IGNORECASE | re.DOTALL)
+LOADING_PLACEHOLDER = re.compile(r'<div class="_dash-loading">.*?</div>', re.DOTALL)
+SOURCE_MAP_COMMENT = re.compile(r'^//[#@] sourceMappingURL=.*$', re.MULTILINE)
+
+# Webpack bundles derive their public path, and so the location of their async chunks, from document.currentScript.
+# Concatenated scripts would all see the bundle's src, so each one is preceded by a call that reports its original src.
+# An error in one script is reported without stopping the ones after it, as if they were still separate scripts. Each
+# script runs in its own function, called with the global this, so a leading "use strict" directive is still a prologue.
+SCRIPT_BUNDLE_PREAMBLE = """(function () {
+  window.__openDashSetCurrentScript = function (src) {
+    var script = { src: new URL(src, document.baseURI).href, tagName: 'SCRIPT' };
+    Object.defineProperty(document, 'currentScript', { configurable: true, get: function () { return script; } });
+  };
+  window.__openDashReportError = function (error) {
+    setTimeout(function () {
+      throw error;
+    });
+  };
+})();
+"""
+SCRIPT_BUNDLE_ENTRY = """;__openDashSetCurrentScript(%s);
+try {
+(function () {
+%s
+}).call(this);
+} catch (error) {
+  __openDashReportError(error);
+} finally {
+  delete document.currentScript;
+}
+"""
+SCRIPT_BUNDLE_EPILOGUE = """delete window.__openDashSetCurrentScript;
+delete window.__openDashReportError;
+"""
+
+# Answers the renderer's first requests for inlined payloads from the document instead of the network. Each payload is
+# served once, so later requests, e.g. when navigating back to a page, still reach the origin. Page payloads only match
+# the Dash Pages callback for the same pathname without a query string, because the query string can change the page.
+INLINE_PAYLOADS_ID = '_open-dash-payloads'
+INLINE_PAYLOADS_SHIM = """(function () {
+  var payloads = JSON.parse(document.getElementById('%s').textContent);
+  var fetch = window.fetch;
+
+  function matches(payload, url, method, body) {
+    if (url.origin !== window.location.origin || url.pathname !== payload.path || method !== payload.method) {
+      return false;
+    }
+    if (!payload.pathname) {
+      return true;
+    }
+
+    var request;
+    try {
+      request = JSON.parse(body);
+    } catch (e) {
+      return false;
+    }
+
+    var location = {};
+    (request.inputs || []).forEach(function (input) {
+      if (input.id === '_pages_location') {
+        location[input.property] = input.value;
+      }
+    });
+    return request.output === payload.output && location.pathname === payload.pathname && !location.search;
+  }
+
+  window.fetch = function (input, init) {
+    var url = new URL(typeof input === 'string' ? input : input.url, document.baseURI);
+    var method = ((init && init.method) || input.method || 'GET').toUpperCase();
+    for (var i = 0; i < payloads.length; i++) {
+      if (matches(payloads[i], url, method, init && init.body)) {
+        var payload = payloads.splice(i, 1)[0];
+        return Promise.resolve(new Response(JSON.stringify(payload.body), {
+          status: 200,
+          headers: { 'Content-Type': 'application/json' },
+        }));
+      }
+    }
+
+    return fetch.apply(window, arguments);
+  };
+})();
+""" % INLINE_PAYLOADS_ID
+
+
+@dataclass(kw_only=True)
+class ScriptTag:
+  """
+  The full markup of the tag, including a trailing newline if there is one.
+  """
+  tag: str
+
+  """
+  The unescaped value of the tag's src attribute.
+  """
+  src: str
+
+  """
+  The tag's attributes, as returned by parse_attributes.
+  """
+  attributes: dict[str, str]
+
+  """
+  Whether the tag blocks the parser, i.e. whether it has neither an async nor a defer attribute and is not a module.
+  """
+  is_blocking: bool
+
+  """
+  Whether src is the tag's only attribute.
+  """
+  is_plain: bool
+
+  """
+  The tag's start and end offsets in the document.
+  """
+  start: int
+  end: int
+
+
+def parse_attributes(attributes: str) -> dict[str, str]:
+  """
+  Returns the unescaped values of a tag's attributes by lowercase name. Boolean attributes have empty values.
+  """
+  parsed = {}
+  for match in ATTRIBUTE.finditer(attributes):
+    value = next((value for value in match.group('double', 'single', 'bare') if value is not None), '')
+    parsed[match.group('name').lower()] = html_escape.unescape(value)
+
+  return parsed
+
+
+def script_tags(html: str) -> list[ScriptTag]:
+  """
+  Returns the external script tags in document order.
+  """
+  tags = []
+  for match in SCRIPT_TAG.finditer(html):
+    src = SRC_ATTRIBUTE.search(match.group('attributes'))
+    if not src:
+      continue
+
+    attributes = match.group('attributes')
+    parsed = parse_attributes(attributes)
+    tags.append(ScriptTag(
+      end=match.end(),
+      tag=match.group(0),
+      start=match.start(),
+      src=html_escape.unescape(src.group('src')),
+      attributes=parsed,
+      is_plain=attributes.strip() == src.group(0),
+      is_blocking='async' not in parsed and 'defer' not in parsed and parsed.get('type') != 'module',
+    ))
+
+  return tags
+
+
+def link_hrefs(html: str, rel: str) -> list[str]:
+  """
+  Returns the unescaped URLs of the link tags with the given rel, in document order.
+  """
+  hrefs = []
+  for match in LINK_TAG.finditer(html):
+    href = HREF_ATTRIBUTE.search(match.group('attributes'))
+    if href and re.search(rf'\brel="{re.escape(rel)}"', match.group('attributes')):
+      hrefs.append(html_escape.unescape(href.group('href')))
+
+  return hrefs
+
+
+def script_runs(html: str, scripts: list[ScriptTag]) -> list[list[ScriptTag]]:
+  """
+  Groups scripts, given in document order, into runs that are only separated by whitespace in the document. Scripts in
+  a run execute back to back, so they can be concatenated without reordering them relative to other scripts.
+  """
+  runs: list[list[ScriptTag]] = []
+  for script in scripts:
+    if runs and not html[runs[-1][-1].end:script.start].strip():
+      runs[-1].append(script)
+    else:
+      runs.append([script])
+
+  return runs
+
+
+def replace_scripts(html: str, scripts: list[ScriptTag], src: str) -> str:
+  """
+  Replaces a run of script tags with a single tag that loads src.
+  """
+  return f'{html[:scripts[0].start]}{script_tag(src)}{html[scripts[-1].end:]}'
+
+
+def remove_resources(html: str, is_removed: Callable[[str], bool]) -> str:
+  """
+  Removes the external script and link tags whose unescaped URL matches is_removed.
+  """
+  def replace(match: re.Match, attribute: re.Pattern) -> str:
+    url = attribute.search(match.group('attributes'))
+    return '' if url and is_removed(html_escape.unescape(url.group(1))) else match.group(0)
+
+  html = SCRIPT_TAG.sub(lambda match: replace(match, SRC_ATTRIBUTE), html)
+  return LINK_TAG.sub(lambda match: replace(match, HREF_ATTRIBUTE), html)
+
+
+def script_tag(src: str) -> str:
+  return f'<script src="{html_escape.escape(src)}"></script>\n'
+
+
+def concatenate_scripts(scripts: list[tuple[str, str]]) -> str:
+  """
+  Concatenates (src, content) pairs into a single classic script. Each script runs in its own function inside a try
+  block, so its "use strict" directive applies to it alone, a missing trailing semicolon cannot join it to its
+  neighbours, and document.currentScript is restored even when it throws. Top-level declarations are local to that
+  function instead of global. Source map comments are dropped because they would point at the wrong file.
+  """
+  parts = [SCRIPT_BUNDLE_PREAMBLE]
+  for src, content in scripts:
+    parts.append(SCRIPT_BUNDLE_ENTRY % (json.dumps(src), SOURCE_MAP_COMMENT.sub('', content)))
+  parts.append(SCRIPT_BUNDLE_EPILOGUE)
+
+  return ''.join(parts)
+
+
+def json_script(element_id: str, value) -> str:
+  """
+  Embeds a value as a JSON data block. Every < is escaped, which JSON only allows inside strings, so the payload cannot
+  close the element or open a comment.
+  """
+  content = json.dumps(value, separators=(',', ':')).replace('<', '\\u003c')
+  return f'<script id="{element_id}" type="application/json">{content}</script>\n'
+
+
+def inline_script(content: str) -> str:
+  return f'<script>{content}</script>\n'
+
+
+def set_title(html: str, title: str) -> str:
+  tag = f'<title>{html_escape.escape(title)}</title>'
+  if TITLE_TAG.search(html):
+    return TITLE_TAG.sub(lambda _: tag, html, count=1)
+
+  return insert_into_head(html, f'{tag}\n')
+
+
+def replace_loading_placeholder(html: str, markup: str) -> str:
+  """
+  Replaces the "Loading..." placeholder that Dash renders inside the React entry point.
+  """
+  return LOADING_PLACEHOLDER.sub(lambda _: markup, html, count=1)
+
+
+def insert_into_head(html: str, markup: str) -> str:
+  match = HEAD_END.search(html)
+  if not match:
+    return markup + html
+
+  return f'{html[:match.start()]}{markup}{html[match.start():]}'
+
+
+def add_script_attribute(html: str, script: ScriptTag, attribute: str) -> str:
+  return html.replace(script.tag, script.tag.replace('<script ', f'<script {attribute} ', 1), 1)
+
+
+def link_tag(href: str, rel: str, *, as_type: str = None, crossorigin: bool = False) -> str:
+  attributes = [f'rel="{rel}"', f'href="{html_escape.escape(href)}"']
+  if as_type:
+    attributes.append(f'as="{as_type}"')
+  if crossorigin:
+    attributes.append('crossorigin')
+
+  return f'<link {" ".join(attributes)}>\n'
+
+
+def link_header(href: str, rel: str, *, as_type: str = None, crossorigin: bool = False) -> str:
+  """
+  Formats a Link header value, as used in 103 Early Hints responses.
+  """
+  parameters = [f'<{href}>', f'rel={rel}']
+  if as_type:
+    parameters.append(f'as={as_type}')
+  if crossorigin:
+    parameters.append('crossorigin')
+
+  return '; '.join(parameters)
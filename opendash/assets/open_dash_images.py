@@ -0,0 +1,250 @@
+"""
+Recompresses the PNG and JPEG images in the exported assets directory and writes WebP and AVIF variants next to them,
+e.g. logo.png.webp next to logo.png. PNGs are recompressed and converted to WebP losslessly. JPEGs keep their
+quantization tables, and their variants are encoded at the configured quality. A recompressed image or a variant is
+only kept when it is smaller than what it replaces.
+
+Encoding is CPU-bound, so images are encoded on a process pool. The assets bundler runs this module as a script, so the
+pool's workers do not import the app. Results are cached by content hash and settings, so unchanged images are copied
+from the cache on later builds.
+
+Pillow is optional. It has to be installed in the environment the app is bundled with.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+import hashlib
+import io
+from itertools import repeat
+import json
+import mimetypes
+import os
+import shutil
+import sys
+import tempfile
+from typing import Optional
+
+try:
+  from PIL import Image, ImageOps, features
+  import PIL
+except ImportError:
+  Image = None
+
+
+# Bump to invalidate cached results when the encoding changes.
+ENCODER_VERSION = 1
+
+CONTENT_TYPES = {
+  '.png': 'image/png',
+  '.jpg': 'image/jpeg',
+  '.jpeg': 'image/jpeg',
+  '.webp': 'image/webp',
+  '.avif': 'image/avif',
+}
+FORMATS = {'webp': 'WEBP', 'avif': 'AVIF'}
+
+# Older Python versions do not know the variants' extensions, and the S3 objects' content types are guessed from them.
+for extension in ['.webp', '.avif']:
+  mimetypes.add_type(CONTENT_TYPES[extension], extension)
+
+
+@dataclass(kw_only=True)
+class ImageResult:
+  """
+  The path of the image relative to the optimized directory.
+  """
+  path: str
+
+  """
+  The size of the image in bytes before and after it was recompressed.
+  """
+  original_size: int
+  size: int
+
+  """
+  The size of each variant in bytes, by the variant's path relative to the optimized directory.
+  """
+  variants: dict[str, int] = field(default_factory=dict)
+
+  """
+  Whether the result was copied from the cache.
+  """
+  cached: bool = False
+
+  """
+  Why the image was left as it is, e.g. because Pillow could not read it.
+  """
+  error: Optional[str] = None
+
+
+def available_formats(formats: list[str]) -> list[str]:
+  """
+  Returns the variant formats that the installed Pillow can encode.
+  """
+  return [name for name in formats if name in FORMATS and features.check(name)]
+
+
+def image_paths(directory: str) -> list[str]:
+  paths = []
+  for root, _, filenames in os.walk(directory):
+    for filename in filenames:
+      if os.path.splitext(filename)[1].lower() in ['.png', '.jpg', '.jpeg']:
+        paths.append(os.path.relpath(os.path.join(root, filename), directory))
+
+  return sorted(paths)
+
+
+def has_alpha(image) -> bool:
+  return image.mode in ['RGBA', 'LA', 'PA'] or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def recompress(image, extension: str) -> bytes:
+  output = io.BytesIO()
+  if extension == '.png':
+    # The transparency and ICC profile are carried over from the image's info.
+    image.save(output, 'PNG', optimize=True)
+  else:
+    image.save(
+      output,
+      'JPEG',
+      quality='keep',
+      subsampling='keep',
+      optimize=True,
+      progressive=True,
+      icc_profile=image.info.get('icc_profile'),
+      exif=image.info.get('exif', b''),
+    )
+
+  return output.getvalue()
+
+
+def encode_variant(image, extension: str, name: str, quality: int) -> bytes:
+  # Browsers rotate JPEGs by their EXIF orientation, which the variants do not carry.
+  image = ImageOps.exif_transpose(image)
+  image = image.convert('RGBA' if has_alpha(image) else 'RGB')
+
+  output = io.BytesIO()
+  if name == 'webp' and extension == '.png':
+    image.save(output, 'WEBP', lossless=True, method=6)
+  elif name == 'webp':
+    image.save(output, 'WEBP', quality=quality, method=6)
+  else:
+    image.save(output, 'AVIF', quality=quality)
+
+  return output.getvalue()
+
+
+def encode(data: bytes, extension: str, formats: list[str], quality: int) -> dict[str, bytes]:
+  """
+  Returns the recompressed image under "image" and each variant under its format, leaving out those that are not
+  smaller. Animated images are left as they are.
+  """
+  with Image.open(io.BytesIO(data)) as image:
+    image.load()
+    if getattr(image, 'is_animated', False):
+      return {}
+
+    encoded = {'image': recompress(image, extension)}
+    smallest = min(len(data), len(encoded['image']))
+    for name in formats:
+      encoded[name] = encode_variant(image, extension, name, quality)
+
+  return {name: value for name, value in encoded.items() if len(value) < (len(data) if name == 'image' else smallest)}
+
+
+def cache_key(data: bytes, formats: list[str], quality: int) -> str:
+  settings = json.dumps([ENCODER_VERSION, PIL.__version__, sorted(formats), quality]).encode('UTF-8')
+  return hashlib.sha256(settings + b'\0' + data).hexdigest()
+
+
+def optimize_file(path: str, directory: str, formats: list[str], quality: int, cache_path: str) -> ImageResult:
+  """
+  Optimizes one image in place and writes its variants next to it. Encoded files are stored in the cache under the
+  image's cache key, in a directory that is renamed into place once it is complete.
+  """
+  full_path = os.path.join(directory, path)
+  with open(full_path, 'rb') as file:
+    data = file.read()
+
+  result = ImageResult(path=path, original_size=len(data), size=len(data))
+  entry_path = os.path.join(cache_path, cache_key(data, formats, quality))
+  if os.path.isdir(entry_path):
+    # The build cache evicts the least recently used images first.
+    os.utime(entry_path)
+    result.cached = True
+  else:
+    try:
+      encoded = encode(data, os.path.splitext(path)[1].lower(), formats, quality)
+    except PIL.UnidentifiedImageError:
+      result.error = 'Pillow cannot read it'
+      return result
+    except Exception as error:
+      result.error = f'{type(error).__name__}: {error}'
+      return result
+
+    os.makedirs(cache_path, exist_ok=True)
+    temporary_path = tempfile.mkdtemp(prefix='.', dir=cache_path)
+    for name, value in encoded.items():
+      with open(os.path.join(temporary_path, name), 'wb') as file:
+        file.write(value)
+
+    try:
+      os.rename(temporary_path, entry_path)
+    except OSError:
+      # Another build cached the same image first.
+      shutil.rmtree(temporary_path, ignore_errors=True)
+      if not os.path.isdir(entry_path):
+        raise
+
+  for name in sorted(os.listdir(entry_path)):
+    if name == 'image':
+      shutil.copyfile(os.path.join(entry_path, name), full_path)
+      result.size = os.path.getsize(full_path)
+    elif name in formats:
+      shutil.copyfile(os.path.join(entry_path, name), f'{full_path}.{name}')
+      result.variants[f'{path}.{name}'] = os.path.getsize(f'{full_path}.{name}')
+
+  return result
+
+
+def optimize_directory(
+  directory: str,
+  *,
+  formats: list[str],
+  quality: int,
+  cache_path: str,
+  workers: Optional[int] = None,
+) -> list[ImageResult]:
+  """
+  Optimizes every PNG and JPEG image in the directory on a pool of up to workers processes, one per CPU by default.
+  """
+  paths = image_paths(directory)
+  if not paths:
+    return []
+
+  formats = available_formats(formats)
+  with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(paths))) as executor:
+    return list(executor.map(
+      optimize_file,
+      paths,
+      repeat(directory),
+      repeat(formats),
+      repeat(quality),
+      repeat(cache_path),
+    ))
+
+
+if __name__ == '__main__':
+  # Reads the directory and settings as JSON from stdin and writes the results as JSON to stdout.
+  if Image is None:
+    print(json.dumps({'error': 'Pillow is not installed'}))
+    sys.exit(0)
+
+  request = json.load(sys.stdin)
+  results = optimize_directory(
+    request['directory'],
+    formats=request['formats'],
+    quality=request['quality'],
+    cache_path=request['cache_path'],
+    workers=request['workers'],
+  )
+  print(json.dumps({'results': [asdict(result) for result in results]}))
@@ -1,7 +1,38 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
 
 
+@dataclass(kw_only=True)
+class CachePolicy:
+  """
+  The minimum time, in seconds, that CloudFront keeps objects cached regardless of their Cache-Control header.
+  """
+  min_ttl: int
+
+  """
+  The time, in seconds, that CloudFront keeps objects cached when they do not set a Cache-Control header.
+  """
+  default_ttl: int
+
+  """
+  The maximum time, in seconds, that CloudFront keeps objects cached regardless of their Cache-Control header.
+  """
+  max_ttl: int
+
+  """
+  The Cache-Control header to set as metadata on S3 objects that use this policy. Function origins set their own.
+  """
+  cache_control: str = None
+
+  def to_dict(self) -> dict:
+    return {
+      'minTtl': self.min_ttl,
+      'maxTtl': self.max_ttl,
+      'defaultTtl': self.default_ttl,
+      'cacheControl': self.cache_control or '',
+    }
+
+
 @dataclass(kw_only=True)
 class CloudFrontBehavior:
   """
@@ -14,6 +45,18 @@ class CloudFrontBehavior:
   """
   origin: str
 
+  """
+  The name of the cache policy, in the CloudFront config's cache policies, to associate with this behavior.
+  """
+  cache_policy: str = None
+
+  def to_dict(self) -> dict:
+    return {
+      'origin': self.origin,
+      'pattern': self.pattern,
+      'cachePolicy': self.cache_policy or '',
+    }
+
 
 @dataclass(kw_only=True)
 class S3OriginCopy:
@@ -28,6 +71,82 @@ class S3OriginCopy:
   target: str
 
 
+@dataclass(kw_only=True)
+class S3Object:
+  """
+  The full path to the object in the S3 bucket.
+  """
+  key: str
+
+  """
+  The path to the object in the OpenDash output.
+  """
+  source: str
+
+  """
+  The size of the object in bytes.
+  """
+  size: int
+
+  """
+  The SHA-256 hex digest of the object's content.
+  """
+  hash: str
+
+  """
+  The Content-Type metadata to set on the object.
+  """
+  content_type: str
+
+  """
+  Whether the object's name carries a Dash fingerprint. Fingerprinted objects never change content under the same key,
+  so they never need to be invalidated.
+  """
+  fingerprinted: bool
+
+  """
+  The Cache-Control metadata to set on the object.
+  """
+  cache_control: str
+
+  def to_dict(self) -> dict:
+    return {
+      'key': self.key,
+      'cacheControl': self.cache_control,
+      'size': self.size,
+      'hash': self.hash,
+      'source': self.source,
+      'contentType': self.content_type,
+      'fingerprinted': self.fingerprinted,
+    }
+
+
+@dataclass(kw_only=True)
+class ImageVariant:
+  """
+  The full path to the variant in the S3 bucket.
+  """
+  key: str
+
+  """
+  The Content-Type of the variant, e.g. image/webp. Deployers can serve the variant instead of the original image to
+  browsers that list it in their Accept header.
+  """
+  content_type: str
+
+  """
+  The size of the variant in bytes.
+  """
+  size: int
+
+  def to_dict(self) -> dict:
+    return {
+      'key': self.key,
+      'contentType': self.content_type,
+      'size': self.size,
+    }
+
+
 @dataclass(kw_only=True)
 class S3Origin:
   """
@@ -54,12 +173,26 @@ class S3Origin:
   """
   mimetypes: dict[str, str]
 
+  """
+  Every object emitted into the S3 bucket by the copy directives, sorted by key.
+  """
+  objects: list[S3Object] = field(default_factory=list)
+
+  """
+  The smaller encodings of optimized images, by the full path to the original image in the S3 bucket.
+  """
+  image_variants: dict[str, list[ImageVariant]] = field(default_factory=dict)
+
   def to_dict(self) -> dict:
     return {
       'type': self.type,
       'mimetypes': self.mimetypes,
       'originPathPrefix': self.origin_path_prefix,
       'copy': [copy.__dict__ for copy in self.copy],
+      'objects': [obj.to_dict() for obj in self.objects],
+      'imageVariants': {
+        key: [variant.to_dict() for variant in variants] for key, variants in self.image_variants.items()
+      },
     }
 
   def find_copy(self, *, target_suffix: str = None, target_prefix: str = None) -> S3OriginCopy:
@@ -129,10 +262,16 @@ class CloudFrontConfig:
   """
   default_root_object: str = None
 
+  """
+  The dictionary of cache policies that behaviors refer to by name.
+  """
+  cache_policies: dict[str, CachePolicy] = field(default_factory=dict)
+
   def to_dict(self) -> dict:
     return {
       'defaultRootObject': self.default_root_object or '',
-      'behaviors': [behavior.__dict__ for behavior in self.behaviors],
+      'behaviors': [behavior.to_dict() for behavior in self.behaviors],
+      'cachePolicies': {key: policy.to_dict() for key, policy in self.cache_policies.items()},
       'origins': {key: origin.to_dict() for key, origin in self.origins.items()},
     }
 
@@ -154,8 +293,14 @@ class OpenDashOutput:
   """
   additional_bundles: dict[str, MiscBundle]
 
+  """
+  Link header values for the entry documents' critical resources. Deployers can send them as 103 Early Hints.
+  """
+  early_hints: list[str] = field(default_factory=list)
+
   def to_json(self) -> str:
     return json.dumps({
+      'earlyHints': self.early_hints,
       'globalFingerprint': self.global_fingerprint or '',
       'cloudFrontConfig': self.cloud_front_config.to_dict(),
       'additionalBundles': {key: bundle.__dict__ for key, bundle in self.additional_bundles.items()},
@@ -0,0 +1,133 @@
+"""
+Renders a Dash layout, as served by /_dash-layout, to static HTML. dash_html_components map directly to HTML elements.
+Every other component becomes a placeholder div that keeps its id, className and style and renders its children, so
+containers from other libraries still show their content. The markup is only a snapshot: the renderer replaces it when
+React mounts.
+"""
+import html as html_escape
+import re
+
+
+HTML_NAMESPACE = 'dash_html_components'
+PLACEHOLDER_CLASS = '_open-dash-placeholder'
+
+# Component types whose names do not match their element because the element name is reserved in Python or JavaScript.
+ELEMENT_NAMES = {'MapEl': 'map', 'ObjectEl': 'object'}
+# Elements that would run or change how the document loads if they were static markup instead of React elements.
+SKIPPED_TYPES = {'Base', 'Script'}
+VOID_ELEMENTS = {
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# Props that Dash adds to every component or that only make sense on the client.
+IGNORED_PROPS = {
+  'children', 'style', 'key', 'setProps', 'loading_state', 'n_clicks', 'n_clicks_timestamp', 'disable_n_clicks',
+}
+ATTRIBUTE_NAMES = {'className': 'class', 'htmlFor': 'for'}
+ATTRIBUTE_NAME = re.compile(r'^[a-zA-Z][a-zA-Z0-9_:.-]*$')
+
+# CSS properties that React does not suffix with px when their value is a number.
+UNITLESS_PROPERTIES = {
+  'animationIterationCount', 'columnCount', 'fillOpacity', 'flex', 'flexGrow', 'flexShrink', 'fontWeight',
+  'gridColumn', 'gridRow', 'lineHeight', 'opacity', 'order', 'orphans', 'strokeOpacity', 'widows', 'zIndex', 'zoom',
+}
+
+# dcc.Graph renders a 450px tall plot by default. Reserving the space avoids a layout shift when the plot mounts.
+PLACEHOLDER_STYLES = {('dash_core_components', 'Graph'): {'height': '450px'}}
+
+
+def apply_updates(layout, updates: dict):
+  """
+  Applies a callback response, i.e. {component_id: {prop: value}}, to the components in a layout. Dash Pages renders
+  each page by updating the children of _pages_content, so this fills a page into the app's layout.
+  """
+  components = [layout]
+  while components:
+    value = components.pop()
+    if isinstance(value, list):
+      components.extend(value)
+    elif is_component(value):
+      component_id = value['props'].get('id')
+      if isinstance(component_id, str) and component_id in updates:
+        value['props'].update(updates[component_id])
+      components.append(value['props'].get('children'))
+
+  return layout
+
+
+def is_component(value) -> bool:
+  return isinstance(value, dict) and 'type' in value and 'namespace' in value and isinstance(value.get('props'), dict)
+
+
+def render(value) -> str:
+  if value is None or isinstance(value, bool):
+    return ''
+
+  if isinstance(value, (str, int, float)):
+    return html_escape.escape(str(value))
+
+  if isinstance(value, list):
+    return ''.join(render(item) for item in value)
+
+  if not is_component(value):
+    return ''
+
+  props = value['props']
+  if value['namespace'] == HTML_NAMESPACE and value['type'] in SKIPPED_TYPES:
+    return ''
+
+  if value['namespace'] == HTML_NAMESPACE:
+    element = ELEMENT_NAMES.get(value['type'], value['type'].lower())
+    attributes = {name: prop for name, prop in props.items() if name not in IGNORED_PROPS}
+    style = props.get('style')
+  else:
+    element = 'div'
+    attributes = {
+      'id': props.get('id'),
+      'className': ' '.join(filter(None, [PLACEHOLDER_CLASS, props.get('className')])),
+      'data-dash-type': f"{value['namespace']}.{value['type']}",
+    }
+    style = {**PLACEHOLDER_STYLES.get((value['namespace'], value['type']), {}), **(props.get('style') or {})}
+
+  markup = f'<{element}{render_attributes(attributes, style)}>'
+  if element in VOID_ELEMENTS:
+    return markup
+
+  return f'{markup}{render(props.get("children"))}</{element}>'
+
+
+def render_attributes(attributes: dict, style: dict | None) -> str:
+  rendered = []
+  for name, value in attributes.items():
+    name = ATTRIBUTE_NAMES.get(name, name)
+    if value is None or value is False or not ATTRIBUTE_NAME.match(name):
+      continue
+
+    if value is True:
+      rendered.append(f' {name.lower()}')
+    elif isinstance(value, (str, int, float)):
+      # Pattern-matching ids are dicts, which have no string form the renderer would recognize, so they are dropped.
+      name = name if name.startswith(('data-', 'aria-')) else name.lower()
+      rendered.append(f' {name}="{html_escape.escape(str(value))}"')
+
+  if style and isinstance(style, dict):
+    rendered.append(f' style="{html_escape.escape(render_style(style))}"')
+
+  return ''.join(rendered)
+
+
+def render_style(style: dict) -> str:
+  declarations = []
+  for name, value in style.items():
+    if value is None or value == '':
+      continue
+
+    is_length = isinstance(value, (int, float)) and not isinstance(value, bool) and name not in UNITLESS_PROPERTIES
+    if is_length and value != 0:
+      value = f'{value}px'
+
+    # React style names are camelCase, except custom properties, which are passed through.
+    css_name = name if name.startswith('--') else re.sub(r'([A-Z])', lambda match: f'-{match.group(1).lower()}', name)
+    declarations.append(f'{css_name}: {value}')
+
+  return '; '.join(declarations)
@@ -0,0 +1,173 @@
+"""
+Runs the phases of a build as a dependency graph. A stage starts as soon as the stages it runs after have finished, so
+independent phases, such as copying the data directory while pip installs, overlap. The scheduler is shared by
+bundle.create and the assets bundler, which is why it lives next to the other modules that are copied into the app.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import queue
+import threading
+import time
+from typing import Callable
+
+
+@dataclass(kw_only=True)
+class Stage:
+  name: str
+  run: Callable[[], None]
+
+  """
+  The names of the stages that must finish before this one starts.
+  """
+  after: list[str] = field(default_factory=list)
+
+  """
+  Runs the stage on the thread that called run_stages, for work tied to that thread. The Flask test client, for
+  example, keeps the contexts of its requests on the thread that made them.
+  """
+  main_thread: bool = False
+
+
+@dataclass(kw_only=True)
+class StageTiming:
+  name: str
+
+  """
+  The part of the build the stage belongs to, e.g. "bundle" or "assets-bundler".
+  """
+  group: str
+
+  """
+  Wall-clock start and end times in seconds since the epoch, so that timings from separate processes line up.
+  """
+  start: float
+  end: float
+
+  """
+  The worker thread that ran the stage, numbered from 0.
+  """
+  worker: int
+
+  @property
+  def seconds(self) -> float:
+    return self.end - self.start
+
+  def to_dict(self, started_at: float) -> dict:
+    return {
+      'name': self.name,
+      'group': self.group,
+      'start': round(self.start - started_at, 3),
+      'end': round(self.end - started_at, 3),
+      'worker': self.worker,
+    }
+
+
+def order(stages: list[Stage]) -> list[Stage]:
+  """
+  Returns the stages in an order where every stage comes after the stages it depends on. Raises ValueError for
+  duplicate names, unknown dependencies and cycles.
+  """
+  by_name = {}
+  for stage in stages:
+    if stage.name in by_name:
+      raise ValueError(f'Duplicate stage {stage.name}')
+    by_name[stage.name] = stage
+
+  for stage in stages:
+    unknown = [name for name in stage.after if name not in by_name]
+    if unknown:
+      raise ValueError(f"Stage {stage.name} runs after unknown stages: {', '.join(unknown)}")
+
+  ordered, visited, visiting = [], set(), set()
+
+  def visit(stage: Stage) -> None:
+    if stage.name in visited:
+      return
+    if stage.name in visiting:
+      raise ValueError(f'Stage {stage.name} depends on itself')
+
+    visiting.add(stage.name)
+    for name in stage.after:
+      visit(by_name[name])
+    visiting.remove(stage.name)
+    visited.add(stage.name)
+    ordered.append(stage)
+
+  for stage in stages:
+    visit(stage)
+
+  return ordered
+
+
+def run_stages(stages: list[Stage], *, max_workers: int, group: str) -> list[StageTiming]:
+  """
+  Runs the stages with up to max_workers of them at a time and returns their timings in the order they started. With
+  one worker, stages run one at a time in the order they are listed, as far as their dependencies allow.
+
+  When a stage raises, including SystemExit, no further stages start and the error is raised once the running stages
+  have finished.
+  """
+  max_workers = max(1, max_workers)
+  pending = order(stages)
+  # Ties are broken by the listed order, so the build stays predictable with few workers.
+  position = {stage.name: index for index, stage in enumerate(stages)}
+  pending.sort(key=lambda stage: position[stage.name])
+
+  done: set[str] = set()
+  timings: list[StageTiming] = []
+  workers: dict[int, int] = {}
+  lock = threading.Lock()
+  # Stages for the calling thread, followed by None once nothing is left to run.
+  main_thread_stages = queue.Queue()
+  running = 0
+  error = None
+
+  def schedule() -> None:
+    # Called with the lock held, at the start and whenever a stage finishes.
+    nonlocal running
+    if error is None:
+      for stage in [stage for stage in pending if all(name in done for name in stage.after)]:
+        if running >= max_workers:
+          break
+
+        pending.remove(stage)
+        running += 1
+        if stage.main_thread:
+          main_thread_stages.put(stage)
+        else:
+          executor.submit(execute, stage)
+
+    if running == 0:
+      main_thread_stages.put(None)
+
+  def execute(stage: Stage) -> None:
+    nonlocal running, error
+    with lock:
+      worker = workers.setdefault(threading.get_ident(), len(workers))
+
+    start, failure = time.time(), None
+    try:
+      stage.run()
+    except BaseException as exception:
+      failure = exception
+
+    with lock:
+      timings.append(StageTiming(name=stage.name, group=group, start=start, end=time.time(), worker=worker))
+      running -= 1
+      if failure is None:
+        done.add(stage.name)
+      else:
+        error = error or failure
+      schedule()
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with lock:
+      schedule()
+
+    while (stage := main_thread_stages.get()) is not None:
+      execute(stage)
+
+  if error is not None:
+    raise error
+
+  return sorted(timings, key=lambda timing: timing.start)
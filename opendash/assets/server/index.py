@@ -1,16 +1,115 @@
+# Imported first so that the init duration it reports covers the other imports, including the app.
+import open_dash_metrics
+
 import awsgi
+import json
+import open_dash_profiler
+import open_dash_typed_arrays
 import os
+import re
+import sys
+from urllib.parse import urlparse
+
+from dash.fingerprint import check_fingerprint
 
 # The create_app function should return a Dash instance.
 from app import create_app
 
 
+server_cache = None
+# The open_dash_background module, once get_server has installed it.
+background = None
+
+# Component suites that the bundler left out of the static export because the app never renders them.
+PRUNED_COMPONENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'open-dash.components.json')
+RESOURCE_TAG = re.compile(r'<(?:script|link)\b[^>]*\b(?:src|href)="(?P<url>[^"]+)"[^>]*>(?:\s*</script>)?\n?')
+
+
+def prune_index(app) -> None:
+    """
+    Removes the pruned component suites from the index pages the server renders, so they match the static export.
+    """
+    if not os.path.exists(PRUNED_COMPONENTS_PATH):
+        return
+
+    with open(PRUNED_COMPONENTS_PATH, 'r') as f:
+        pruned = set(json.load(f)['pruned'])
+
+    suites_prefix = f'{app.config.requests_pathname_prefix}_dash-component-suites/'
+
+    def is_pruned(match) -> bool:
+        path = urlparse(match.group('url')).path
+        return path.startswith(suites_prefix) and check_fingerprint(path[len(suites_prefix):])[0] in pruned
+
+    interpolate_index = app.interpolate_index
+
+    def interpolate_pruned_index(**kwargs):
+        for key in ['scripts', 'css']:
+            kwargs[key] = RESOURCE_TAG.sub(lambda match: '' if is_pruned(match) else match.group(0), kwargs[key])
+        return interpolate_index(**kwargs)
+
+    app.interpolate_index = interpolate_pruned_index
+
+
+def has_background_callbacks(app) -> bool:
+    from dash._callback import GLOBAL_CALLBACK_LIST
+
+    # Dash 2 marks background callbacks with "long" and Dash 3 with "background".
+    callbacks = [*getattr(app, '_callback_list', []), *GLOBAL_CALLBACK_LIST]
+    return any(callback.get('long') or callback.get('background') for callback in callbacks)
+
+
+def install_background(app) -> None:
+    """
+    Installs open_dash_background on apps that need it: apps with background callbacks and no manager of their own, apps
+    that create a QueueCallbackManager, and functions with a configured queue. It builds on the background callback
+    manager API of Dash 2.17 and later 2.x releases, so it is not imported for other apps.
+    """
+    global background
+    uses_queue = (
+        'OPEN_DASH_BACKGROUND_QUEUE' in os.environ
+        or 'open_dash_background' in sys.modules
+        or (app._background_manager is None and has_background_callbacks(app))
+    )
+    if not uses_queue:
+        return
+
+    try:
+        import open_dash_background
+    except ImportError as error:
+        from dash import __version__ as dash_version
+        raise RuntimeError(
+            f'Background callbacks on the server function need Dash 2.17 or a later 2.x release, but Dash '
+            f'{dash_version} is installed ({error}). Give the app a background_callback_manager of its own instead.'
+        ) from error
+
+    open_dash_background.install(app)
+    background = open_dash_background
+
+
 def get_server():
     global server_cache
     if server_cache is None:
-        server_cache = create_app().server
+        app = create_app()
+        prune_index(app)
+        install_background(app)
+        open_dash_typed_arrays.install(app)
+        server_cache = app.server
     return server_cache
 
+def respond(event, context):
+    metrics = open_dash_metrics.start(event)
+    if metrics is None:
+        return awsgi.response(get_server(), event, context)
+
+    if server_cache is None:
+        metrics.time('CreateAppDuration', get_server)
+
+    response = metrics.time('WsgiDuration', awsgi.response, get_server(), event, context)
+    metrics.emit(response)
+    return response
+
+
 def handler(event, context):
     if 'requestContext' not in event or not event['requestContext'] or not event['requestContext'].get('http'):
         # This is a warmer event. Ignore it.
@@ -33,4 +132,22 @@ def handler(event, context):
     event['requestContext']['domainName'] = domain_name
     event['requestContext']['domainPrefix'] = domain_name.split('.')[0]
 
-    return awsgi.response(get_server(), event, context)
+    profile = open_dash_profiler.start(event)
+    if profile is None:
+        return respond(event, context)
+
+    return profile.run(respond, event, context)
+
+
+def worker_handler(event, context):
+    """
+    Runs background callbacks. The request function queues them and the browser polls it for their results.
+    """
+    get_server()
+    if background is None:
+        raise RuntimeError('The app has no background callbacks that run on the OpenDash queue.')
+
+    return background.handle(event)
+
+
+open_dash_metrics.initialized()
@@ -0,0 +1,205 @@
+"""
+Background callbacks for the server function. Dash runs a callback declared with background=True through a background
+callback manager: the first request starts a job and returns its ID, and the browser polls until the result is ready.
+QueueCallbackManager sends the job to the queue configured in open_dash_queue, so the request function returns at
+once and the worker function, index.worker_handler, runs the callback.
+
+index.py installs the manager on apps that do not set background_callback_manager. Apps can also create it
+themselves, e.g. to pass cache_by:
+
+    from open_dash_background import QueueCallbackManager
+
+    app = Dash(__name__, background_callback_manager=QueueCallbackManager(cache_by=[lambda: VERSION]))
+"""
+from contextvars import copy_context
+import json
+import traceback
+
+from _plotly_utils.utils import PlotlyJSONEncoder
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+from dash.exceptions import PreventUpdate
+from dash.long_callback._proxy_set_props import ProxySetProps
+from dash.long_callback.managers import BaseLongCallbackManager
+
+import open_dash_queue
+
+
+# The manager that worker_handler runs jobs with. Set by install().
+manager = None
+
+
+class JobFunction:
+    """
+    A registered callback. Jobs refer to it by key, because the function itself cannot be sent to another process.
+    """
+    def __init__(self, fn, progress, key):
+        self.fn = fn
+        self.progress = progress
+        self.key = key
+
+
+class QueueCallbackManager(BaseLongCallbackManager):
+    def __init__(self, queue=None, store=None, cache_by=None):
+        self.jobs = open_dash_queue.Jobs(
+            queue or open_dash_queue.queue_from_url(open_dash_queue.QUEUE),
+            store or open_dash_queue.store_from_url(open_dash_queue.STORE),
+            self.__run,
+            self.__discard,
+        )
+        super().__init__(cache_by)
+
+    @property
+    def store(self):
+        return self.jobs.store
+
+    def is_local(self):
+        """
+        Whether jobs run on threads of the request function or keep their results in its memory. Lambda freezes those
+        threads between requests, and other instances of the function do not see that memory.
+        """
+        return isinstance(self.jobs.queue, open_dash_queue.LocalQueue) or isinstance(
+            self.jobs.store,
+            open_dash_queue.MemoryStore,
+        )
+
+    def make_job_fn(self, fn, progress, key=None):
+        return JobFunction(fn, progress, key)
+
+    def call_job_fn(self, key, job_fn, args, context):
+        message = {'function': job_fn.key, 'key': key, 'args': args, 'context': dict(context)}
+        # Values go through JSON on their way to the worker, as they would in a request.
+        return self.jobs.submit(json.loads(json.dumps(message, cls=PlotlyJSONEncoder)))
+
+    def terminate_job(self, job):
+        if job:
+            self.jobs.terminate(job)
+
+    def terminate_unhealthy_job(self, job):
+        return False
+
+    def job_running(self, job):
+        return bool(job) and self.jobs.status(job) in [open_dash_queue.QUEUED, open_dash_queue.RUNNING]
+
+    def clear_cache_entry(self, key):
+        self.store.delete(key)
+
+    def get_progress(self, key):
+        progress = self.store.get(self._make_progress_key(key))
+        if progress is None:
+            return None
+
+        self.store.delete(self._make_progress_key(key))
+        return json.loads(progress)
+
+    def result_ready(self, key):
+        return self.store.get(key) is not None
+
+    def get_result(self, key, job):
+        result = self.store.get(key)
+        if result is None:
+            return self.UNDEFINED
+
+        # Results are kept for later requests with the same inputs only when caching is enabled.
+        if self.cache_by is None:
+            self.clear_cache_entry(key)
+        self.clear_cache_entry(self._make_progress_key(key))
+
+        self.terminate_job(job)
+        return json.loads(result)
+
+    def get_updated_props(self, key):
+        updated_props = self.store.get(self._make_set_props_key(key))
+        if updated_props is None:
+            return {}
+
+        self.clear_cache_entry(self._make_set_props_key(key))
+        return json.loads(updated_props)
+
+    def run(self, message):
+        """
+        Runs a job received from the queue. Returns whether it ran, i.e. was not cancelled while queued.
+        """
+        return self.jobs.run(message)
+
+    def __run(self, message):
+        job_fn = self.func_registry[message['function']]
+        key, args = message['key'], message['args']
+
+        def set_progress(progress):
+            if not isinstance(progress, (list, tuple)):
+                progress = [progress]
+            self.store.set(self._make_progress_key(key), json.dumps(progress, cls=PlotlyJSONEncoder))
+
+        def set_props(component_id, props):
+            self.store.set(self._make_set_props_key(key), json.dumps({component_id: props}, cls=PlotlyJSONEncoder))
+
+        def run():
+            callback_context = AttributeDict(**message['context'])
+            callback_context.ignore_register_page = False
+            callback_context.updated_props = ProxySetProps(set_props)
+            context_value.set(callback_context)
+
+            progress = [set_progress] if job_fn.progress else []
+            try:
+                if isinstance(args, dict):
+                    result = job_fn.fn(*progress, **args)
+                elif isinstance(args, (list, tuple)):
+                    result = job_fn.fn(*progress, *args)
+                else:
+                    result = job_fn.fn(*progress, args)
+            except PreventUpdate:
+                result = {'_dash_no_update': '_dash_no_update'}
+            except Exception as error:
+                result = {'long_callback_error': {'msg': str(error), 'tb': traceback.format_exc()}}
+
+            self.store.set(key, json.dumps(result, cls=PlotlyJSONEncoder))
+
+        copy_context().run(run)
+
+    def __discard(self, message):
+        for key in [message['key'], self._make_progress_key(message['key']), self._make_set_props_key(message['key'])]:
+            self.clear_cache_entry(key)
+
+
+def install(app):
+    """
+    Gives the app a QueueCallbackManager unless it has a background callback manager of another kind, and makes it the
+    manager that worker_handler runs jobs with. Raises RuntimeError when the manager would run on the local queue or the
+    memory store without OPEN_DASH_BACKGROUND_QUEUE and OPEN_DASH_BACKGROUND_STORE choosing them.
+    """
+    global manager
+    if app._background_manager is None:
+        app._background_manager = QueueCallbackManager()
+
+    if not isinstance(app._background_manager, QueueCallbackManager):
+        return
+
+    if app._background_manager.is_local() and not open_dash_queue.CONFIGURED:
+        raise RuntimeError(
+            'The app has background callbacks, but OPEN_DASH_BACKGROUND_QUEUE and OPEN_DASH_BACKGROUND_STORE are not '
+            'set. The local queue and the memory store only work within one process, such as open-dash serve. Set them '
+            'to an SQS queue or a directory, and to an S3 prefix or a shared directory.'
+        )
+
+    manager = app._background_manager
+
+
+def handle(event):
+    """
+    Runs the jobs in a worker function event: a batch of SQS messages, a single job invoked directly, or, with the file
+    queue, an empty event that drains the queue.
+    """
+    if manager is None:
+        raise RuntimeError('The app does not use a QueueCallbackManager for its background callbacks.')
+
+    if 'Records' in event:
+        messages = [json.loads(record['body']) for record in event['Records']]
+    elif 'job' in event:
+        messages = [event]
+    elif isinstance(manager.jobs.queue, open_dash_queue.FileQueue):
+        messages = manager.jobs.queue.receive()
+    else:
+        messages = []
+
+    return {'jobs': sum(1 for message in messages if manager.run(message))}
@@ -0,0 +1,190 @@
+"""
+Runtime helpers for loading the bundled .open-dash/data content from inside the server function. Datasets are cached
+process-wide in a byte-bounded LRU so warm invocations reuse them, and the cache is keyed on the data manifest version
+written by the bundler so a data-triggered deployment invalidates stale entries.
+
+Usage from app.py:
+
+    from open_dash_data import load
+
+    frame = load('sales.arrow').to_pandas()
+"""
+from collections import OrderedDict
+import json
+import os
+import sys
+import threading
+import time
+
+
+MANIFEST_FILE = 'open-dash.data.json'
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+def _candidate_roots():
+    if os.environ.get('OPEN_DASH_DATA_PATH'):
+        yield os.environ['OPEN_DASH_DATA_PATH']
+
+    module_path = os.path.dirname(os.path.realpath(__file__))
+    # The data bundle is either copied next to the function code or left in its .open-dash/data sibling directory.
+    yield os.path.join(module_path, 'data')
+    yield os.path.join(module_path, '..', '..', 'data')
+
+
+def data_root():
+    for root in _candidate_roots():
+        if os.path.isdir(root):
+            return os.path.abspath(root)
+
+    raise FileNotFoundError('OpenDash data bundle not found. Set the OPEN_DASH_DATA_PATH environment variable.')
+
+
+def data_path(*parts):
+    return os.path.join(data_root(), *parts)
+
+
+def _load_arrow(path):
+    import pyarrow
+
+    source = pyarrow.memory_map(path, 'r')
+    try:
+        return pyarrow.ipc.open_file(source).read_all()
+    except pyarrow.ArrowInvalid:
+        # Arrow IPC streams (as opposed to files) do not have a footer and must be read sequentially.
+        source.seek(0)
+        return pyarrow.ipc.open_stream(source).read_all()
+
+
+def _load_parquet(path):
+    import pyarrow.parquet
+
+    return pyarrow.parquet.read_table(path, memory_map=True)
+
+
+def _load_numpy(path):
+    import numpy
+
+    return numpy.load(path, mmap_mode='r', allow_pickle=False)
+
+
+LOADERS = {
+    '.arrow': _load_arrow,
+    '.feather': _load_arrow,
+    '.ipc': _load_arrow,
+    '.parquet': _load_parquet,
+    '.npy': _load_numpy,
+    '.npz': _load_numpy,
+}
+
+
+def _estimate_bytes(value, path):
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return sys.getsizeof(value)
+
+
+class DatasetCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__total_bytes = 0
+        self.__version = None
+        self.__manifest_mtime = None
+        self.__stats = {}
+
+    def manifest_version(self):
+        """
+        Returns the version recorded in the data manifest. The manifest is only re-read when its modification time
+        changes, so checking the version on every load costs a single stat call.
+        """
+        path = data_path(MANIFEST_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return ''
+
+        if mtime != self.__manifest_mtime:
+            with open(path, 'r') as file:
+                self.__version = json.load(file).get('version', '')
+            self.__manifest_mtime = mtime
+
+        return self.__version
+
+    def get(self, name, loader=None):
+        version = self.manifest_version()
+        key = (version, name)
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.__stats[name]['hits'] += 1
+                return self.__entries[key][0]
+
+            stale = [entry for entry in self.__entries if entry[0] != version]
+            for entry in stale:
+                self.__evict(entry)
+
+        path = data_path(name)
+        if loader is None:
+            extension = os.path.splitext(name)[1].lower()
+            if extension not in LOADERS:
+                raise ValueError(f'No loader registered for {name}. Pass a loader callable instead.')
+            loader = LOADERS[extension]
+
+        start = time.perf_counter()
+        value = loader(path)
+        duration = time.perf_counter() - start
+        size = _estimate_bytes(value, path)
+
+        with self.__lock:
+            stats = self.__stats.setdefault(name, {'loads': 0, 'hits': 0, 'seconds': 0.0, 'bytes': 0})
+            stats['loads'] += 1
+            stats['seconds'] += duration
+            stats['bytes'] = size
+
+            if key not in self.__entries:
+                self.__entries[key] = (value, size)
+                self.__total_bytes += size
+            while self.__total_bytes > self.max_bytes and len(self.__entries) > 1:
+                self.__evict(next(iter(self.__entries)))
+
+        if os.environ.get('OPEN_DASH_DATA_LOG_LOADS') == '1':
+            print(json.dumps({'dataset': name, 'version': version, 'seconds': round(duration, 4), 'bytes': size}))
+
+        return value
+
+    def stats(self):
+        with self.__lock:
+            return {name: dict(stats) for name, stats in self.__stats.items()}
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__total_bytes = 0
+
+    def __evict(self, key):
+        _, size = self.__entries.pop(key)
+        self.__total_bytes -= size
+
+
+cache = DatasetCache(int(os.environ.get('OPEN_DASH_DATA_CACHE_BYTES', DEFAULT_CACHE_BYTES)))
+
+
+def load(name, loader=None):
+    """
+    Loads a dataset relative to the data bundle root. Arrow, Parquet and NumPy files are memory-mapped by default; pass
+    a loader callable that accepts the resolved path for any other format.
+    """
+    return cache.get(name, loader)
+
+
+def load_stats():
+    """
+    Returns per-dataset load counts, cache hits, cumulative load time in seconds and the cached size in bytes.
+    """
+    return cache.stats()
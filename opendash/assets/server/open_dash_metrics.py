@@ -0,0 +1,169 @@
+"""
+Per-request metrics for the server function, written to stdout as CloudWatch Embedded Metric Format (EMF) JSON lines.
+CloudWatch Logs turns each line into metrics without any API calls from the function, and the line stays searchable
+in Logs Insights, e.g. to find the slowest callbacks.
+
+Metrics are off unless OPEN_DASH_METRICS is set to 1. When they are off, start() returns None without reading the
+request, so the handler pays for a single attribute lookup.
+
+    OPEN_DASH_METRICS=1                 Turns metrics on.
+    OPEN_DASH_METRICS_SAMPLE_RATE=0.1   The fraction of requests to record. Cold starts are always recorded.
+    OPEN_DASH_METRICS_NAMESPACE=MyApp   The CloudWatch namespace. Defaults to OpenDash.
+"""
+import json
+import os
+import random
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+ENABLED = os.environ.get('OPEN_DASH_METRICS') == '1'
+SAMPLE_RATE = float(os.environ.get('OPEN_DASH_METRICS_SAMPLE_RATE', '1'))
+NAMESPACE = os.environ.get('OPEN_DASH_METRICS_NAMESPACE', 'OpenDash')
+
+UNITS = {
+    'ColdStart': 'Count',
+    'InitDuration': 'Milliseconds',
+    'CreateAppDuration': 'Milliseconds',
+    'WsgiDuration': 'Milliseconds',
+    'ResponseBytes': 'Bytes',
+    'DataCacheHits': 'Count',
+    'DataCacheMisses': 'Count',
+    'MaxRss': 'Megabytes',
+}
+
+_module_loaded_at = time.perf_counter()
+_init_seconds = None
+_cold = True
+
+
+def initialized():
+    """
+    Marks the end of the function's init phase. index.py calls it once its imports, including app.py, are done.
+    """
+    global _init_seconds
+    _init_seconds = time.perf_counter() - _module_loaded_at
+
+
+def _data_cache_totals():
+    # The data helpers are only counted if the app imported them. Importing them here would cost the app memory.
+    data = sys.modules.get('open_dash_data')
+    if data is None:
+        return None
+
+    stats = data.load_stats().values()
+    return sum(entry['hits'] for entry in stats), sum(entry['loads'] for entry in stats)
+
+
+def _max_rss_megabytes():
+    if resource is None:
+        return None
+
+    # ru_maxrss is in KiB on Linux, which is what Lambda runs.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _callback_id(event):
+    if not event['requestContext']['http']['path'].endswith('_dash-update-component'):
+        return None
+
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        import base64
+        body = base64.b64decode(body)
+
+    try:
+        return json.loads(body).get('output')
+    except (ValueError, AttributeError):
+        return None
+
+
+def _response_bytes(response):
+    body = response.get('body') or ''
+    if response.get('isBase64Encoded'):
+        # Four base64 characters encode three bytes.
+        return len(body) * 3 // 4 - body[-2:].count('=')
+
+    return len(body.encode('UTF-8')) if isinstance(body, str) else len(body)
+
+
+class RequestMetrics:
+    def __init__(self, event, cold_start):
+        self.__event = event
+        self.__cold_start = cold_start
+        self.__started_at = time.perf_counter()
+        self.__data_cache_before = _data_cache_totals()
+        self.__values = {'ColdStart': int(cold_start)}
+
+    def record(self, name, value):
+        self.__values[name] = value
+
+    def time(self, name, function, *args):
+        """
+        Calls function with args and records its duration in milliseconds under name.
+        """
+        started_at = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.__values[name] = round((time.perf_counter() - started_at) * 1000, 3)
+
+    def emit(self, response):
+        http = self.__event['requestContext']['http']
+        values = dict(self.__values)
+        if self.__cold_start and _init_seconds is not None:
+            values['InitDuration'] = round(_init_seconds * 1000, 3)
+
+        values['ResponseBytes'] = _response_bytes(response)
+        data_cache_after = _data_cache_totals()
+        if data_cache_after is not None:
+            hits_before, loads_before = self.__data_cache_before or (0, 0)
+            values['DataCacheHits'] = data_cache_after[0] - hits_before
+            values['DataCacheMisses'] = data_cache_after[1] - loads_before
+
+        max_rss = _max_rss_megabytes()
+        if max_rss is not None:
+            values['MaxRss'] = max_rss
+
+        # Callbacks are grouped by their output, which is how Dash identifies a callback. Other requests are grouped by
+        # their path.
+        callback = _callback_id(self.__event)
+        dimensions = {'Callback': callback} if callback else {'Route': http['path']}
+        line = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': NAMESPACE,
+                    'Dimensions': [list(dimensions)],
+                    'Metrics': [{'Name': name, 'Unit': UNITS[name]} for name in values if name in UNITS],
+                }],
+            },
+            **dimensions,
+            **values,
+            'Method': http['method'],
+            'Path': http['path'],
+            'StatusCode': int(response.get('statusCode', 200)),
+            'RequestId': self.__event['requestContext'].get('requestId'),
+            'Duration': round((time.perf_counter() - self.__started_at) * 1000, 3),
+        }
+        print(json.dumps(line, separators=(',', ':'), default=str), flush=True)
+
+
+def start(event):
+    """
+    Starts recording a request. Returns None when metrics are off or the request is not sampled.
+    """
+    global _cold
+    if not ENABLED:
+        return None
+
+    cold_start, _cold = _cold, False
+    if not cold_start and random.random() >= SAMPLE_RATE:
+        return None
+
+    return RequestMetrics(event, cold_start)
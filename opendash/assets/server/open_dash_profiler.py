@@ -0,0 +1,161 @@
+"""
+On-demand profiling for the server function. A profiled request is written to a file, and the response carries the
+file's ID in an X-Open-Dash-Profile-Id header, so a slow callback seen in production can be looked at afterwards.
+
+Profiling is off unless OPEN_DASH_PROFILE is set to 1 or a secret is configured. When both are unset, start() returns
+None without reading the request.
+
+    OPEN_DASH_PROFILE=1                     Profiles a sample of requests.
+    OPEN_DASH_PROFILE_SAMPLE_RATE=0.05      The fraction of requests to profile. Defaults to 1.
+    OPEN_DASH_PROFILE_THRESHOLD_MS=500      Keeps only the profiles of sampled requests that took at least this long.
+    OPEN_DASH_PROFILE_SECRET=...            Profiles any request with an X-Open-Dash-Profile header set to the secret.
+    OPEN_DASH_PROFILE_MODE=sample           "sample" writes collapsed stacks from a low-overhead stack sampler, and
+                                            "cprofile" writes cProfile stats that pstats and snakeviz read.
+    OPEN_DASH_PROFILE_INTERVAL_MS=5         How often the stack sampler looks at the request's stack.
+    OPEN_DASH_PROFILE_DIR=/tmp/...          Where profiles are written. Defaults to /tmp/open-dash-profiles.
+    OPEN_DASH_PROFILE_BUCKET=my-bucket      Also uploads profiles to this S3 bucket, under OPEN_DASH_PROFILE_PREFIX.
+"""
+from collections import Counter
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+
+ENABLED = os.environ.get('OPEN_DASH_PROFILE') == '1'
+SECRET = os.environ.get('OPEN_DASH_PROFILE_SECRET', '')
+SAMPLE_RATE = float(os.environ.get('OPEN_DASH_PROFILE_SAMPLE_RATE', '1'))
+THRESHOLD_MS = float(os.environ.get('OPEN_DASH_PROFILE_THRESHOLD_MS', '0'))
+MODE = os.environ.get('OPEN_DASH_PROFILE_MODE', 'sample')
+INTERVAL_MS = float(os.environ.get('OPEN_DASH_PROFILE_INTERVAL_MS', '5'))
+DIRECTORY = os.environ.get('OPEN_DASH_PROFILE_DIR', '/tmp/open-dash-profiles')
+BUCKET = os.environ.get('OPEN_DASH_PROFILE_BUCKET', '')
+PREFIX = os.environ.get('OPEN_DASH_PROFILE_PREFIX', 'open-dash-profiles/')
+
+REQUEST_HEADER = 'x-open-dash-profile'
+RESPONSE_HEADER = 'X-Open-Dash-Profile-Id'
+
+
+class StackSampler:
+    """
+    Records the stack of one thread every interval from a background thread. Unlike cProfile, the profiled code runs
+    at full speed, and the result is in the collapsed format that flame graph tools read.
+    """
+    def __init__(self, thread_id, interval):
+        self.__thread_id = thread_id
+        self.__interval = interval
+        self.__stacks = Counter()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        self.__thread.start()
+
+    def stop(self):
+        self.__stopped.set()
+        self.__thread.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.__stacks.most_common())
+
+    def __run(self):
+        while not self.__stopped.wait(self.__interval):
+            frame = sys._current_frames().get(self.__thread_id)
+            if frame is not None:
+                self.__stacks[collapse(frame)] += 1
+
+
+def collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ','))
+        frame = frame.f_back
+
+    return ';'.join(reversed(names))
+
+
+class Profile:
+    def __init__(self, event, forced):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:12]}"
+        self.__event = event
+        self.__forced = forced
+
+    def run(self, function, *args):
+        """
+        Calls function with args under the profiler. The profile is kept if it was requested with the secret or the
+        call took at least the threshold, in which case its ID is added to the response headers.
+        """
+        if MODE == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            started_at = time.perf_counter()
+            try:
+                response = profiler.runcall(function, *args)
+            finally:
+                milliseconds = (time.perf_counter() - started_at) * 1000
+        else:
+            profiler = StackSampler(threading.get_ident(), INTERVAL_MS / 1000)
+            started_at = time.perf_counter()
+            profiler.start()
+            try:
+                response = function(*args)
+            finally:
+                profiler.stop()
+                milliseconds = (time.perf_counter() - started_at) * 1000
+
+        if self.__forced or milliseconds >= THRESHOLD_MS:
+            location = self.__write(profiler)
+            response.setdefault('headers', {})[RESPONSE_HEADER] = self.id
+            http = self.__event['requestContext']['http']
+            print(json.dumps({
+                'profileId': self.id,
+                'method': http['method'],
+                'path': http['path'],
+                'duration': round(milliseconds, 3),
+                'location': location,
+            }, separators=(',', ':')), flush=True)
+
+        return response
+
+    def __write(self, profiler):
+        os.makedirs(DIRECTORY, exist_ok=True)
+        if MODE == 'cprofile':
+            path = os.path.join(DIRECTORY, f'{self.id}.pstats')
+            profiler.dump_stats(path)
+        else:
+            path = os.path.join(DIRECTORY, f'{self.id}.folded')
+            with open(path, 'w') as file:
+                file.write(profiler.collapsed())
+
+        if not BUCKET:
+            return path
+
+        # boto3 ships with the Lambda Python runtime. It is only imported when profiles are uploaded.
+        import boto3
+        key = f'{PREFIX}{os.path.basename(path)}'
+        boto3.client('s3').upload_file(path, BUCKET, key)
+        return f's3://{BUCKET}/{key}'
+
+
+def start(event):
+    """
+    Decides whether to profile a request. Returns None when profiling is off or the request is not sampled.
+    """
+    if not ENABLED and not SECRET:
+        return None
+
+    headers = event.get('headers') or {}
+    if SECRET and REQUEST_HEADER in headers:
+        # The header is removed so the secret never reaches the app or its logs.
+        if hmac.compare_digest(headers.pop(REQUEST_HEADER).encode('UTF-8'), SECRET.encode('UTF-8')):
+            return Profile(event, forced=True)
+
+    if ENABLED and random.random() < SAMPLE_RATE:
+        return Profile(event, forced=False)
+
+    return None
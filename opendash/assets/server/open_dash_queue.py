@@ -0,0 +1,234 @@
+"""
+Job queues and result stores for background callbacks. The request function submits a job and returns at once, a
+worker runs it and writes its progress and result to the store, and the request function reads them when the browser
+polls. The queue and the store are chosen by URL:
+
+    OPEN_DASH_BACKGROUND_QUEUE=local        Runs jobs on a thread of the process that submits them. For open-dash
+                                            serve and tests only, because Lambda freezes a function between requests.
+    OPEN_DASH_BACKGROUND_QUEUE=file:/path   Writes jobs to a directory, which index.worker_handler drains.
+    OPEN_DASH_BACKGROUND_QUEUE=https://...  Sends jobs to an SQS queue that triggers the worker function.
+    OPEN_DASH_BACKGROUND_STORE=memory       Keeps results in the process. Only works with the local queue.
+    OPEN_DASH_BACKGROUND_STORE=file:/path   Keeps results in a directory, e.g. on an EFS mount shared by both functions.
+    OPEN_DASH_BACKGROUND_STORE=s3://b/p     Keeps results in an S3 bucket under a prefix.
+
+The module does not depend on Dash. open_dash_background adapts it to Dash's background callback manager.
+"""
+import json
+import os
+import threading
+import uuid
+
+
+QUEUE = os.environ.get('OPEN_DASH_BACKGROUND_QUEUE', 'local')
+STORE = os.environ.get('OPEN_DASH_BACKGROUND_STORE', 'memory')
+# The defaults only work within one process, so the server function has to choose its queue and store.
+CONFIGURED = 'OPEN_DASH_BACKGROUND_QUEUE' in os.environ and 'OPEN_DASH_BACKGROUND_STORE' in os.environ
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+CANCELLED = 'cancelled'
+
+
+class MemoryStore:
+    def __init__(self):
+        self.__values = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            return self.__values.get(key)
+
+    def set(self, key, value):
+        with self.__lock:
+            self.__values[key] = value
+
+    def delete(self, key):
+        with self.__lock:
+            self.__values.pop(key, None)
+
+
+class FileStore:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        try:
+            with open(self.__path(key), 'r', encoding='UTF-8') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        # Readers in other processes only ever see complete values.
+        temporary_path = f'{self.__path(key)}.{uuid.uuid4().hex}.tmp'
+        with open(temporary_path, 'w', encoding='UTF-8') as file:
+            file.write(value)
+        os.replace(temporary_path, self.__path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.__path(key))
+        except FileNotFoundError:
+            pass
+
+    def __path(self, key):
+        return os.path.join(self.directory, key.replace('/', '_'))
+
+
+class S3Store:
+    def __init__(self, bucket, prefix=''):
+        # boto3 ships with the Lambda Python runtime. It is only imported when results are kept in S3.
+        import boto3
+        self.__client = boto3.client('s3')
+        self.__bucket = bucket
+        self.__prefix = prefix
+
+    def get(self, key):
+        try:
+            response = self.__client.get_object(Bucket=self.__bucket, Key=f'{self.__prefix}{key}')
+        except self.__client.exceptions.NoSuchKey:
+            return None
+        return response['Body'].read().decode('UTF-8')
+
+    def set(self, key, value):
+        self.__client.put_object(Bucket=self.__bucket, Key=f'{self.__prefix}{key}', Body=value.encode('UTF-8'))
+
+    def delete(self, key):
+        self.__client.delete_object(Bucket=self.__bucket, Key=f'{self.__prefix}{key}')
+
+
+class LocalQueue:
+    """
+    Runs each job on a new thread of the submitting process. The handler is set by whoever runs the jobs.
+    """
+    def __init__(self):
+        self.handler = None
+
+    def send(self, message):
+        threading.Thread(target=self.handler, args=(message,), daemon=True).start()
+
+
+class FileQueue:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, message):
+        name = f"{message['job']}.json"
+        temporary_path = os.path.join(self.directory, f'.{name}')
+        with open(temporary_path, 'w', encoding='UTF-8') as file:
+            json.dump(message, file)
+        os.replace(temporary_path, os.path.join(self.directory, name))
+
+    def receive(self):
+        """
+        Yields the queued messages, oldest first. A message is claimed by renaming it, so each one is received once
+        even when several workers drain the directory.
+        """
+        names = [name for name in os.listdir(self.directory) if name.endswith('.json') and not name.startswith('.')]
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(self.directory, name)))
+        for name in names:
+            claimed_path = os.path.join(self.directory, f'{name}.claimed')
+            try:
+                os.rename(os.path.join(self.directory, name), claimed_path)
+            except FileNotFoundError:
+                continue
+
+            with open(claimed_path, 'r', encoding='UTF-8') as file:
+                message = json.load(file)
+            os.remove(claimed_path)
+            yield message
+
+
+class SqsQueue:
+    def __init__(self, url):
+        import boto3
+        self.__client = boto3.client('sqs')
+        self.__url = url
+
+    def send(self, message):
+        self.__client.send_message(QueueUrl=self.__url, MessageBody=json.dumps(message))
+
+
+def store_from_url(url):
+    if url == 'memory':
+        return MemoryStore()
+    if url.startswith('file:'):
+        return FileStore(url[len('file:'):])
+    if url.startswith('s3://'):
+        bucket, _, prefix = url[len('s3://'):].partition('/')
+        return S3Store(bucket, f"{prefix.rstrip('/')}/" if prefix else '')
+
+    raise ValueError(f'Unsupported background callback store: {url}')
+
+
+def queue_from_url(url):
+    if url == 'local':
+        return LocalQueue()
+    if url.startswith('file:'):
+        return FileQueue(url[len('file:'):])
+    if url.startswith('https://'):
+        return SqsQueue(url)
+
+    raise ValueError(f'Unsupported background callback queue: {url}')
+
+
+class Jobs:
+    """
+    Tracks the status of each job in the store, next to its result, so that any function can tell whether a job is
+    still queued or running. run is called with the message of each job, and discard with the message of a job that
+    was terminated while it ran, whose result nobody will read.
+    """
+    def __init__(self, queue, store, run, discard=None):
+        self.queue = queue
+        self.store = store
+        self.__run = run
+        self.__discard = discard
+        if isinstance(queue, LocalQueue):
+            queue.handler = self.run
+
+    def submit(self, message):
+        job = uuid.uuid4().hex
+        self.store.set(self.__status_key(job), QUEUED)
+        self.queue.send({**message, 'job': job})
+        return job
+
+    def status(self, job):
+        return self.store.get(self.__status_key(job))
+
+    def terminate(self, job):
+        """
+        Cancels a job that is queued or running, or forgets a finished one once its result was read. A running job
+        cannot be stopped, but its result is discarded.
+        """
+        if self.status(job) in [QUEUED, RUNNING]:
+            self.store.set(self.__status_key(job), CANCELLED)
+        else:
+            self.store.delete(self.__status_key(job))
+
+    def run(self, message):
+        """
+        Runs a job unless it was cancelled while queued. Returns whether it ran.
+        """
+        job = message['job']
+        if self.status(job) == CANCELLED:
+            self.store.delete(self.__status_key(job))
+            return False
+
+        self.store.set(self.__status_key(job), RUNNING)
+        try:
+            self.__run(message)
+        finally:
+            if self.status(job) == CANCELLED:
+                self.store.delete(self.__status_key(job))
+                if self.__discard:
+                    self.__discard(message)
+            else:
+                # The result is written before the status changes, so a poll never sees a finished job without one.
+                self.store.set(self.__status_key(job), DONE)
+        return True
+
+    def __status_key(self, job):
+        return f'job-{job}-status'
@@ -0,0 +1,191 @@
+"""
+Encodes the numeric arrays of Plotly figures in JSON payloads as typed arrays: a dtype and the array's little-endian
+bytes in base64, e.g. {"dtype": "f8", "bdata": "AAAAAAAA8D8..."}, plus a shape for 2D arrays. plotly.js 2.28 and later
+decode them. A float takes under 11 characters instead of up to 24 decimal digits, and small integers take one or two
+characters, so payloads shrink and the browser has fewer numbers to parse.
+
+Only arrays of the traces of figure props are encoded, and only when they are homogeneous, numeric and at least
+MIN_LENGTH elements long. Layouts keep their arrays, because some layout attributes do not accept typed arrays.
+Integers get the smallest integer dtype that holds them, and everything else is encoded as f8, so no value changes.
+Nulls in numeric arrays become NaN, which plotly.js treats as a gap, like null.
+
+The assets bundler encodes exported payloads when typed-arrays is enabled. The server function encodes the responses
+of _dash-layout and _dash-update-component when OPEN_DASH_TYPED_ARRAYS is set to 1:
+
+    OPEN_DASH_TYPED_ARRAYS=1                    Turns encoding on.
+    OPEN_DASH_TYPED_ARRAYS_MIN_LENGTH=100       The length of the shortest array to encode.
+
+Encoding needs NumPy in the app's environment. It is only imported once encoding is turned on, so server functions
+that leave OPEN_DASH_TYPED_ARRAYS unset do not import it during init.
+"""
+import base64
+import json
+import os
+
+
+ENABLED = os.environ.get('OPEN_DASH_TYPED_ARRAYS') == '1'
+MIN_LENGTH = int(os.environ.get('OPEN_DASH_TYPED_ARRAYS_MIN_LENGTH', '100'))
+
+MIN_PLOTLYJS_VERSION = (2, 28)
+ENCODED_PATHS = ('_dash-layout', '_dash-update-component')
+
+# The integer dtypes plotly.js decodes, smallest first. Integers beyond them are encoded as f8 while that is exact.
+INTEGER_DTYPES = ['i1', 'u1', 'i2', 'u2', 'i4', 'u4']
+MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+
+
+def unsupported_reason():
+    """
+    Returns why payloads cannot be encoded in this environment, or None if they can.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return 'NumPy is not installed'
+
+    try:
+        from plotly.offline import get_plotlyjs_version
+    except ImportError:
+        return 'plotly is not installed'
+
+    version = tuple(int(part) for part in get_plotlyjs_version().split('.')[:2])
+    if version < MIN_PLOTLYJS_VERSION:
+        return f'plotly.js {get_plotlyjs_version()} does not decode typed arrays'
+
+    return None
+
+
+def is_exact_number(value):
+    return value is None or (type(value) in (int, float) and abs(value) <= MAX_EXACT_FLOAT_INTEGER)
+
+
+def encode_array(values, min_length):
+    """
+    Returns the typed array spec of a list of numbers, or of a rectangular list of lists of numbers, or None if the list
+    is too short or holds anything else.
+    """
+    import numpy
+
+    if len(values) == 0 or isinstance(values[0], (str, bool, dict)):
+        return None
+
+    try:
+        array = numpy.asarray(values)
+    except ValueError:
+        # Ragged lists of lists.
+        return None
+
+    if array.size < min_length or array.ndim > 2:
+        return None
+
+    kind = array.dtype.kind
+    if kind in 'iu':
+        low, high = array.min(), array.max()
+        dtype = next(
+            (dtype for dtype in INTEGER_DTYPES if numpy.iinfo(dtype).min <= low and high <= numpy.iinfo(dtype).max),
+            None,
+        )
+        if dtype is None and max(abs(int(low)), abs(int(high))) <= MAX_EXACT_FLOAT_INTEGER:
+            dtype = 'f8'
+    elif kind == 'f':
+        dtype = 'f8'
+    elif kind == 'O' and array.ndim == 1 and all(is_exact_number(value) for value in values):
+        # Nulls, or integers too large for int64.
+        array = numpy.array(values, dtype='f8')
+        dtype = 'f8'
+    else:
+        # Booleans, strings and mixed lists.
+        return None
+
+    if dtype is None:
+        return None
+
+    spec = {
+        'dtype': dtype,
+        'bdata': base64.b64encode(array.astype(numpy.dtype(dtype).newbyteorder('<')).tobytes()).decode('ascii'),
+    }
+    if array.ndim > 1:
+        spec['shape'] = ','.join(str(size) for size in array.shape)
+    return spec
+
+
+def encode_trace(value, min_length):
+    """
+    Encodes the arrays of a trace in place, including those of nested objects such as marker and dimensions. Returns
+    the number of arrays encoded.
+    """
+    encoded = 0
+    items = value.items() if isinstance(value, dict) else enumerate(value)
+    for key, item in list(items):
+        if isinstance(item, list) and item and not isinstance(item[0], dict):
+            spec = encode_array(item, min_length)
+            if spec is not None:
+                value[key] = spec
+                encoded += 1
+        elif isinstance(item, (dict, list)):
+            encoded += encode_trace(item, min_length)
+
+    return encoded
+
+
+def encode_figures(value, min_length):
+    """
+    Encodes the traces of every figure prop in a payload in place, e.g. in _dash-layout's component tree or in a
+    callback response. Returns the number of arrays encoded.
+    """
+    encoded = 0
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == 'figure' and isinstance(item, dict) and isinstance(item.get('data'), list):
+                encoded += encode_trace(item['data'], min_length)
+                for frame in item.get('frames') or []:
+                    if isinstance(frame, dict) and isinstance(frame.get('data'), list):
+                        encoded += encode_trace(frame['data'], min_length)
+            else:
+                encoded += encode_figures(item, min_length)
+    elif isinstance(value, list):
+        for item in value:
+            encoded += encode_figures(item, min_length)
+
+    return encoded
+
+
+def encode_payload(body, min_length=MIN_LENGTH):
+    """
+    Returns a JSON payload with the arrays of its figures encoded, or the payload as it is if it has none to encode.
+    """
+    # Payloads without figures are left alone without parsing them.
+    if b'"figure"' not in body:
+        return body
+
+    payload = json.loads(body)
+    if encode_figures(payload, min_length) == 0:
+        return body
+
+    return json.dumps(payload, separators=(',', ':')).encode('UTF-8')
+
+
+def install(app):
+    """
+    Encodes the JSON responses of _dash-layout and _dash-update-component when OPEN_DASH_TYPED_ARRAYS is set to 1. The
+    hook is added after Dash's own, so it runs before Flask-Compress compresses the response.
+    """
+    if not ENABLED:
+        return
+
+    reason = unsupported_reason()
+    if reason is not None:
+        print(f'OPEN_DASH_TYPED_ARRAYS is set, but responses are not encoded: {reason}.')
+        return
+
+    from flask import request
+
+    @app.server.after_request
+    def encode_response(response):
+        if (
+            request.path.endswith(ENCODED_PATHS)
+            and response.mimetype == 'application/json'
+            and not response.direct_passthrough
+        ):
+            response.set_data(encode_payload(response.get_data()))
+        return response
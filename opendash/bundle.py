@@ -1,12 +1,46 @@
+import contextlib
+import dataclasses
 import glob
+import json
 import os
 import shutil
 import subprocess
 import sys
+import tempfile
+import time
+from typing import Callable, ContextManager, Optional
 
+from opendash import cache, report
+from opendash.assets.open_dash_stages import Stage, StageTiming, run_stages
 from opendash.config import Config
 
 
+# Modules the assets bundler imports. They are copied next to the app and removed once bundling completes.
+BUNDLER_MODULES = [
+  'assets_bundler.py',
+  'open_dash_output.py',
+  'open_dash_callbacks.py',
+  'open_dash_html.py',
+  'open_dash_images.py',
+  'open_dash_prerender.py',
+  'open_dash_stages.py',
+]
+
+# Modules the server function runs with. They are copied next to the app and shipped in the bundle.
+SERVER_MODULES = [
+  'index.py',
+  'open_dash_background.py',
+  'open_dash_data.py',
+  'open_dash_metrics.py',
+  'open_dash_profiler.py',
+  'open_dash_queue.py',
+  'open_dash_typed_arrays.py',
+]
+
+# The start and end of each build stage. The assets bundler writes its own stages to a separate file first.
+TIMELINE_FILE = 'open-dash.timeline.json'
+BUNDLER_TIMELINE_FILE = 'open-dash.bundler-timeline.json'
+
 def copy_directory_contents(source: str, target: str, exclude: list[str]) -> None:
   for root, dirs, files in os.walk(source):
     for directory in exclude:
@@ -26,13 +60,13 @@ def add_dependencies_to_requirements(requirements_path: str, dependencies: list[
     file.write(f'\n{dependency_str}\n')
 
 
-def prepare_folders(config: Config) -> dict[str, str]:
+def prepare_folders(config: Config, log: Callable[[str], None] = print) -> dict[str, str]:
   script_path = os.path.dirname(os.path.realpath(__file__))
 
   open_dash_path = os.path.join(config.target_base_path, '.open-dash')
 
   if os.path.exists(open_dash_path):
-    print(f'.open-dash directory already exists in {config.target_base_path}. Removing...')
+    log(f'.open-dash directory already exists in {config.target_base_path}. Removing...')
     shutil.rmtree(open_dash_path)
 
   # Create static, warmer-function, and server-functions/default directories inside .open-dash
@@ -41,11 +75,14 @@ def prepare_folders(config: Config) -> dict[str, str]:
   static_path = os.path.join(open_dash_path, 'static')
   os.makedirs(static_path, exist_ok=True)
   
-  server_functions_path = os.path.join(open_dash_path, 'server-functions', 'default')
-  os.makedirs(server_functions_path, exist_ok=True)
+  # Static-only bundles have no server function, so there is nothing for a warmer to keep warm either.
+  server_functions_path = None
+  if not config.static_only:
+    server_functions_path = os.path.join(open_dash_path, 'server-functions', 'default')
+    os.makedirs(server_functions_path, exist_ok=True)
   
   warmer_function_path = None
-  if config.include_warmer:
+  if config.include_warmer and not config.static_only:
     warmer_function_path = os.path.join(open_dash_path, 'warmer-function')
     os.makedirs(warmer_function_path, exist_ok=True)
   
@@ -65,109 +102,330 @@ def prepare_folders(config: Config) -> dict[str, str]:
   }
 
 
-def install_dependencies(config: Config, paths: dict[str, str]) -> None:
-  # aws-wsgi is used by the lambda handler to serve the Dash app.
-  add_dependencies_to_requirements(
-    os.path.join(paths['server_functions_path'], 'requirements.txt'),
-    ['aws-wsgi>=0.2.7'],
-  )
-
+def install_dependencies(
+  config: Config,
+  paths: dict[str, str],
+  log: Callable[[str], None] = print,
+  pip_cache_dir: Optional[str] = None,
+) -> None:
   pip_path = 'pip3'
   if config.virtualenv_path:
     pip_path = os.path.join(config.virtualenv_path, 'bin', 'pip3')
 
+  # Apps bundled together share a download and wheel cache. A single bundle keeps pip's cache out of the picture.
+  cache_args = ['--cache-dir', pip_cache_dir] if pip_cache_dir else ['--no-cache']
   requirements_path = os.path.join(paths['server_functions_path'], 'requirements.txt')
   result = subprocess.run(
-    [pip_path, '--disable-pip-version-check', 'install', '--no-cache', '-r', requirements_path],
+    [pip_path, '--disable-pip-version-check', 'install', *cache_args, '-r', requirements_path],
     text=True,
     env=os.environ,
     capture_output=True,
   )
-  print(result.stdout)
+  log(result.stdout)
   if result.returncode != 0:
-    print(result.stderr)
+    log(result.stderr)
     sys.exit(1)
 
 
-def bundle_react_assets(config: Config, paths: dict[str, str]) -> None:
-  os.environ['OPEN_DASH_DOMAIN_NAME'] = config.domain_name
-  os.environ['OPEN_DASH_STATIC_PATH'] = paths['static_path']
-  os.environ['OPEN_DASH_FINGERPRINT_METHOD'] = config.fingerprint.method.value
-  os.environ['OPEN_DASH_EXPORT_STATIC'] = '1' if config.export_static else '0'
-  os.environ['OPEN_DASH_SERVER_FUNCTIONS_PATH'] = paths['server_functions_path']
-  os.environ['OPEN_DASH_INCLUDE_FINGERPRINT_VERSION'] = '1' if config.fingerprint.include_version else '0'
-  if config.include_warmer:
-    os.environ['OPEN_DASH_WARMER_FUNCTION_PATH'] = paths['warmer_function_path']
+def bundler_env(config: Config, paths: dict[str, str]) -> dict[str, str]:
+  """
+  Returns the environment of the assets bundler. The configuration is passed in OPEN_DASH_* variables on top of the
+  current environment, which is left unchanged so that several apps can be bundled from one process.
+  """
+  env = {key: value for key, value in os.environ.items() if not key.startswith('OPEN_DASH_')}
+  env['OPEN_DASH_DOMAIN_NAME'] = config.domain_name
+  env['OPEN_DASH_STATIC_PATH'] = paths['static_path']
+  env['OPEN_DASH_FINGERPRINT_METHOD'] = config.fingerprint.method.value
+  env['OPEN_DASH_EXPORT_STATIC'] = '1' if config.export_static else '0'
+  env['OPEN_DASH_BUNDLE_SCRIPTS'] = '1' if config.bundle_scripts else '0'
+  env['OPEN_DASH_INLINE_PAYLOADS'] = '1' if config.inline_payloads else '0'
+  env['OPEN_DASH_PRERENDER'] = '1' if config.prerender else '0'
+  env['OPEN_DASH_SERVICE_WORKER'] = '1' if config.service_worker else '0'
+  env['OPEN_DASH_CLIENT_PATH'] = os.path.join(paths['script_path'], 'assets', 'client')
+  env['OPEN_DASH_STATIC_ONLY'] = '1' if config.static_only else '0'
+  env['OPEN_DASH_ALLOW_SERVER_CALLBACKS'] = '1' if config.allow_server_callbacks else '0'
+  env['OPEN_DASH_CLOUD_FRONT_BEHAVIOR_QUOTA'] = str(config.cloud_front_behavior_quota)
+  env['OPEN_DASH_INCLUDE_FINGERPRINT_VERSION'] = '1' if config.fingerprint.include_version else '0'
+  env['OPEN_DASH_CACHE_CONTROL'] = json.dumps(dataclasses.asdict(config.cache_control))
+  env['OPEN_DASH_RESOURCE_HINTS'] = json.dumps(dataclasses.asdict(config.resource_hints))
+  env['OPEN_DASH_PRUNE_COMPONENTS'] = json.dumps(dataclasses.asdict(config.prune_components))
+  env['OPEN_DASH_PLOTLY_BUNDLE'] = json.dumps(dataclasses.asdict(config.plotly_bundle))
+  env['OPEN_DASH_EXPORT_TYPED_ARRAYS'] = json.dumps(dataclasses.asdict(config.typed_arrays))
+  optimize_images = dataclasses.asdict(config.optimize_images)
+  if config.optimize_images.enabled and not config.optimize_images.cache_path:
+    optimize_images['cache_path'] = cache.image_cache_path(config)
+  env['OPEN_DASH_OPTIMIZE_IMAGES'] = json.dumps(optimize_images)
+  env['OPEN_DASH_STATIC_CALLBACKS'] = json.dumps(config.static_callbacks)
+  env['OPEN_DASH_BUILD_WORKERS'] = str(config.build_workers)
+  env['OPEN_DASH_TIMELINE_PATH'] = os.path.join(paths['open_dash_path'], BUNDLER_TIMELINE_FILE)
+  if paths['server_functions_path']:
+    env['OPEN_DASH_SERVER_FUNCTIONS_PATH'] = paths['server_functions_path']
+
+  if paths['warmer_function_path']:
+    env['OPEN_DASH_WARMER_FUNCTION_PATH'] = paths['warmer_function_path']
   
   if config.data_path:
-    os.environ['OPEN_DASH_SOURCE_DATA_PATH'] = paths['data_path']
+    env['OPEN_DASH_SOURCE_DATA_PATH'] = paths['data_path']
   
   if os.path.exists(os.path.join(config.source_path, 'assets')):
-    os.environ['OPEN_DASH_ASSETS_PATH'] = os.path.join(config.source_path, 'assets')
+    env['OPEN_DASH_ASSETS_PATH'] = os.path.join(config.source_path, 'assets')
 
+  return env
+
+
+def run_assets_bundler(
+  config: Config,
+  assets_bundler_path: str,
+  cwd: str,
+  env: dict[str, str],
+  log: Callable[[str], None] = print,
+) -> None:
   python_path = 'python3'
   if config.virtualenv_path:
     python_path = os.path.join(config.virtualenv_path, 'bin', 'python3')
   
-  assets_bundler_path = os.path.join(paths['server_functions_path'], 'assets_bundler.py')
   result = subprocess.run(
     [python_path, assets_bundler_path],
     text=True,
-    env=os.environ,
+    env=env,
     capture_output=True,
-    cwd=paths['server_functions_path'],
+    cwd=cwd,
   )
-  print(result.stdout)
+  log(result.stdout)
   if result.returncode != 0:
-    print(result.stderr)
+    log(result.stderr)
     sys.exit(1)
 
 
-def clean_env_vars() -> None:
-  env_vars = []
-  for key in os.environ:
-    if key.startswith('OPEN_DASH_'):
-      env_vars.append(key)
-  
-  for key in env_vars:
-    del os.environ[key]
+def bundle_react_assets(config: Config, paths: dict[str, str], log: Callable[[str], None] = print) -> None:
+  run_assets_bundler(
+    config,
+    os.path.join(paths['server_functions_path'], 'assets_bundler.py'),
+    paths['server_functions_path'],
+    bundler_env(config, paths),
+    log,
+  )
 
-def create(config: Config) -> None:
-  print(f'Preparing dash bundle from {config.source_path}...')
 
-  paths = prepare_folders(config)
-  
-  # Decostruct the prepare_folders_result dictionary
-  if config.include_warmer:
-    os.makedirs(paths['warmer_function_path'], exist_ok=True)
-    copy_directory_contents(os.path.join(paths['script_path'], 'assets', 'warmer'), paths['warmer_function_path'], [])
+def bundle_static_assets(config: Config, paths: dict[str, str], log: Callable[[str], None] = print) -> None:
+  """
+  Runs the assets bundler against the source directory in the configured environment, for static-only bundles. The
+  bundler modules run from a temporary directory, so neither the source nor the output gets a copy of them.
+  """
+  env = bundler_env(config, paths)
+  env['PYTHONPATH'] = os.pathsep.join(filter(None, [config.source_path, env.get('PYTHONPATH')]))
+  # The app is imported from the source directory, which should not be left with __pycache__ directories.
+  env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+  with tempfile.TemporaryDirectory(prefix='open-dash-bundler-') as bundler_path:
+    for module in BUNDLER_MODULES:
+      shutil.copy2(os.path.join(paths['script_path'], 'assets', module), bundler_path)
+    # The bundler encodes exported payloads with the server function's encoder.
+    shutil.copy2(os.path.join(paths['script_path'], 'assets', 'server', 'open_dash_typed_arrays.py'), bundler_path)
 
+    run_assets_bundler(config, os.path.join(bundler_path, 'assets_bundler.py'), config.source_path, env, log)
+
+
+def copy_warmer(paths: dict[str, str]) -> None:
+  copy_directory_contents(os.path.join(paths['script_path'], 'assets', 'warmer'), paths['warmer_function_path'], [])
+
+
+def copy_source(config: Config, paths: dict[str, str]) -> None:
   # Copy source directory contents into server-functions/default directory, excluding excluded_directories.
   copy_directory_contents(config.source_path, paths['server_functions_path'], config.excluded_directories)
-  shutil.copy2(os.path.join(paths['script_path'], 'assets', 'assets_bundler.py'), paths['server_functions_path'])
-  shutil.copy2(os.path.join(paths['script_path'], 'assets', 'server', 'index.py'), paths['server_functions_path'])
-  shutil.copy2(os.path.join(paths['script_path'], 'assets', 'open_dash_output.py'), paths['server_functions_path'])
+  for module in BUNDLER_MODULES:
+    shutil.copy2(os.path.join(paths['script_path'], 'assets', module), paths['server_functions_path'])
+
+  for module in SERVER_MODULES:
+    shutil.copy2(os.path.join(paths['script_path'], 'assets', 'server', module), paths['server_functions_path'])
   shutil.copy2(
     os.path.join(paths['script_path'], 'assets', 'server', 'Dockerfile.lambda'),
     os.path.join(paths['server_functions_path'], 'Dockerfile'),
   )
 
-  try:
-    print('Installing app dependencies...')
-    install_dependencies(config, paths)
+  # aws-wsgi is used by the lambda handler to serve the Dash app.
+  requirements_path = os.path.join(paths['server_functions_path'], 'requirements.txt')
+  add_dependencies_to_requirements(requirements_path, ['aws-wsgi>=0.2.7'])
+
+
+def copy_data(paths: dict[str, str]) -> None:
+  copy_directory_contents(paths['data_path'], os.path.join(paths['open_dash_path'], 'data'), [])
+
+
+def install_server_dependencies(
+  config: Config,
+  paths: dict[str, str],
+  timings: dict[str, float],
+  log: Callable[[str], None] = print,
+  pip_slot: Optional[ContextManager] = None,
+  pip_cache_dir: Optional[str] = None,
+  build_cache: Optional[cache.BuildCache] = None,
+) -> None:
+  log('Installing app dependencies...')
+  requirements_path = os.path.join(paths['server_functions_path'], 'requirements.txt')
+  phase_started_at = time.monotonic()
+  with pip_slot or contextlib.nullcontext():
+    if pip_slot:
+      timings['pip-wait'] = time.monotonic() - phase_started_at
+      phase_started_at = time.monotonic()
+
+    if build_cache and build_cache.has(cache.install_key(config, requirements_path)):
+      log('Build cache: the environment already has these requirements installed. Skipping pip.')
+    else:
+      install_dependencies(config, paths, log, pip_cache_dir)
+      if build_cache:
+        build_cache.store(cache.install_key(config, requirements_path))
+  timings['install'] = time.monotonic() - phase_started_at
+
+
+def bundle_server_function_assets(config: Config, paths: dict[str, str], log: Callable[[str], None] = print) -> None:
+  log('Bundling React assets...')
+  bundle_react_assets(config, paths, log)
+
+  log('Cleaning up...')
+  for module in BUNDLER_MODULES:
+    os.remove(os.path.join(paths['server_functions_path'], module))
+
+
+def build_stages(
+  config: Config,
+  paths: dict[str, str],
+  timings: dict[str, float],
+  log: Callable[[str], None] = print,
+  pip_slot: Optional[ContextManager] = None,
+  pip_cache_dir: Optional[str] = None,
+  build_cache: Optional[cache.BuildCache] = None,
+) -> list[Stage]:
+  """
+  Returns the phases of the build and what each of them needs first. The assets bundler imports the app, so it waits
+  for the pip install, while the warmer and the data directory are copied in the meantime.
+  """
+  stages = []
+  if paths['data_path']:
+    stages.append(Stage(name='data', run=lambda: copy_data(paths)))
+
+  if config.static_only:
+    def bundle_static() -> None:
+      log('Bundling React assets from the source directory. Static-only bundles have no server function...')
+      bundle_static_assets(config, paths, log)
+
+    # The bundler writes the manifest of the data directory, so the data needs to be in place.
+    stages.append(Stage(name='assets', run=bundle_static, after=[stage.name for stage in stages]))
+    return stages
+
+  if paths['warmer_function_path']:
+    stages.append(Stage(name='warmer', run=lambda: copy_warmer(paths)))
+
+  stages.append(Stage(name='source', run=lambda: copy_source(config, paths)))
+  stages.append(Stage(
+    name='install',
+    run=lambda: install_server_dependencies(config, paths, timings, log, pip_slot, pip_cache_dir, build_cache),
+    after=['source'],
+  ))
+  stages.append(Stage(
+    name='assets',
+    run=lambda: bundle_server_function_assets(config, paths, log),
+    after=['source', 'install'] + (['data'] if paths['data_path'] else []),
+  ))
+  return stages
+
+
+def write_timeline(
+  open_dash_path: str,
+  started_at: float,
+  stage_timings: list[StageTiming],
+  workers: int,
+) -> None:
+  """
+  Writes the start and end of each stage, in seconds since the build started, to open-dash.timeline.json.
+  """
+  with open(os.path.join(open_dash_path, TIMELINE_FILE), 'w') as f:
+    json.dump({
+      'workers': workers,
+      'seconds': round(time.time() - started_at, 3),
+      'stages': [timing.to_dict(started_at) for timing in sorted(stage_timings, key=lambda timing: timing.start)],
+    }, f, indent=2)
+
+
+def read_bundler_timeline(paths: dict[str, str]) -> list[StageTiming]:
+  """
+  Reads and removes the stage timings the assets bundler wrote to its timeline file.
+  """
+  path = os.path.join(paths['open_dash_path'], BUNDLER_TIMELINE_FILE)
+  if not os.path.exists(path):
+    return []
+
+  with open(path, 'r') as f:
+    stage_timings = [StageTiming(**timing) for timing in json.load(f)]
+  os.remove(path)
+  return stage_timings
+
+
+def create(
+  config: Config,
+  log: Callable[[str], None] = print,
+  pip_slot: Optional[ContextManager] = None,
+  pip_cache_dir: Optional[str] = None,
+) -> dict[str, float]:
+  """
+  Bundles the app and returns the duration of each phase in seconds. When several apps are bundled at once, pip_slot
+  is held during the pip install to bound the number of concurrent installs.
+  """
+  timings = {}
+  started_at = time.monotonic()
+  # Stage timings are wall-clock times, so that the assets bundler's stages line up with the build's.
+  timeline_started_at = time.time()
+  log(f'Preparing dash bundle from {config.source_path}...')
+
+  if config.static_only and not config.export_static:
+    log('Error: static-only bundles need export-static, because the static origin is all they have.')
+    sys.exit(1)
+
+  build_cache = cache.BuildCache.from_config(config) if config.build_cache.enabled else None
+  output_key = None
+  if build_cache:
+    output_key = cache.output_key(config)
+    if build_cache.restore(output_key, os.path.join(config.target_base_path, '.open-dash')):
+      log(f'Build cache: restored the bundle from {build_cache.path}. Nothing changed since it was built.')
+      timings['restore'] = timings['total'] = time.monotonic() - started_at
+      return timings
+
+    log('Build cache: no bundle for these inputs yet.')
+    # Downloaded and built wheels are kept with the cache, so a fresh environment installs without downloading.
+    pip_cache_dir = pip_cache_dir or os.path.join(build_cache.path, 'pip')
+
+  paths = prepare_folders(config, log)
+
+  stages = build_stages(config, paths, timings, log, pip_slot, pip_cache_dir, build_cache)
+  stage_timings = run_stages(stages, max_workers=config.build_workers, group='bundle')
+  stage_timings.extend(read_bundler_timeline(paths))
+  for timing in stage_timings:
+    if timing.group == 'bundle':
+      timings.setdefault(timing.name, timing.seconds)
 
-    print('Bundling React assets...')
-    bundle_react_assets(config, paths)
-  finally:
-    clean_env_vars()
-  
-  print('Cleaning up...')
-  os.remove(os.path.join(paths['server_functions_path'], 'assets_bundler.py'))
-  os.remove(os.path.join(paths['server_functions_path'], 'open_dash_output.py'))
   for file in glob.glob(os.path.join(paths['open_dash_path'], '**', '*.pyc'), recursive=True):
     os.remove(file)
   
   for file in glob.glob(os.path.join(paths['open_dash_path'], '**', 'cache.db'), recursive=True):
     os.remove(file)
   
-  print(f"Bundling complete! Bundle is available in {paths['open_dash_path']}")
+  log(f"Bundling complete! Bundle is available in {paths['open_dash_path']}")
+
+  # The packages in the environment are only shipped with the server function.
+  virtualenv_path = None if config.static_only else config.virtualenv_path
+  size_report = report.measure(paths['open_dash_path'], virtualenv_path)
+  size_report.violations = report.check(size_report, config.budgets)
+  with open(os.path.join(paths['open_dash_path'], 'open-dash.sizes.json'), 'w') as f:
+    f.write(size_report.to_json())
+
+  log(size_report.summary())
+  if size_report.violations:
+    log('Error: The bundle exceeds its size budgets. See open-dash.sizes.json for the full breakdown.')
+    sys.exit(1)
+
+  if build_cache:
+    log(build_cache.store(output_key, paths['open_dash_path']).summary())
+
+  write_timeline(paths['open_dash_path'], timeline_started_at, stage_timings, config.build_workers)
+  timings['total'] = time.monotonic() - started_at
+  return timings
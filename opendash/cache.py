@@ -0,0 +1,326 @@
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from opendash.__about__ import __version__
+from opendash.config import Config
+from opendash.report import format_size
+
+
+# Files that are written after the output is stored, or that differ between otherwise identical builds.
+UNCACHED_FILES = {'open-dash.log', 'open-dash.timeline.json'}
+SKIPPED_DIRECTORIES = {'__pycache__', '.git'}
+
+# Files are written under a temporary name and renamed once complete.
+TEMPORARY_PREFIX = '.tmp-'
+
+# The directory of the build cache that open_dash_images caches optimized images in, one directory per image.
+IMAGES_DIRECTORY = 'images'
+
+# Prints the installed distributions of the interpreter that pip installs into.
+ENVIRONMENT_SCRIPT = '''
+import importlib.metadata, json, sys
+distributions = sorted(f"{d.metadata['Name']}=={d.version}" for d in importlib.metadata.distributions())
+print(json.dumps({'python': sys.version, 'distributions': distributions}))
+'''
+
+
+@dataclass(kw_only=True)
+class StoreResult:
+  files: int
+  bytes: int
+
+  """
+  Files whose content was already in the cache, e.g. component suites shared with the bundle of another branch.
+  """
+  reused_files: int
+  reused_bytes: int
+
+  def summary(self) -> str:
+    return (
+      f'Build cache: saved {self.files} files ({format_size(self.bytes)}). {self.reused_files} files '
+      f'({format_size(self.reused_bytes)}) were already in the cache.'
+    )
+
+
+def file_hash(path: str) -> str:
+  digest = hashlib.sha256()
+  with open(path, 'rb') as file:
+    for chunk in iter(lambda: file.read(1024 * 1024), b''):
+      digest.update(chunk)
+
+  return digest.hexdigest()
+
+
+def tree_files(path: str, exclude: list[str] = None) -> list[str]:
+  """
+  Lists the files in a directory tree by relative path, in a stable order.
+  """
+  excluded = SKIPPED_DIRECTORIES.union(exclude or [])
+  files = []
+  for root, dirs, filenames in os.walk(path):
+    dirs[:] = sorted(directory for directory in dirs if directory not in excluded)
+    files.extend(os.path.relpath(os.path.join(root, filename), path) for filename in sorted(filenames))
+
+  return files
+
+
+def tree_hash(path: str, exclude: list[str] = None) -> str:
+  digest = hashlib.sha256()
+  if os.path.isdir(path):
+    for relative_path in tree_files(path, exclude):
+      if relative_path.endswith('.pyc'):
+        continue
+
+      digest.update(relative_path.replace(os.sep, '/').encode('UTF-8') + b'\0')
+      digest.update(file_hash(os.path.join(path, relative_path)).encode('ascii'))
+
+  return digest.hexdigest()
+
+
+def tool_version() -> str:
+  """
+  The released version plus a hash of the package, so that local changes to open-dash invalidate cached bundles.
+  """
+  return f'{__version__}+{tree_hash(os.path.dirname(os.path.realpath(__file__)))[:16]}'
+
+
+def python_version(config: Config) -> str:
+  if config.virtualenv_path and os.path.exists(os.path.join(config.virtualenv_path, 'pyvenv.cfg')):
+    with open(os.path.join(config.virtualenv_path, 'pyvenv.cfg'), 'r') as file:
+      for line in file:
+        name, _, value = line.partition('=')
+        if name.strip() in ['version', 'version_info']:
+          return value.strip()
+
+  return ''
+
+
+def output_key(config: Config) -> str:
+  """
+  Identifies a bundle by everything that goes into it: the tool version, the configuration, the source tree with its
+  requirements.txt and the data directory. Paths are left out so that checkouts in different directories share entries,
+  and so are build and image workers, which do not change the output.
+  """
+  settings = asdict(config)
+  for name in ['source_path', 'target_base_path', 'virtualenv_path', 'build_cache', 'build_workers']:
+    settings.pop(name)
+  for name in ['workers', 'cache_path']:
+    settings['optimize_images'].pop(name)
+
+  data_path = os.path.join(config.source_path, '..', config.data_path) if config.data_path else None
+  inputs = {
+    'tool': tool_version(),
+    'python': python_version(config),
+    'config': settings,
+    'source': tree_hash(config.source_path, config.excluded_directories),
+    'data': tree_hash(data_path) if data_path else '',
+  }
+  return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode('UTF-8')).hexdigest()
+
+
+def cache_path(config: Config) -> str:
+  return config.build_cache.path or os.path.join(os.path.expanduser('~'), '.cache', 'open-dash')
+
+
+def image_cache_path(config: Config) -> str:
+  return os.path.join(cache_path(config), IMAGES_DIRECTORY)
+
+
+def install_key(config: Config, requirements_path: str) -> str:
+  """
+  Identifies a pip install by its requirements and the packages installed in the environment. When the environment
+  is in the state a previous install of the same requirements left it in, the install can be skipped.
+  """
+  python_path = os.path.join(config.virtualenv_path, 'bin', 'python3') if config.virtualenv_path else 'python3'
+  result = subprocess.run([python_path, '-c', ENVIRONMENT_SCRIPT], text=True, capture_output=True, check=True)
+  with open(requirements_path, 'rb') as file:
+    requirements = hashlib.sha256(file.read()).hexdigest()
+
+  environment = os.path.realpath(config.virtualenv_path) if config.virtualenv_path else python_path
+  inputs = {'requirements': requirements, 'environment': environment, 'installed': json.loads(result.stdout)}
+  return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('UTF-8')).hexdigest()
+
+
+class BuildCache:
+  """
+  A content-addressed store of bundle outputs. Each entry is a manifest that maps the relative paths of an output to
+  the hashes of their content, and file content is stored once under objects/ however many entries share it. Entries
+  and the optimized images under images/ are evicted least recently used first once they exceed max_bytes together.
+  """
+  def __init__(self, path: str, max_bytes: int):
+    self.path = path
+    self.max_bytes = max_bytes
+    self.__lock = threading.Lock()
+    os.makedirs(os.path.join(path, 'entries'), exist_ok=True)
+    os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+
+  @staticmethod
+  def from_config(config: Config) -> 'BuildCache':
+    return BuildCache(cache_path(config), config.build_cache.max_bytes)
+
+  def has(self, key: str) -> bool:
+    entry_path = self.__entry_path(key)
+    if not os.path.exists(entry_path):
+      return False
+
+    os.utime(entry_path)
+    return True
+
+  def restore(self, key: str, target_path: str) -> bool:
+    """
+    Replaces target_path with the output stored under key. Returns False if there is no such entry.
+    """
+    entry_path = self.__entry_path(key)
+    try:
+      with open(entry_path, 'r') as file:
+        entry = json.load(file)
+    except FileNotFoundError:
+      return False
+
+    files = entry['files']
+
+    if any(not os.path.exists(self.__object_path(content_hash)) for content_hash in files.values()):
+      # Objects may have been evicted by another process while this entry was in use.
+      return False
+
+    if os.path.exists(target_path):
+      shutil.rmtree(target_path)
+
+    for relative_path in entry.get('directories', []):
+      os.makedirs(os.path.join(target_path, *relative_path.split('/')), exist_ok=True)
+
+    for relative_path, content_hash in files.items():
+      target_file = os.path.join(target_path, *relative_path.split('/'))
+      os.makedirs(os.path.dirname(target_file), exist_ok=True)
+      shutil.copyfile(self.__object_path(content_hash), target_file)
+
+    os.utime(entry_path)
+    return True
+
+  def store(self, key: str, source_path: str = None) -> StoreResult:
+    """
+    Stores the files under source_path as the entry key. Without source_path the entry is a marker with no files.
+    """
+    files, result = {}, StoreResult(files=0, bytes=0, reused_files=0, reused_bytes=0)
+    # Directories are listed so that empty ones, such as an empty data directory, are restored too.
+    directories = sorted({
+      os.path.relpath(root, source_path).replace(os.sep, '/')
+      for root, _, _ in os.walk(source_path) if root != source_path and '__pycache__' not in root
+    }) if source_path else []
+    for relative_path in tree_files(source_path) if source_path else []:
+      if os.path.basename(relative_path) in UNCACHED_FILES or relative_path.endswith('.pyc'):
+        continue
+
+      source_file = os.path.join(source_path, relative_path)
+      content_hash = file_hash(source_file)
+      size = os.path.getsize(source_file)
+      files[relative_path.replace(os.sep, '/')] = content_hash
+      result.files += 1
+      result.bytes += size
+
+      object_path = self.__object_path(content_hash)
+      if os.path.exists(object_path):
+        result.reused_files += 1
+        result.reused_bytes += size
+        continue
+
+      self.__write_atomically(object_path, lambda temporary_path: shutil.copyfile(source_file, temporary_path))
+
+    def write_entry(temporary_path: str) -> None:
+      with open(temporary_path, 'w') as file:
+        json.dump({'files': files, 'directories': directories, 'created': time.time()}, file)
+
+    self.__write_atomically(self.__entry_path(key), write_entry)
+    self.evict()
+    return result
+
+  def evict(self) -> list[str]:
+    """
+    Removes least recently used entries and images until the stored content fits in max_bytes, and the objects no
+    remaining entry refers to. Returns the evicted keys, with those of images under images/.
+    """
+    with self.__lock:
+      entries = {}
+      entries_path = os.path.join(self.path, 'entries')
+      for name in os.listdir(entries_path):
+        if not name.endswith('.json') or name.startswith(TEMPORARY_PREFIX):
+          continue
+
+        try:
+          with open(os.path.join(entries_path, name), 'r') as file:
+            entries[name[:-len('.json')]] = (os.path.getmtime(file.name), set(json.load(file)['files'].values()))
+        except (FileNotFoundError, ValueError):
+          continue
+
+      objects = {}
+      for root, _, filenames in os.walk(os.path.join(self.path, 'objects')):
+        objects.update({
+          filename: os.path.getsize(os.path.join(root, filename))
+          for filename in filenames if not filename.startswith(TEMPORARY_PREFIX)
+        })
+
+      images = {}
+      images_path = os.path.join(self.path, IMAGES_DIRECTORY)
+      # Images are written to hidden temporary directories, which are renamed once complete.
+      for name in os.listdir(images_path) if os.path.isdir(images_path) else []:
+        if name.startswith('.'):
+          continue
+
+        image_path = os.path.join(images_path, name)
+        try:
+          size = sum(os.path.getsize(os.path.join(image_path, filename)) for filename in os.listdir(image_path))
+          images[name] = (os.path.getmtime(image_path), size)
+        except FileNotFoundError:
+          continue
+
+      candidates = sorted(
+        [(modified, key, False) for key, (modified, _) in entries.items()]
+        + [(modified, name, True) for name, (modified, _) in images.items()]
+      )
+
+      evicted = []
+      total_bytes = sum(objects.values()) + sum(size for _, size in images.values())
+      for _, key, is_image in candidates:
+        if total_bytes <= self.max_bytes:
+          break
+
+        if is_image:
+          shutil.rmtree(os.path.join(images_path, key), ignore_errors=True)
+          evicted.append(f'{IMAGES_DIRECTORY}/{key}')
+          total_bytes -= images[key][1]
+          continue
+
+        os.remove(self.__entry_path(key))
+        evicted.append(key)
+        remaining = set().union(*(entry[1] for name, entry in entries.items() if name not in evicted))
+        for content_hash in entries[key][1] - remaining:
+          if content_hash in objects:
+            os.remove(self.__object_path(content_hash))
+            total_bytes -= objects.pop(content_hash)
+
+      return evicted
+
+  def __entry_path(self, key: str) -> str:
+    return os.path.join(self.path, 'entries', f'{key}.json')
+
+  def __object_path(self, content_hash: str) -> str:
+    return os.path.join(self.path, 'objects', content_hash[:2], content_hash)
+
+  def __write_atomically(self, path: str, write) -> None:
+    # Builds running in other processes may share the cache, so files only appear once they are complete.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMPORARY_PREFIX)
+    os.close(descriptor)
+    try:
+      write(temporary_path)
+      os.replace(temporary_path, path)
+    except BaseException:
+      os.remove(temporary_path)
+      raise
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import json
 import os
@@ -24,6 +24,183 @@ class FingerPrint:
   method: FingerPrintType
 
 
+@dataclass(kw_only=True)
+class CacheControl:
+  """
+  The max-age, in seconds, for fingerprinted objects such as the component suites. These never change under the same
+  key, so browsers and edges can keep them for as long as they like.
+  """
+  immutable_max_age: int = 31536000
+
+  """
+  The browser max-age, in seconds, for mutable entry documents such as index.html, _dash-layout and page payloads.
+  """
+  document_max_age: int = 0
+
+  """
+  The edge s-maxage, in seconds, for mutable entry documents. Deployments should invalidate these documents, so this
+  only bounds how long a missed invalidation can serve stale content.
+  """
+  document_shared_max_age: int = 60
+
+  """
+  The default TTL, in seconds, for responses from the Lambda origin that do not set their own Cache-Control header.
+  """
+  function_default_ttl: int = 0
+
+  """
+  The maximum TTL, in seconds, for responses from the Lambda origin.
+  """
+  function_max_ttl: int = 0
+
+
+@dataclass(kw_only=True)
+class ResourceHints:
+  """
+  Whether to add preload and preconnect hints for the critical scripts and JSON endpoints to the exported index.html.
+  """
+  enabled: bool = False
+
+  """
+  Script paths, or path suffixes, that are not needed before the Dash renderer starts and can be loaded with defer.
+  Dash renders every script before the inline renderer bootstrap, so only list scripts the app does not depend on
+  during start-up, such as analytics.
+  """
+  defer_scripts: list[str] = field(default_factory=list)
+
+  """
+  Whether to list the hints as Link header values in the output JSON so they can be sent as 103 Early Hints.
+  """
+  early_hints: bool = False
+
+
+@dataclass(kw_only=True)
+class PruneComponents:
+  """
+  Whether to leave component libraries that no exported layout or page payload references out of the static export and
+  the index.html script tags. The Dash renderer and its React dependencies are always kept.
+  """
+  enabled: bool = False
+
+  """
+  Component namespaces to keep even if the analysis does not find them, e.g. "dash_table" or
+  "dash_bootstrap_components". List libraries whose components are only created by callbacks or by pages with path
+  variables, which are not exported.
+  """
+  keep: list[str] = field(default_factory=list)
+
+
+@dataclass(kw_only=True)
+class PlotlyBundle:
+  """
+  Whether to replace the full plotly.js bundle with the smallest official partial bundle that contains every trace type
+  the app uses.
+  """
+  enabled: bool = False
+
+  """
+  Trace types of figures that callbacks create, e.g. "scatter" or "heatmap". Figures in the exported layouts and pages
+  are found automatically.
+  """
+  trace_types: list[str] = field(default_factory=list)
+
+  """
+  Optional - A directory containing the partial bundles, named like plotly-basic-2.35.2.min.js. If not provided, the
+  bundle is downloaded from the plotly.js CDN.
+  """
+  bundles_path: Optional[str] = None
+
+
+@dataclass(kw_only=True)
+class TypedArrays:
+  """
+  Whether to encode the numeric arrays of figure traces in the exported payloads as base64 typed arrays, which
+  plotly.js 2.28 and later decode. Needs NumPy in the environment the app is bundled with.
+  """
+  enabled: bool = False
+
+  """
+  The length of the shortest array to encode. Shorter arrays stay JSON lists.
+  """
+  min_length: int = 100
+
+
+@dataclass(kw_only=True)
+class OptimizeImages:
+  """
+  Whether to recompress the PNG and JPEG images in the exported assets directory and write WebP and AVIF variants next
+  to them. Needs Pillow in the environment the app is bundled with.
+  """
+  enabled: bool = False
+
+  """
+  The variant formats to write. Options: "webp", "avif". Formats that the installed Pillow cannot encode are skipped.
+  """
+  formats: list[str] = field(default_factory=lambda: ['webp', 'avif'])
+
+  """
+  The quality, from 0 to 100, of the lossy variants. PNGs are converted to WebP losslessly.
+  """
+  quality: int = 80
+
+  """
+  Optional - The number of processes that encode images. Defaults to one per CPU.
+  """
+  workers: Optional[int] = None
+
+  """
+  Optional - The directory that caches encoded images by content hash. Defaults to the images directory of the build
+  cache directory.
+  """
+  cache_path: Optional[str] = None
+
+
+@dataclass(kw_only=True)
+class Budgets:
+  """
+  The maximum total size, in bytes, of the objects in the static origin.
+  """
+  static_bytes: Optional[int] = None
+
+  """
+  The maximum size, in bytes, of each component suite namespace, e.g. dash/dcc or dash_bootstrap_components.
+  """
+  suite_bytes: Optional[int] = None
+
+  """
+  The maximum size, in bytes, of each exported page payload.
+  """
+  page_bytes: Optional[int] = None
+
+  """
+  The maximum size, in bytes, of the exported _dash-layout.
+  """
+  layout_bytes: Optional[int] = None
+
+  """
+  The maximum size, in bytes, of the server function bundle and the packages installed in the virtual environment.
+  """
+  server_function_bytes: Optional[int] = None
+
+
+@dataclass(kw_only=True)
+class BuildCache:
+  """
+  Whether to restore bundles from, and save them to, the build cache.
+  """
+  enabled: bool = False
+
+  """
+  Optional - The build cache directory. CI can persist it between runs. Defaults to ~/.cache/open-dash.
+  """
+  path: Optional[str] = None
+
+  """
+  The size limit of the cache in bytes. Least recently used entries are evicted first.
+  """
+  max_bytes: int = 2 * 1024 * 1024 * 1024
+
+
 @dataclass(kw_only=True)
 class Config:
   """
@@ -59,6 +236,19 @@ class Config:
   """
   excluded_directories: list[str]
 
+  """
+  Optional - Whether to build only the static origin. The assets bundler runs against the source directory in the
+  configured environment, the source is not copied and no dependencies are installed, and the output has no server
+  function. Apps with pages that have path variables cannot be bundled this way.
+  """
+  static_only: bool = False
+
+  """
+  Optional - Whether a static-only bundle may contain callbacks that run on the server and are not static callbacks.
+  Requests for them fail in the deployed app.
+  """
+  allow_server_callbacks: bool = False
+
   """
   Optional - The path to the data directory.
   """
@@ -73,12 +263,101 @@ class Config:
   Optional - The base path to the output directory. If not provided, the source's parent directory is used.
   """
   target_base_path: Optional[str]
+
+  """
+  Optional - The Cache-Control policies to attach to CloudFront behaviors and S3 objects.
+  """
+  cache_control: CacheControl = field(default_factory=CacheControl)
+
+  """
+  Optional - Resource hints to add to the exported index.html.
+  """
+  resource_hints: ResourceHints = field(default_factory=ResourceHints)
+
+  """
+  Optional - Whether to concatenate the synchronous component suite scripts in the exported index.html into a few
+  content-hashed bundles.
+  """
+  bundle_scripts: bool = False
+
+  """
+  Optional - Whether to embed _dash-layout, _dash-dependencies and the initial page's payload in the exported
+  index.html so the renderer does not have to fetch them.
+  """
+  inline_payloads: bool = False
+
+  """
+  Optional - Whether to replace the "Loading..." placeholder in the exported entry documents with a static snapshot of
+  the initial layout. The renderer replaces the snapshot when React mounts.
+  """
+  prerender: bool = False
+
+  """
+  Optional - Whether to emit a service worker that caches fingerprinted objects and page payloads, and prefetches the
+  payloads of linked pages. The exported index.html registers it.
+  """
+  service_worker: bool = False
+
+  """
+  Optional - Outputs of callbacks, e.g. "graph.figure", whose initial responses are the same for every visitor. Their
+  responses are precomputed and served from the static origin.
+  """
+  static_callbacks: list[str] = field(default_factory=list)
+
+  """
+  Optional - Leave unused component libraries out of the static export.
+  """
+  prune_components: PruneComponents = field(default_factory=PruneComponents)
+
+  """
+  Optional - Replace plotly.js with a partial bundle that contains only the trace types in use.
+  """
+  plotly_bundle: PlotlyBundle = field(default_factory=PlotlyBundle)
+
+  """
+  Optional - Encode the numeric arrays of figures in the exported payloads as typed arrays.
+  """
+  typed_arrays: TypedArrays = field(default_factory=TypedArrays)
+
+  """
+  Optional - Recompress images in the assets directory and write WebP and AVIF variants of them.
+  """
+  optimize_images: OptimizeImages = field(default_factory=OptimizeImages)
+  
+  """
+  Optional - Size limits that fail the bundle when exceeded.
+  """
+  budgets: Budgets = field(default_factory=Budgets)
+
+  """
+  Optional - Restore unchanged bundles from a local build cache instead of rebuilding them.
+  """
+  build_cache: BuildCache = field(default_factory=BuildCache)
+
+  """
+  Optional - The number of build stages that run at once, e.g. the pip install and the copy of the data directory. Set
+  to 1 to run the stages one after another.
+  """
+  build_workers: int = 4
+
+  """
+  Optional - The number of cache behaviors CloudFront allows per distribution, not counting the default behavior. Page
+  documents that do not fit are served by the server function.
+  """
+  cloud_front_behavior_quota: int = 25
   
   """
   Creates a Config instance from an open-dash.config.json file. open-dash.config.json file structure:
   {
     "warmer": true,
     "export-static": true,
+    "static-only": false,
+    "allow-server-callbacks": false,
+    "bundle-scripts": false,
+    "inline-payloads": false,
+    "prerender": false,
+    "service-worker": false,
+    "static-callbacks": ["graph.figure"],
     "venv-path": "path/to/venv",
     "data-path": "path/to/data",
     "domain-name": "example.com",
@@ -88,7 +367,53 @@ class Config:
     "fingerprint": {
       "version": true,
       "method": "last-modified"
-    }
+    },
+    "cache-control": {
+      "immutable-max-age": 31536000,
+      "document-max-age": 0,
+      "document-s-maxage": 60,
+      "function-default-ttl": 0,
+      "function-max-ttl": 0
+    },
+    "resource-hints": {
+      "enabled": true,
+      "defer-scripts": ["assets/analytics.js"],
+      "early-hints": true
+    },
+    "prune-components": {
+      "enabled": true,
+      "keep": ["dash_table"]
+    },
+    "plotly-bundle": {
+      "enabled": true,
+      "trace-types": ["scatter", "heatmap"],
+      "bundles-path": "path/to/bundles"
+    },
+    "typed-arrays": {
+      "enabled": true,
+      "min-length": 100
+    },
+    "optimize-images": {
+      "enabled": true,
+      "formats": ["webp", "avif"],
+      "quality": 80,
+      "workers": 4,
+      "cache-path": "path/to/cache"
+    },
+    "budgets": {
+      "static-bytes": 20000000,
+      "suite-bytes": 5000000,
+      "page-bytes": 500000,
+      "layout-bytes": 500000,
+      "server-function-bytes": 250000000
+    },
+    "build-cache": {
+      "enabled": true,
+      "path": "path/to/cache",
+      "max-bytes": 2147483648
+    },
+    "build-workers": 4,
+    "cloud-front-behavior-quota": 25
   }
   """
   @staticmethod
@@ -112,15 +437,103 @@ class Config:
             method=FingerPrintType.LAST_MODIFIED
           )
 
+        cache_control_data = data.get('cache-control', {})
+        default_cache_control = CacheControl()
+        cache_control = CacheControl(
+          immutable_max_age=cache_control_data.get('immutable-max-age', default_cache_control.immutable_max_age),
+          document_max_age=cache_control_data.get('document-max-age', default_cache_control.document_max_age),
+          document_shared_max_age=cache_control_data.get(
+            'document-s-maxage',
+            default_cache_control.document_shared_max_age
+          ),
+          function_default_ttl=cache_control_data.get(
+            'function-default-ttl',
+            default_cache_control.function_default_ttl
+          ),
+          function_max_ttl=cache_control_data.get('function-max-ttl', default_cache_control.function_max_ttl),
+        )
+
+        resource_hints_data = data.get('resource-hints', {})
+        resource_hints = ResourceHints(
+          enabled=resource_hints_data.get('enabled', False),
+          early_hints=resource_hints_data.get('early-hints', False),
+          defer_scripts=resource_hints_data.get('defer-scripts', []),
+        )
+
+        prune_components_data = data.get('prune-components', {})
+        prune_components = PruneComponents(
+          enabled=prune_components_data.get('enabled', False),
+          keep=prune_components_data.get('keep', []),
+        )
+
+        plotly_bundle_data = data.get('plotly-bundle', {})
+        plotly_bundle = PlotlyBundle(
+          enabled=plotly_bundle_data.get('enabled', False),
+          trace_types=plotly_bundle_data.get('trace-types', []),
+          bundles_path=(
+            os.path.abspath(plotly_bundle_data['bundles-path']) if plotly_bundle_data.get('bundles-path') else None
+          ),
+        )
+
+        typed_arrays_data = data.get('typed-arrays', {})
+        typed_arrays = TypedArrays(
+          enabled=typed_arrays_data.get('enabled', False),
+          min_length=typed_arrays_data.get('min-length', TypedArrays().min_length),
+        )
+
+        optimize_images_data = data.get('optimize-images', {})
+        optimize_images = OptimizeImages(
+          enabled=optimize_images_data.get('enabled', False),
+          formats=optimize_images_data.get('formats', OptimizeImages().formats),
+          quality=optimize_images_data.get('quality', OptimizeImages().quality),
+          workers=optimize_images_data.get('workers'),
+          cache_path=(
+            os.path.abspath(optimize_images_data['cache-path']) if optimize_images_data.get('cache-path') else None
+          ),
+        )
+
+        budgets_data = data.get('budgets', {})
+        budgets = Budgets(
+          static_bytes=budgets_data.get('static-bytes'),
+          suite_bytes=budgets_data.get('suite-bytes'),
+          page_bytes=budgets_data.get('page-bytes'),
+          layout_bytes=budgets_data.get('layout-bytes'),
+          server_function_bytes=budgets_data.get('server-function-bytes'),
+        )
+
+        build_cache_data = data.get('build-cache', {})
+        build_cache = BuildCache(
+          enabled=build_cache_data.get('enabled', False),
+          path=os.path.abspath(build_cache_data['path']) if build_cache_data.get('path') else None,
+          max_bytes=build_cache_data.get('max-bytes', BuildCache().max_bytes),
+        )
+
         source_path=os.path.abspath(data.get('source-path', os.getcwd()))
         return Config(
           fingerprint=fingerprint,
+          cache_control=cache_control,
+          resource_hints=resource_hints,
+          prune_components=prune_components,
+          plotly_bundle=plotly_bundle,
+          typed_arrays=typed_arrays,
+          optimize_images=optimize_images,
+          budgets=budgets,
+          build_cache=build_cache,
+          build_workers=data.get('build-workers', 4),
+          cloud_front_behavior_quota=data.get('cloud-front-behavior-quota', 25),
+          bundle_scripts=data.get('bundle-scripts', False),
+          inline_payloads=data.get('inline-payloads', False),
+          prerender=data.get('prerender', False),
+          service_worker=data.get('service-worker', False),
+          static_callbacks=data.get('static-callbacks', []),
           source_path=source_path,
           data_path=data.get('data-path'),
           virtualenv_path=data.get('venv-path'),
           include_warmer=data.get('warmer', True),
           excluded_directories=data.get('exclude', []),
           export_static=data.get('export-static', True),
+          static_only=data.get('static-only', False),
+          allow_server_callbacks=data.get('allow-server-callbacks', False),
           domain_name=data.get('domain-name', 'localhost'),
           target_base_path=data.get('target-base-path', os.path.abspath(os.path.join(source_path, os.pardir)))
         )
@@ -141,3 +554,51 @@ class Config:
         method=FingerPrintType.LAST_MODIFIED
       )
     )
+
+
+@dataclass(kw_only=True)
+class Workspace:
+  """
+  The paths to the open-dash.config.json files of the apps to bundle.
+  """
+  config_paths: list[str]
+
+  """
+  The number of apps to bundle concurrently.
+  """
+  workers: int = 1
+
+  """
+  The number of concurrent pip installs. Installs are the most CPU, network and disk intensive phase, so this is
+  usually lower than workers. Installs into the same virtual environment never run concurrently.
+  """
+  pip_workers: int = 1
+
+  """
+  Optional - The pip cache directory shared by every app. If not provided, a temporary directory is shared for the
+  duration of the run.
+  """
+  pip_cache_dir: Optional[str] = None
+
+  """
+  Creates a Workspace instance from an open-dash.workspace.json file. Config paths and the pip cache directory are
+  relative to the workspace file. open-dash.workspace.json file structure:
+  {
+    "configs": ["apps/sales/open-dash.config.json", "apps/ops/open-dash.config.json"],
+    "workers": 4,
+    "pip-workers": 2,
+    "pip-cache-dir": ".cache/pip"
+  }
+  """
+  @staticmethod
+  def from_path(path: str) -> Self:
+    with open(path, 'r') as file:
+      data = json.load(file)
+
+    base_path = os.path.dirname(os.path.abspath(path))
+    return Workspace(
+      config_paths=[os.path.join(base_path, config_path) for config_path in data.get('configs', [])],
+      workers=data.get('workers', 1),
+      pip_workers=data.get('pip-workers', 1),
+      pip_cache_dir=os.path.join(base_path, data['pip-cache-dir']) if data.get('pip-cache-dir') else None,
+    )
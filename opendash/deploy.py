@@ -0,0 +1,195 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import mimetypes
+import os
+import sys
+import threading
+import time
+
+from opendash.manifest import Manifest
+
+
+# The hash is stored as user metadata so later deployments can skip unchanged objects. S3 ETags are not content hashes
+# for multipart uploads, so they cannot be used for the comparison.
+HASH_METADATA_KEY = 'sha256'
+
+
+@dataclass(kw_only=True)
+class DeployResult:
+  """
+  Keys uploaded from the local output.
+  """
+  uploaded: list[str] = field(default_factory=list)
+
+  """
+  Keys created with a server-side copy of an identical object uploaded in the same deployment.
+  """
+  copied: list[str] = field(default_factory=list)
+
+  """
+  Keys whose remote content hash already matched the local object.
+  """
+  skipped: list[str] = field(default_factory=list)
+
+  """
+  Keys whose remote content did not match, which a dry run left alone. A deployment uploads or copies them.
+  """
+  would_upload: list[str] = field(default_factory=list)
+
+  """
+  Whether the bucket was only compared with the local output.
+  """
+  dry_run: bool = False
+
+  """
+  The number of bytes uploaded.
+  """
+  bytes_uploaded: int = 0
+
+  """
+  The wall-clock duration of the deployment in seconds.
+  """
+  seconds: float = 0.0
+
+  def summary(self) -> str:
+    if self.dry_run:
+      return (
+        f'Would upload {len(self.would_upload)} objects, skipped {len(self.skipped)} unchanged in '
+        f'{self.seconds:.2f}s (dry run).'
+      )
+
+    throughput = self.bytes_uploaded / self.seconds / (1024 * 1024) if self.seconds else 0.0
+    return (
+      f'Uploaded {len(self.uploaded)} objects ({self.bytes_uploaded} bytes), copied {len(self.copied)}, '
+      f'skipped {len(self.skipped)} unchanged in {self.seconds:.2f}s ({throughput:.2f} MiB/s).'
+    )
+
+
+def create_client(endpoint_url: str = None, multipart_threshold: int = 8 * 1024 * 1024):
+  try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+  except ImportError:
+    print('Error: open-dash deploy requires boto3. Install it with "pip install open-dash[deploy]".')
+    sys.exit(1)
+
+  transfer_config = TransferConfig(
+    multipart_threshold=multipart_threshold,
+    multipart_chunksize=multipart_threshold,
+  )
+  return boto3.client('s3', endpoint_url=endpoint_url), transfer_config
+
+
+def remote_hash(client, bucket: str, key: str) -> str:
+  try:
+    response = client.head_object(Bucket=bucket, Key=key)
+  except Exception as error:
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    if code in ['404', 'NoSuchKey', 'NotFound']:
+      return None
+    raise
+
+  return response.get('Metadata', {}).get(HASH_METADATA_KEY)
+
+
+def deploy(
+  output_path: str,
+  *,
+  bucket: str,
+  prefix: str = '',
+  endpoint_url: str = None,
+  concurrency: int = 8,
+  multipart_threshold: int = 8 * 1024 * 1024,
+  dry_run: bool = False,
+  client=None,
+  transfer_config=None,
+) -> DeployResult:
+  """
+  Uploads the static origin listed in an open-dash.output.json file. Objects whose remote hash matches are skipped, and
+  objects with identical content are uploaded once and copied server-side to their other keys. Pass an endpoint URL to
+  deploy to any S3-compatible store, or a client with the boto3 S3 client interface to bypass boto3 entirely.
+  """
+  if client is None:
+    client, transfer_config = create_client(endpoint_url, multipart_threshold)
+
+  if os.path.isdir(output_path):
+    output_path = os.path.join(output_path, 'open-dash.output.json')
+
+  # The prefix is a folder, so site and site/ both upload index.html to site/index.html.
+  prefix = f"{prefix.strip('/')}/" if prefix.strip('/') else ''
+
+  # Object sources are relative to the directory that contains .open-dash.
+  base_path = os.path.abspath(os.path.join(os.path.dirname(output_path), os.pardir))
+  manifest = Manifest.from_path(output_path)
+
+  aliases: dict[str, list[dict]] = {}
+  for obj in manifest.objects.values():
+    aliases.setdefault(obj['hash'], []).append(obj)
+
+  result = DeployResult(dry_run=dry_run)
+  lock = threading.Lock()
+  start = time.perf_counter()
+
+  def extra_args(obj: dict) -> dict:
+    args = {
+      'Metadata': {HASH_METADATA_KEY: obj['hash']},
+      'ContentType': obj.get('contentType') or mimetypes.guess_type(obj['key'])[0] or 'application/octet-stream',
+    }
+    if obj.get('cacheControl'):
+      args['CacheControl'] = obj['cacheControl']
+
+    return args
+
+  def sync_group(objects: list[dict]) -> None:
+    pending = [obj for obj in objects if remote_hash(client, bucket, prefix + obj['key']) != obj['hash']]
+    current = [obj for obj in objects if obj not in pending]
+    with lock:
+      result.skipped.extend(obj['key'] for obj in current)
+
+    if dry_run:
+      with lock:
+        result.would_upload.extend(obj['key'] for obj in pending)
+      return
+
+    if not pending:
+      return
+
+    if current:
+      # An identical object is already in the bucket, so every pending key can be a server-side copy of it.
+      source = current[0]
+    else:
+      source = pending.pop(0)
+      upload_kwargs = {'Config': transfer_config} if transfer_config else {}
+      client.upload_file(
+        Filename=os.path.join(base_path, source['source']),
+        Bucket=bucket,
+        Key=prefix + source['key'],
+        ExtraArgs=extra_args(source),
+        **upload_kwargs,
+      )
+      with lock:
+        result.uploaded.append(source['key'])
+        result.bytes_uploaded += source['size']
+
+    for alias in pending:
+      client.copy_object(
+        Bucket=bucket,
+        Key=prefix + alias['key'],
+        CopySource={'Bucket': bucket, 'Key': prefix + source['key']},
+        MetadataDirective='REPLACE',
+        **extra_args(alias),
+      )
+      with lock:
+        result.copied.append(alias['key'])
+
+  # Upload the largest objects first so a long multipart upload does not start last and dominate the wall-clock time.
+  groups = sorted(aliases.values(), key=lambda objects: objects[0]['size'], reverse=True)
+  with ThreadPoolExecutor(max_workers=concurrency) as executor:
+    for future in [executor.submit(sync_group, objects) for objects in groups]:
+      future.result()
+
+  result.seconds = time.perf_counter() - start
+  for keys in [result.uploaded, result.copied, result.skipped, result.would_upload]:
+    keys.sort()
+
+  return result
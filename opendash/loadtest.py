@@ -0,0 +1,433 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from opendash.serve import Distribution
+
+try:
+  import resource
+except ImportError:
+  # The resource module is Unix-only. Memory is not reported without it.
+  resource = None
+
+
+# The Dash Pages callback that renders a page, as the renderer sends it on navigation.
+PAGES_OUTPUT = '.._pages_content.children..._pages_store.data..'
+
+# Prints the app's page registry from a separate interpreter, so the function origin is still cold when the run starts.
+PAGE_REGISTRY_SCRIPT = '''
+import json, os, sys
+sys.path.insert(0, os.getcwd())
+module = __import__(sys.argv[1])
+module.get_server()
+from dash import page_registry
+pages = [{key: page.get(key) for key in ['relative_path', 'path_template']} for page in page_registry.values()]
+print('OPEN_DASH_PAGES ' + json.dumps(pages))
+'''
+
+
+@dataclass(kw_only=True)
+class WorkloadRequest:
+  """
+  The name requests are grouped by in the report, e.g. "GET /about" or "POST _dash-update-component (page /about)".
+  """
+  route: str
+
+  method: str
+  path: str
+  query: str = ''
+  body: bytes = b''
+
+
+@dataclass(kw_only=True)
+class RouteStats:
+  route: str
+
+  """
+  The duration of each request in milliseconds, including the time spent waiting for the function origin.
+  """
+  latencies: list[float] = field(default_factory=list)
+
+  """
+  The number of requests served by each origin, e.g. {"s3": 10, "default": 2}.
+  """
+  origins: dict[str, int] = field(default_factory=dict)
+
+  cold_starts: int = 0
+
+  """
+  The number of responses with a 5xx status.
+  """
+  errors: int = 0
+
+  """
+  How much the process's peak resident memory grew during this route's requests, in KiB. With concurrent requests,
+  growth is attributed to the first request that finishes after it.
+  """
+  memory_growth_kib: int = 0
+
+  def percentile(self, percent: float) -> float:
+    return percentile(self.latencies, percent)
+
+  def to_dict(self) -> dict:
+    return {
+      'requests': len(self.latencies),
+      'p50': round(self.percentile(50), 3),
+      'p95': round(self.percentile(95), 3),
+      'p99': round(self.percentile(99), 3),
+      'origins': self.origins,
+      'coldStarts': self.cold_starts,
+      'errors': self.errors,
+      'memoryGrowthKib': self.memory_growth_kib,
+    }
+
+
+@dataclass(kw_only=True)
+class LoadTestResult:
+  routes: dict[str, RouteStats]
+  concurrency: int
+
+  """
+  The wall-clock duration of the run in seconds.
+  """
+  seconds: float
+
+  """
+  The most function origin requests that were in flight at once. Lambda would have started this many execution
+  environments, each with a cold start, where the local run has one that handles requests one at a time.
+  """
+  peak_function_concurrency: int = 0
+
+  """
+  The process's peak resident memory at the end of the run in KiB, or None where it cannot be measured.
+  """
+  max_rss_kib: int | None = None
+
+  """
+  Pages with path variables, which are not part of the navigation workload because their paths are not known.
+  """
+  skipped_pages: list[str] = field(default_factory=list)
+
+  @property
+  def requests(self) -> int:
+    return sum(len(stats.latencies) for stats in self.routes.values())
+
+  @property
+  def static_ratio(self) -> float:
+    static = sum(stats.origins.get('s3', 0) for stats in self.routes.values())
+    return static / self.requests if self.requests else 0.0
+
+  def to_json(self) -> str:
+    latencies = [latency for stats in self.routes.values() for latency in stats.latencies]
+    return json.dumps({
+      'requests': self.requests,
+      'concurrency': self.concurrency,
+      'seconds': round(self.seconds, 3),
+      'throughput': round(self.requests / self.seconds, 3) if self.seconds else 0.0,
+      'p50': round(percentile(latencies, 50), 3),
+      'p95': round(percentile(latencies, 95), 3),
+      'p99': round(percentile(latencies, 99), 3),
+      'staticRatio': round(self.static_ratio, 4),
+      'coldStarts': sum(stats.cold_starts for stats in self.routes.values()),
+      'peakFunctionConcurrency': self.peak_function_concurrency,
+      'maxRssKib': self.max_rss_kib,
+      'skippedPages': self.skipped_pages,
+      'routes': {route: stats.to_dict() for route, stats in self.routes.items()},
+    }, indent=2, sort_keys=True)
+
+  def summary(self) -> str:
+    latencies = [latency for stats in self.routes.values() for latency in stats.latencies]
+    throughput = self.requests / self.seconds if self.seconds else 0.0
+    cold_starts = sum(stats.cold_starts for stats in self.routes.values())
+    lines = [
+      f'{self.requests} requests in {self.seconds:.1f}s at concurrency {self.concurrency} '
+      f'({throughput:.1f} requests/s).',
+      f'Latency: p50 {percentile(latencies, 50):.1f}ms, p95 {percentile(latencies, 95):.1f}ms, '
+      f'p99 {percentile(latencies, 99):.1f}ms.',
+      f'Static origin: {self.static_ratio:.0%} of requests. Lambda: {1 - self.static_ratio:.0%}.',
+      f'Cold starts: {cold_starts}. Peak function concurrency: {self.peak_function_concurrency}.',
+    ]
+    if self.max_rss_kib is not None:
+      lines.append(f'Memory high-water: {self.max_rss_kib / 1024:.1f} MiB.')
+
+    lines.append('Routes:')
+    for stats in sorted(self.routes.values(), key=lambda stats: stats.percentile(95), reverse=True):
+      origins = ', '.join(f'{origin} {count}' for origin, count in sorted(stats.origins.items()))
+      details = [f'{len(stats.latencies)} requests', origins]
+      if stats.cold_starts:
+        details.append(f'{stats.cold_starts} cold')
+      if stats.errors:
+        details.append(f'{stats.errors} errors')
+      if stats.memory_growth_kib:
+        details.append(f'+{stats.memory_growth_kib / 1024:.1f} MiB')
+
+      lines.append(
+        f'  {stats.route}: p50 {stats.percentile(50):.1f}ms, p95 {stats.percentile(95):.1f}ms, '
+        f'p99 {stats.percentile(99):.1f}ms ({", ".join(details)})'
+      )
+
+    if self.skipped_pages:
+      lines.append(f'Pages with path variables were not loaded: {", ".join(self.skipped_pages)}')
+
+    return '\n'.join(lines)
+
+
+def percentile(values: list[float], percent: float) -> float:
+  """
+  The nearest-rank percentile, or 0 for no values.
+  """
+  if not values:
+    return 0.0
+
+  ordered = sorted(values)
+  return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def max_rss_kib() -> int | None:
+  # ru_maxrss is in KiB on Linux and in bytes on macOS.
+  if resource is None:
+    return None
+
+  max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def route_name(method: str, path: str, body: bytes) -> str:
+  if method != 'POST' or not path.endswith('_dash-update-component'):
+    return f'{method} {path}'
+
+  try:
+    request = json.loads(body)
+  except ValueError:
+    return f'{method} {path}'
+
+  output = request.get('output', '')
+  if '_pages_content.children' in output:
+    pathname = next(
+      (item.get('value') for item in request.get('inputs', []) if item.get('property') == 'pathname'),
+      None,
+    )
+    return f'{method} {path} (page {pathname})'
+
+  return f'{method} {path} ({output})'
+
+
+def page_registry(output_path: str) -> list[dict]:
+  """
+  Reads the app's Dash Pages from its server function. Apps without pages have an empty registry.
+  """
+  if os.path.isdir(output_path):
+    output_path = os.path.join(output_path, 'open-dash.output.json')
+
+  with open(output_path, 'r') as file:
+    origins = json.load(file)['cloudFrontConfig']['origins']
+
+  function = next((origin for origin in origins.values() if origin.get('type') == 'function'), None)
+  if function is None:
+    return []
+
+  base_path = os.path.join(os.path.dirname(os.path.abspath(output_path)), os.pardir)
+  result = subprocess.run(
+    [sys.executable, '-c', PAGE_REGISTRY_SCRIPT, function['handler'].rsplit('.', 1)[0]],
+    text=True,
+    capture_output=True,
+    cwd=os.path.join(base_path, function['bundle']),
+  )
+  if result.returncode != 0:
+    print(result.stderr)
+    print('Error: Could not load the app to read its page registry.')
+    sys.exit(1)
+
+  line = next(line for line in result.stdout.splitlines() if line.startswith('OPEN_DASH_PAGES '))
+  return json.loads(line[len('OPEN_DASH_PAGES '):])
+
+
+def navigation_requests(pages: list[dict], url_base: str) -> tuple[list[WorkloadRequest], list[str]]:
+  """
+  Returns the requests a browser makes to open each page: the document, the layout, the callback dependencies and,
+  for Dash Pages, the callback that renders the page. Pages with path variables are returned separately, because
+  their paths are not known.
+  """
+  def get(path: str) -> WorkloadRequest:
+    return WorkloadRequest(route=f'GET {path}', method='GET', path=path)
+
+  shared = [get(f'{url_base}_dash-layout'), get(f'{url_base}_dash-dependencies')]
+  if not pages:
+    return [get(url_base), *shared], []
+
+  requests, skipped = [], []
+  for page in pages:
+    if page.get('path_template'):
+      skipped.append(page['path_template'])
+      continue
+
+    body = json.dumps({
+      'output': PAGES_OUTPUT,
+      'outputs': [{'id': '_pages_content', 'property': 'children'}, {'id': '_pages_store', 'property': 'data'}],
+      'inputs': [
+        {'id': '_pages_location', 'property': 'pathname', 'value': page['relative_path']},
+        {'id': '_pages_location', 'property': 'search', 'value': ''},
+      ],
+      'changedPropIds': ['_pages_location.pathname'],
+    }).encode('UTF-8')
+    path = f'{url_base}_dash-update-component'
+    requests.extend([
+      get(page['relative_path']),
+      *shared,
+      WorkloadRequest(route=route_name('POST', path, body), method='POST', path=path, body=body),
+    ])
+
+  return requests, skipped
+
+
+def read_recording(path: str) -> list[WorkloadRequest]:
+  """
+  Reads requests recorded with open-dash serve --record, one JSON object per line.
+  """
+  requests = []
+  with open(path, 'r') as file:
+    for line in file:
+      if not line.strip():
+        continue
+
+      recorded = json.loads(line)
+      body = recorded.get('body', '').encode('UTF-8')
+      requests.append(WorkloadRequest(
+        route=route_name(recorded['method'], recorded['path'], body),
+        method=recorded['method'],
+        path=recorded['path'],
+        query=recorded.get('query', ''),
+        body=body,
+      ))
+
+  return requests
+
+
+def peak_overlap(intervals: list[tuple[float, float]]) -> int:
+  events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+  peak = current = 0
+  for _, change in events:
+    current += change
+    peak = max(peak, current)
+
+  return peak
+
+
+def run(
+  distribution: Distribution,
+  workload: list[WorkloadRequest],
+  *,
+  concurrency: int = 1,
+  count: int = None,
+  duration: float = None,
+  domain_name: str = 'localhost',
+) -> LoadTestResult:
+  """
+  Sends the workload to the distribution in order, repeating it until count requests were sent or duration seconds
+  passed, from concurrency threads at once. Without count or duration, the workload is sent once.
+  """
+  if count is None and duration is None:
+    count = len(workload)
+
+  lock = threading.Lock()
+  routes = {request.route: RouteStats(route=request.route) for request in workload}
+  function_intervals: list[tuple[float, float]] = []
+  sent = 0
+  high_water = max_rss_kib()
+  started_at = time.perf_counter()
+
+  def next_request() -> WorkloadRequest | None:
+    nonlocal sent
+    with lock:
+      elapsed = time.perf_counter() - started_at
+      if (count is not None and sent >= count) or (duration is not None and elapsed >= duration):
+        return None
+
+      sent += 1
+      return workload[(sent - 1) % len(workload)]
+
+  def worker() -> None:
+    nonlocal high_water
+    while request := next_request():
+      headers = {'host': domain_name, 'accept-encoding': 'gzip', 'user-agent': 'open-dash-loadtest'}
+      if request.body:
+        headers['content-type'] = 'application/json'
+
+      request_started_at = time.perf_counter()
+      response = distribution.dispatch(
+        method=request.method,
+        path=request.path,
+        query=request.query,
+        headers=headers,
+        body=request.body,
+      )
+      request_ended_at = time.perf_counter()
+      rss = max_rss_kib()
+
+      with lock:
+        stats = routes[request.route]
+        stats.latencies.append((request_ended_at - request_started_at) * 1000)
+        stats.origins[response.origin] = stats.origins.get(response.origin, 0) + 1
+        stats.cold_starts += int(response.cold_start)
+        stats.errors += int(response.status >= 500)
+        if rss is not None and rss > high_water:
+          stats.memory_growth_kib += rss - high_water
+          high_water = rss
+        if response.origin not in ['s3', 'cloudfront']:
+          function_intervals.append((request_started_at, request_ended_at))
+
+  with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+    for future in [executor.submit(worker) for _ in range(max(1, concurrency))]:
+      future.result()
+
+  return LoadTestResult(
+    routes={route: stats for route, stats in routes.items() if stats.latencies},
+    concurrency=max(1, concurrency),
+    seconds=time.perf_counter() - started_at,
+    peak_function_concurrency=peak_overlap(function_intervals),
+    max_rss_kib=max_rss_kib(),
+  )
+
+
+def load_test(
+  output_path: str,
+  *,
+  recordings: list[str] = None,
+  navigations: bool = True,
+  concurrency: int = 1,
+  count: int = None,
+  duration: float = None,
+  domain_name: str = 'localhost',
+) -> LoadTestResult:
+  """
+  Builds a workload from the app's page navigations and recorded requests, and runs it against the bundle in
+  output_path the way its CloudFront distribution would serve it.
+  """
+  if os.path.isdir(output_path):
+    output_path = os.path.join(output_path, 'open-dash.output.json')
+
+  with open(output_path, 'r') as file:
+    origin_path_prefix = json.load(file)['cloudFrontConfig']['origins'].get('s3', {}).get('originPathPrefix') or ''
+
+  workload, skipped_pages = [], []
+  if navigations:
+    url_base = f'/{origin_path_prefix}/' if origin_path_prefix else '/'
+    workload, skipped_pages = navigation_requests(page_registry(output_path), url_base)
+
+  for recording in recordings or []:
+    workload.extend(read_recording(recording))
+
+  if not workload:
+    print('Error: The workload is empty. Record requests with open-dash serve --record or enable navigations.')
+    sys.exit(1)
+
+  distribution = Distribution(output_path, domain_name)
+  result = run(distribution, workload, concurrency=concurrency, count=count, duration=duration, domain_name=domain_name)
+  result.skipped_pages = skipped_pages
+  return result
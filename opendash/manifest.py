@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+import json
+import os
+from typing import Self
+
+
+@dataclass(kw_only=True)
+class Manifest:
+  """
+  The S3 objects listed in an open-dash.output.json file, keyed by S3 key.
+  """
+  objects: dict[str, dict]
+
+  """
+  The CloudFront default root object. CloudFront serves it for "/", so invalidating it also requires invalidating "/".
+  """
+  default_root_object: str
+
+  """
+  Loads the manifest from an open-dash.output.json file or from the .open-dash directory that contains it.
+  """
+  @staticmethod
+  def from_path(path: str) -> Self:
+    if os.path.isdir(path):
+      path = os.path.join(path, 'open-dash.output.json')
+
+    with open(path, 'r') as file:
+      data = json.load(file)
+
+    cloud_front_config = data.get('cloudFrontConfig', {})
+    s3_origin = cloud_front_config.get('origins', {}).get('s3', {})
+    return Manifest(
+      default_root_object=cloud_front_config.get('defaultRootObject', ''),
+      objects={obj['key']: obj for obj in s3_origin.get('objects', [])},
+    )
+
+
+@dataclass(kw_only=True)
+class ManifestDiff:
+  """
+  Keys that only exist in the new manifest.
+  """
+  added: list[str]
+
+  """
+  Keys whose content hash changed between the manifests.
+  """
+  modified: list[str]
+
+  """
+  Keys that only exist in the old manifest.
+  """
+  removed: list[str]
+
+  """
+  The smallest set of CloudFront invalidation paths that covers every changed mutable object.
+  """
+  invalidation_paths: list[str]
+
+  def to_json(self) -> str:
+    return json.dumps({
+      'added': self.added,
+      'removed': self.removed,
+      'modified': self.modified,
+      'invalidationPaths': self.invalidation_paths,
+    }, indent=2)
+
+
+def diff(old: Manifest, new: Manifest) -> ManifestDiff:
+  added = sorted(key for key in new.objects if key not in old.objects)
+  removed = sorted(key for key in old.objects if key not in new.objects)
+  modified = sorted(
+    key for key in new.objects if key in old.objects and new.objects[key]['hash'] != old.objects[key]['hash']
+  )
+
+  # Fingerprinted objects get a new key whenever their content changes, and added objects were never cached, so only
+  # mutable objects that were modified or removed can be stale at the edge.
+  stale = [key for key in modified + removed if not old.objects[key].get('fingerprinted', False)]
+  changed = set(added + modified + removed)
+
+  return ManifestDiff(
+    added=added,
+    removed=removed,
+    modified=modified,
+    invalidation_paths=invalidation_paths(stale, changed, set(old.objects) | set(new.objects), old.default_root_object),
+  )
+
+
+def invalidation_paths(stale: list[str], changed: set[str], all_keys: set[str], default_root_object: str) -> list[str]:
+  """
+  Collapses stale keys into directory wildcards when every object under the directory changed, which is safe because
+  the wildcard cannot evict anything that is still current.
+  """
+  paths = set(stale)
+  directories = sorted({os.path.dirname(key) for key in stale if os.path.dirname(key)}, key=len, reverse=True)
+  for directory in directories:
+    keys_in_directory = [key for key in all_keys if key.startswith(f'{directory}/')]
+    covered = [path for path in paths if path.startswith(f'{directory}/')]
+    if len(covered) > 1 and all(key in changed for key in keys_in_directory):
+      paths.difference_update(covered)
+      paths.add(f'{directory}/*')
+
+  result = sorted(f'/{path}' for path in paths)
+  if default_root_object and default_root_object in stale:
+    result.insert(0, '/')
+
+  return result
@@ -0,0 +1,216 @@
+import csv
+from dataclasses import dataclass, field
+import glob
+import json
+import os
+
+from opendash.config import Budgets
+from opendash.manifest import Manifest
+
+
+# Installers that the virtual environment needs but the Lambda image does not ship with the app's dependencies.
+EXCLUDED_PACKAGES = {'pip', 'setuptools', 'wheel'}
+
+# The number of rows listed per section in the text summary. The JSON report lists every row.
+SUMMARY_ROWS = 10
+
+
+@dataclass(kw_only=True)
+class BudgetViolation:
+  """
+  The name of the budget in open-dash.config.json, e.g. "suite-bytes".
+  """
+  budget: str
+
+  """
+  What exceeded the budget, e.g. a component suite namespace or a page. Empty for budgets on totals.
+  """
+  subject: str
+
+  limit: int
+  actual: int
+
+  def message(self) -> str:
+    subject = f' {self.subject}' if self.subject else ''
+    return f'{self.budget}{subject} is {format_size(self.actual)}, over the budget of {format_size(self.limit)}.'
+
+
+@dataclass(kw_only=True)
+class SizeReport:
+  """
+  The total size of the objects in the static origin, including source maps.
+  """
+  static_bytes: int
+
+  """
+  The size of the component suites by namespace, without source maps. Dash's own libraries are split by sub-package,
+  e.g. dash/dcc. Objects with the same content, such as the fingerprinted and plain copies of a suite, count once.
+  """
+  suites: dict[str, int]
+
+  """
+  The size of each exported page payload, keyed by page.
+  """
+  pages: dict[str, int]
+
+  """
+  The size of the exported _dash-layout, or 0 if the layout was not exported.
+  """
+  layout_bytes: int
+
+  """
+  The size of the server function bundle plus the packages installed in the virtual environment.
+  """
+  server_function_bytes: int
+
+  """
+  The size of the server function bundle by top-level file or directory, and of each installed package.
+  """
+  server_function: dict[str, int]
+
+  violations: list[BudgetViolation] = field(default_factory=list)
+
+  def to_json(self) -> str:
+    return json.dumps({
+      'staticBytes': self.static_bytes,
+      'suites': self.suites,
+      'pages': self.pages,
+      'layoutBytes': self.layout_bytes,
+      'serverFunctionBytes': self.server_function_bytes,
+      'serverFunction': self.server_function,
+      'violations': [
+        {'budget': v.budget, 'subject': v.subject, 'limit': v.limit, 'actual': v.actual} for v in self.violations
+      ],
+    }, indent=2, sort_keys=True)
+
+  def summary(self) -> str:
+    lines = [f'Static origin: {format_size(self.static_bytes)}']
+    lines.extend(summary_rows('Component suites', self.suites))
+    lines.extend(summary_rows('Page payloads', self.pages))
+    lines.append(f'  _dash-layout: {format_size(self.layout_bytes)}')
+    lines.append(f'Server function: {format_size(self.server_function_bytes)}')
+    lines.extend(summary_rows('Largest files and packages', self.server_function))
+    if self.violations:
+      lines.append('Budgets exceeded:')
+      lines.extend(f'  {violation.message()}' for violation in self.violations)
+
+    return '\n'.join(lines)
+
+
+def format_size(size: int) -> str:
+  for unit in ['B', 'KiB', 'MiB']:
+    if size < 1024 or unit == 'MiB':
+      return f'{size} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+    size /= 1024
+
+
+def summary_rows(title: str, sizes: dict[str, int]) -> list[str]:
+  if not sizes:
+    return []
+
+  rows = sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+  lines = [f'  {title}:']
+  lines.extend(f'    {name}: {format_size(size)}' for name, size in rows[:SUMMARY_ROWS])
+  if len(rows) > SUMMARY_ROWS:
+    lines.append(f'    ... {len(rows) - SUMMARY_ROWS} more')
+
+  return lines
+
+
+def suite_namespace(path: str) -> str:
+  parts = path.split('/')
+  return '/'.join(parts[:2]) if parts[0] == 'dash' and len(parts) > 2 else parts[0]
+
+
+def directory_size(path: str) -> int:
+  if os.path.isfile(path):
+    return os.path.getsize(path)
+
+  size = 0
+  for root, _, filenames in os.walk(path):
+    size += sum(os.path.getsize(os.path.join(root, filename)) for filename in filenames)
+
+  return size
+
+
+def package_sizes(virtualenv_path: str) -> dict[str, int]:
+  """
+  Reads the installed size of each distribution from the RECORD files in the virtual environment's site-packages.
+  """
+  sizes = {}
+  records = glob.glob(os.path.join(virtualenv_path, 'lib', 'python*', 'site-packages', '*.dist-info', 'RECORD'))
+  for record in records:
+    name = os.path.basename(os.path.dirname(record)).split('-')[0]
+    if name.lower() in EXCLUDED_PACKAGES:
+      continue
+
+    with open(record, 'r', newline='') as file:
+      sizes[name] = sum(int(row[2]) for row in csv.reader(file) if len(row) > 2 and row[2].isdigit())
+
+  return sizes
+
+
+def measure(open_dash_path: str, virtualenv_path: str = None) -> SizeReport:
+  """
+  Measures the bundle in a .open-dash directory from its open-dash.output.json and server function directory.
+  """
+  with open(os.path.join(open_dash_path, 'open-dash.output.json'), 'r') as file:
+    origin_path_prefix = json.load(file)['cloudFrontConfig']['origins']['s3'].get('originPathPrefix') or ''
+
+  suite_hashes: dict[str, set[str]] = {}
+  suites, pages, layout_bytes = {}, {}, 0
+  objects = Manifest.from_path(open_dash_path).objects
+  for key, obj in objects.items():
+    path = key[len(origin_path_prefix):].lstrip('/') if key.startswith(origin_path_prefix) else key
+    if path.startswith('_dash-component-suites/') and not path.endswith('.map'):
+      namespace = suite_namespace(path[len('_dash-component-suites/'):])
+      if obj['hash'] not in suite_hashes.setdefault(namespace, set()):
+        suite_hashes[namespace].add(obj['hash'])
+        suites[namespace] = suites.get(namespace, 0) + obj['size']
+    elif path.startswith('_dash-update-component/') and not path.startswith('_dash-update-component/_callbacks/'):
+      pages[path[len('_dash-update-component/'):]] = obj['size']
+    elif path == '_dash-layout':
+      layout_bytes = obj['size']
+
+  # Static-only bundles have no server function.
+  server_functions_path = os.path.join(open_dash_path, 'server-functions', 'default')
+  server_function = {
+    name: directory_size(os.path.join(server_functions_path, name))
+    for name in (os.listdir(server_functions_path) if os.path.isdir(server_functions_path) else [])
+  }
+  if virtualenv_path:
+    server_function.update({
+      f'{name} (package)': size for name, size in package_sizes(virtualenv_path).items()
+    })
+
+  return SizeReport(
+    static_bytes=sum(obj['size'] for obj in objects.values()),
+    suites=suites,
+    pages=pages,
+    layout_bytes=layout_bytes,
+    server_function_bytes=sum(server_function.values()),
+    server_function=server_function,
+  )
+
+
+def check(report: SizeReport, budgets: Budgets) -> list[BudgetViolation]:
+  limits = [
+    ('static-bytes', budgets.static_bytes, {'': report.static_bytes}),
+    ('suite-bytes', budgets.suite_bytes, report.suites),
+    ('page-bytes', budgets.page_bytes, report.pages),
+    ('layout-bytes', budgets.layout_bytes, {'': report.layout_bytes}),
+    ('server-function-bytes', budgets.server_function_bytes, {'': report.server_function_bytes}),
+  ]
+
+  violations = []
+  for budget, limit, sizes in limits:
+    if limit is None:
+      continue
+
+    violations.extend(
+      BudgetViolation(budget=budget, subject=subject, limit=limit, actual=actual)
+      for subject, actual in sorted(sizes.items())
+      if actual > limit
+    )
+
+  return violations
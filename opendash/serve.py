@@ -0,0 +1,349 @@
+from base64 import b64decode, b64encode
+from dataclasses import dataclass, field
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from urllib.parse import parse_qsl, urlsplit
+import uuid
+
+from opendash.manifest import Manifest
+
+
+# CloudFront compresses these content types when the viewer accepts gzip. Fonts, images and other binary types are
+# already compressed.
+COMPRESSIBLE_TYPES = re.compile(r'^(text/|application/(json|javascript|xml|x-javascript)|image/svg\+xml)')
+MIN_COMPRESSED_SIZE = 1000
+
+# The response header that tells the viewer which origin served a request.
+ORIGIN_HEADER = 'X-Open-Dash-Origin'
+
+
+@dataclass(kw_only=True)
+class Response:
+  status: int
+  headers: list[tuple[str, str]] = field(default_factory=list)
+  body: bytes = b''
+
+  """
+  The origin that served the request: "s3" or the name of a function origin, e.g. "default".
+  """
+  origin: str
+
+  """
+  Whether the function origin loaded the app to serve this request, like a Lambda cold start.
+  """
+  cold_start: bool = False
+
+
+class FunctionInstance:
+  """
+  Runs a function origin's handler in-process, like a single Lambda execution environment. The bundle is loaded on the
+  first request, and requests are handled one at a time because a Lambda environment never runs two at once.
+  """
+  def __init__(self, bundle_path: str, handler: str, domain_name: str):
+    self.__bundle_path = bundle_path
+    self.__module_name, self.__function_name = handler.rsplit('.', 1)
+    self.__domain_name = domain_name
+    self.__handler = None
+    self.__lock = threading.Lock()
+
+  def invoke(self, event: dict) -> tuple[dict, bool]:
+    with self.__lock:
+      cold_start = self.__handler is None
+      if cold_start:
+        self.__handler = self.__load()
+
+      return self.__handler(event, LambdaContext()), cold_start
+
+  def __load(self):
+    # Lambda runs the handler from the task root, so relative paths in the app resolve against the bundle.
+    os.environ.setdefault('DOMAIN_NAME', self.__domain_name)
+    os.chdir(self.__bundle_path)
+    sys.path.insert(0, self.__bundle_path)
+
+    spec = importlib.util.spec_from_file_location(
+      self.__module_name,
+      os.path.join(self.__bundle_path, f'{self.__module_name}.py'),
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[self.__module_name] = module
+    spec.loader.exec_module(module)
+    return getattr(module, self.__function_name)
+
+
+class LambdaContext:
+  function_name = 'open-dash-serve'
+  memory_limit_in_mb = 0
+
+  def __init__(self):
+    self.aws_request_id = str(uuid.uuid4())
+
+  def get_remaining_time_in_millis(self) -> int:
+    return 900000
+
+
+class Distribution:
+  """
+  Serves a bundle the way its CloudFront distribution would. Requests are matched against the behaviors in order.
+  S3 behaviors serve the exported objects from disk with their content types and Cache-Control metadata, and function
+  behaviors call the handler in-process with a Lambda Function URL event.
+  """
+  def __init__(self, output_path: str, domain_name: str = 'localhost'):
+    if os.path.isdir(output_path):
+      output_path = os.path.join(output_path, 'open-dash.output.json')
+
+    with open(output_path, 'r') as file:
+      output = json.load(file)
+    cloud_front_config = output['cloudFrontConfig']
+
+    if 'backgroundWorker' in output.get('additionalBundles', {}):
+      # Every function runs in this process, so background callbacks can run on its threads and keep their results in
+      # its memory. Deployed functions are configured with a queue and store that they share.
+      os.environ.setdefault('OPEN_DASH_BACKGROUND_QUEUE', 'local')
+      os.environ.setdefault('OPEN_DASH_BACKGROUND_STORE', 'memory')
+
+    # Object sources and function bundles are relative to the directory that contains .open-dash.
+    self.__base_path = os.path.abspath(os.path.join(os.path.dirname(output_path), os.pardir))
+    self.__objects = Manifest.from_path(output_path).objects
+    self.__default_root_object = cloud_front_config.get('defaultRootObject')
+    self.__origin_path_prefix = cloud_front_config['origins'].get('s3', {}).get('originPathPrefix') or ''
+    self.__behaviors = [
+      (pattern_regex(behavior['pattern']), behavior['origin']) for behavior in cloud_front_config['behaviors']
+    ]
+    self.__functions = {
+      name: FunctionInstance(os.path.join(self.__base_path, origin['bundle']), origin['handler'], domain_name)
+      for name, origin in cloud_front_config['origins'].items()
+      if origin.get('type') == 'function'
+    }
+
+  def dispatch(self, *, method: str, path: str, query: str = '', headers: dict[str, str], body: bytes) -> Response:
+    # CloudFront replaces a request for the root with the default root object before it matches the behaviors.
+    if path == '/' and self.__default_root_object:
+      path = f'/{self.__default_root_object}'
+
+    origin = next((origin for regex, origin in self.__behaviors if regex.match(path.lstrip('/'))), None)
+    if origin is None:
+      return Response(status=404, origin='cloudfront', body=b'No behavior matches this path.')
+
+    if origin in self.__functions:
+      return self.__invoke_function(origin, method=method, path=path, query=query, headers=headers, body=body)
+
+    key = self.__object_key(method, path, body)
+    if key is None:
+      # Only Dash Pages requests for exported pages are answered from S3. Other callbacks, and pages with path
+      # variables or query strings, fall through to the function origin.
+      origin = next(iter(self.__functions), None)
+      if method == 'POST' and origin:
+        return self.__invoke_function(origin, method=method, path=path, query=query, headers=headers, body=body)
+
+    return self.__serve_object(key, method=method, headers=headers)
+
+  def __object_key(self, method: str, path: str, body: bytes) -> str | None:
+    if method in ['GET', 'HEAD']:
+      return path.lstrip('/')
+
+    if method != 'POST' or not path.endswith('_dash-update-component'):
+      return None
+
+    try:
+      request = json.loads(body)
+    except ValueError:
+      return None
+
+    location = {
+      item.get('property'): item.get('value') for item in request.get('inputs', [])
+      if isinstance(item, dict) and item.get('id') == '_pages_location'
+    }
+    is_pages_request = '_pages_content.children' in request.get('output', '')
+    if not is_pages_request or location.get('search') or 'pathname' not in location:
+      return None
+
+    # Page payloads are stored under the page's path relative to the app's base path, and the root page as "index".
+    page_path = location['pathname'].strip('/')
+    if self.__origin_path_prefix and page_path.startswith(self.__origin_path_prefix):
+      page_path = page_path[len(self.__origin_path_prefix):].strip('/')
+
+    key = '/'.join(filter(None, [self.__origin_path_prefix, '_dash-update-component', page_path or 'index']))
+    return key if key in self.__objects else None
+
+  def __serve_object(self, key: str | None, *, method: str, headers: dict[str, str]) -> Response:
+    obj = self.__objects.get(key) if key else None
+    if obj is None:
+      # Buckets behind an origin access control answer 403 for missing keys, because listing is not allowed.
+      return Response(status=403, origin='s3', body=b'AccessDenied', headers=[('Content-Type', 'application/xml')])
+
+    etag = f'"{obj["hash"]}"'
+    response_headers = [('ETag', etag), ('Content-Type', obj.get('contentType') or 'application/octet-stream')]
+    if obj.get('cacheControl'):
+      response_headers.append(('Cache-Control', obj['cacheControl']))
+
+    if headers.get('if-none-match') == etag:
+      return Response(status=304, origin='s3', headers=response_headers)
+
+    with open(os.path.join(self.__base_path, obj['source']), 'rb') as file:
+      body = file.read()
+
+    accepts_gzip = 'gzip' in headers.get('accept-encoding', '')
+    if accepts_gzip and len(body) >= MIN_COMPRESSED_SIZE and COMPRESSIBLE_TYPES.match(response_headers[1][1]):
+      body = gzip.compress(body)
+      response_headers.append(('Content-Encoding', 'gzip'))
+
+    response_headers.append(('Vary', 'Accept-Encoding'))
+    return Response(status=200, origin='s3', headers=response_headers, body=b'' if method == 'HEAD' else body)
+
+  def __invoke_function(
+    self,
+    origin: str,
+    *,
+    method: str,
+    path: str,
+    query: str,
+    headers: dict[str, str],
+    body: bytes,
+  ) -> Response:
+    try:
+      result, cold_start = self.__functions[origin].invoke(function_url_event(method, path, query, headers, body))
+    except Exception:
+      # CloudFront answers 502 when the function origin fails.
+      traceback.print_exc()
+      return Response(status=502, origin=origin, body=b'The function origin raised an exception.')
+
+    response_body = result.get('body') or ''
+    if result.get('isBase64Encoded'):
+      response_body = b64decode(response_body)
+    elif isinstance(response_body, str):
+      response_body = response_body.encode('UTF-8')
+
+    response_headers = [(name, str(value)) for name, value in (result.get('headers') or {}).items()]
+    response_headers.extend(('Set-Cookie', cookie) for cookie in result.get('cookies') or [])
+    return Response(
+      status=int(result.get('statusCode', 200)),
+      origin=origin,
+      headers=response_headers,
+      body=response_body,
+      cold_start=cold_start,
+    )
+
+
+def pattern_regex(pattern: str) -> re.Pattern:
+  """
+  CloudFront path patterns are case-sensitive, * matches any characters including / and ? matches one character.
+  """
+  regex = ''.join('.*' if char == '*' else '.' if char == '?' else re.escape(char) for char in pattern.lstrip('/'))
+  return re.compile(f'^{regex}$')
+
+
+def function_url_event(method: str, path: str, query: str, headers: dict[str, str], body: bytes) -> dict:
+  """
+  Builds a Lambda Function URL (payload format 2.0) event, which is what CloudFront sends to the function origin.
+  """
+  try:
+    event_body, is_base64_encoded = body.decode('UTF-8'), False
+  except UnicodeDecodeError:
+    event_body, is_base64_encoded = b64encode(body).decode('ascii'), True
+
+  event = {
+    'version': '2.0',
+    'routeKey': '$default',
+    'rawPath': path,
+    'rawQueryString': query,
+    'headers': {name.lower(): value for name, value in headers.items() if name.lower() != 'cookie'},
+    'requestContext': {
+      'accountId': 'anonymous',
+      'domainName': headers.get('host', 'localhost'),
+      'domainPrefix': headers.get('host', 'localhost').split('.')[0],
+      'requestId': str(uuid.uuid4()),
+      'routeKey': '$default',
+      'stage': '$default',
+      'time': time.strftime('%d/%b/%Y:%H:%M:%S +0000', time.gmtime()),
+      'timeEpoch': int(time.time() * 1000),
+      'http': {
+        'method': method,
+        'path': path,
+        'protocol': 'HTTP/1.1',
+        'sourceIp': '127.0.0.1',
+        'userAgent': headers.get('user-agent', ''),
+      },
+    },
+    'body': event_body,
+    'isBase64Encoded': is_base64_encoded,
+  }
+  if query:
+    event['queryStringParameters'] = dict(parse_qsl(query, keep_blank_values=True))
+  if headers.get('cookie'):
+    event['cookies'] = [cookie.strip() for cookie in headers['cookie'].split(';')]
+
+  return event
+
+
+def serve(
+  output_path: str,
+  *,
+  host: str = '127.0.0.1',
+  port: int = 8000,
+  domain_name: str = None,
+  record_path: str = None,
+) -> None:
+  """
+  Serves the bundle over HTTP. With record_path, every POST request is appended to that file as a JSON line, so a
+  session can be replayed with open-dash loadtest.
+  """
+  distribution = Distribution(output_path, domain_name or f'{host}:{port}')
+  record_lock = threading.Lock()
+
+  class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def handle_request(self) -> None:
+      started_at = time.perf_counter()
+      url = urlsplit(self.path)
+      length = int(self.headers.get('Content-Length') or 0)
+      body = self.rfile.read(length) if length else b''
+      if record_path and self.command == 'POST':
+        record = {'method': self.command, 'path': url.path, 'query': url.query, 'body': body.decode('UTF-8', 'replace')}
+        with record_lock, open(record_path, 'a') as file:
+          file.write(json.dumps(record) + '\n')
+
+      response = distribution.dispatch(
+        method=self.command,
+        path=url.path,
+        query=url.query,
+        headers={name.lower(): value for name, value in self.headers.items()},
+        body=body,
+      )
+
+      self.send_response(response.status)
+      for name, value in response.headers:
+        if name.lower() not in ['content-length', 'transfer-encoding', 'connection']:
+          self.send_header(name, value)
+      self.send_header(ORIGIN_HEADER, response.origin)
+      self.send_header('Content-Length', str(len(response.body)))
+      self.end_headers()
+      if self.command != 'HEAD':
+        self.wfile.write(response.body)
+
+      milliseconds = (time.perf_counter() - started_at) * 1000
+      cold_start = ' (cold start)' if response.cold_start else ''
+      print(f'{self.command} {self.path} {response.status} {response.origin} {milliseconds:.1f}ms{cold_start}')
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = handle_request
+
+    def log_message(self, format: str, *args) -> None:
+      # Requests are logged by handle_request with their origin and duration.
+      pass
+
+  server = ThreadingHTTPServer((host, port), RequestHandler)
+  print(f'Serving {output_path} at http://{host}:{port}. Press Ctrl+C to stop.')
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
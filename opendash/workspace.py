@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import os
+import tempfile
+import threading
+import time
+
+from opendash import bundle
+from opendash.config import Config, Workspace
+
+
+@dataclass(kw_only=True)
+class AppResult:
+  """
+  The name the app's log lines are prefixed with. This is the name of its source directory.
+  """
+  name: str
+
+  config_path: str
+  succeeded: bool
+
+  """
+  The duration of each bundling phase in seconds. Phases after a failure are missing.
+  """
+  timings: dict[str, float] = field(default_factory=dict)
+
+  """
+  The wall-clock duration of the app's bundle in seconds, including the time spent waiting for a pip slot.
+  """
+  seconds: float = 0.0
+
+
+@dataclass(kw_only=True)
+class WorkspaceResult:
+  apps: list[AppResult]
+
+  """
+  The wall-clock duration of the run in seconds.
+  """
+  seconds: float = 0.0
+
+  @property
+  def succeeded(self) -> bool:
+    return all(app.succeeded for app in self.apps)
+
+  def summary(self) -> str:
+    failed = [app for app in self.apps if not app.succeeded]
+    lines = [f'Bundled {len(self.apps) - len(failed)} of {len(self.apps)} apps in {self.seconds:.1f}s.']
+    for app in self.apps:
+      phases = ', '.join(f'{phase} {seconds:.1f}s' for phase, seconds in app.timings.items() if phase != 'total')
+      status = 'ok' if app.succeeded else 'FAILED'
+      lines.append(f'  {app.name}: {status} in {app.seconds:.1f}s' + (f' ({phases})' if phases else ''))
+
+    return '\n'.join(lines)
+
+
+class AppLog:
+  """
+  Prints an app's output line by line with the app's name as a prefix, so the output of concurrent bundles stays
+  readable, and keeps a copy to write to the app's .open-dash/open-dash.log file.
+  """
+  def __init__(self, name: str, lock: threading.Lock):
+    self.__prefix = f'[{name}] '
+    self.__lock = lock
+    self.lines: list[str] = []
+
+  def __call__(self, message: str) -> None:
+    lines = str(message).rstrip('\n').split('\n')
+    with self.__lock:
+      self.lines.extend(lines)
+      for line in lines:
+        print(f'{self.__prefix}{line}')
+
+
+class PipSlot:
+  """
+  Held during an app's pip install. It bounds the number of concurrent installs and serializes installs into the same
+  virtual environment, which pip does not support. The environment lock is taken first so an app waiting for another
+  app's install into its environment does not hold one of the slots.
+  """
+  def __init__(self, semaphore: threading.Semaphore, environment_lock: threading.Lock):
+    self.__semaphore = semaphore
+    self.__environment_lock = environment_lock
+
+  def __enter__(self):
+    self.__environment_lock.acquire()
+    self.__semaphore.acquire()
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.__semaphore.release()
+    self.__environment_lock.release()
+
+
+def environment_key(config: Config) -> str | None:
+  """
+  Identifies the Python environment pip installs the app's dependencies into. None is the system interpreter.
+  """
+  return os.path.realpath(config.virtualenv_path) if config.virtualenv_path else None
+
+
+def bundle_app(
+  config_path: str,
+  config: Config,
+  name: str,
+  pip_slot: PipSlot,
+  pip_cache_dir: str,
+  lock: threading.Lock,
+) -> AppResult:
+  log = AppLog(name, lock)
+  result = AppResult(name=name, config_path=config_path, succeeded=False)
+  started_at = time.monotonic()
+  try:
+    result.timings = bundle.create(config, log=log, pip_slot=pip_slot, pip_cache_dir=pip_cache_dir)
+    result.succeeded = True
+  except SystemExit:
+    # bundle.create exits on errors, which are already logged.
+    pass
+  except Exception as error:
+    log(f'Error: {error!r}')
+
+  result.seconds = time.monotonic() - started_at
+  log_directory = os.path.join(config.target_base_path, '.open-dash')
+  if os.path.isdir(log_directory):
+    with open(os.path.join(log_directory, 'open-dash.log'), 'w') as f:
+      f.write('\n'.join(log.lines) + '\n')
+
+  return result
+
+
+def bundle_all(workspace: Workspace) -> WorkspaceResult:
+  """
+  Bundles every app in the workspace with up to workspace.workers apps at a time. Results are listed in the order of
+  workspace.config_paths.
+  """
+  started_at = time.monotonic()
+  configs = [Config.from_path(config_path) for config_path in workspace.config_paths]
+
+  # Apps are named after their source directory. Apps in directories with the same name are numbered.
+  names = [os.path.basename(os.path.normpath(config.source_path)) for config in configs]
+  names = [name if names.count(name) == 1 else f'{name}-{index + 1}' for index, name in enumerate(names)]
+
+  lock = threading.Lock()
+  semaphore = threading.Semaphore(max(1, workspace.pip_workers))
+  environment_locks: dict[str, threading.Lock] = {}
+  for config in configs:
+    environment_locks.setdefault(environment_key(config), threading.Lock())
+
+  with tempfile.TemporaryDirectory(prefix='open-dash-pip-') as temporary_cache_dir:
+    pip_cache_dir = workspace.pip_cache_dir or temporary_cache_dir
+    with ThreadPoolExecutor(max_workers=max(1, workspace.workers)) as executor:
+      futures = [
+        executor.submit(
+          bundle_app,
+          config_path,
+          config,
+          name,
+          PipSlot(semaphore, environment_locks[environment_key(config)]),
+          pip_cache_dir,
+          lock,
+        )
+        for config_path, config, name in zip(workspace.config_paths, configs, names)
+      ]
+      apps = [future.result() for future in futures]
+
+  return WorkspaceResult(apps=apps, seconds=time.monotonic() - started_at)
@@ -14,14 +14,16 @@ class IntegrationTestBase(TestCase):
     *,
     application_name: str,
     is_lambda_build: bool = False,
-    data_path: str = None
+    data_path: str = None,
+    static_only: bool = False
   ):
     super().__init__(method_name)
 
     opendash_path = os.path.abspath(os.path.join(os.path.basename(__file__), '..'))
+    build_name = f'{application_name}-static-only' if static_only else application_name
     
-    self._venv_path = os.path.join(opendash_path, f'.venv-{application_name}')
-    self._output_path = os.path.join(opendash_path, f'output-{application_name}')
+    self._venv_path = os.path.join(opendash_path, f'.venv-{build_name}')
+    self._output_path = os.path.join(opendash_path, f'output-{build_name}')
     self._source_path = os.path.join(opendash_path, 'examples', application_name)
 
     self._config = Config(
@@ -31,6 +33,7 @@ class IntegrationTestBase(TestCase):
       domain_name='localhost',
       source_path=self._source_path,
       include_warmer=is_lambda_build,
+      static_only=static_only,
       virtualenv_path=self._venv_path,
       target_base_path=self._output_path,
       fingerprint=FingerPrint(
@@ -50,6 +53,21 @@ class IntegrationTestBase(TestCase):
     )
     print(result.stdout)
 
+    if self._config.static_only:
+      # Static-only bundles run against an environment that already has the app's dependencies.
+      result = subprocess.run(
+        [
+          os.path.join(self._venv_path, 'bin', 'pip3'),
+          'install',
+          '-r',
+          os.path.join(self._source_path, 'requirements.txt'),
+        ],
+        text=True,
+        env=os.environ,
+        capture_output=True,
+      )
+      print(result.stdout)
+
     bundle.create(self._config)
 
   def validate_output_folder(self, fixture_path: str):
@@ -84,6 +102,8 @@ class IntegrationTestBase(TestCase):
         self.__validate_behavior_patterns('s3', fixture['s3BehaviorPatterns'], open_dash_output)
         self.__validate_behavior_patterns('default', fixture['defaultBehaviorPatterns'], open_dash_output)
         self.__validate_mimetypes(fixture['mimetypes'], open_dash_output)
+        self.__validate_objects(fixture['objects'], open_dash_output)
+        self.__validate_cache_policies(fixture['cachePolicies'], open_dash_output)
 
   @classmethod
   def tearDownClass(cls):
@@ -114,6 +134,33 @@ class IntegrationTestBase(TestCase):
         f'Mimetypes do not match for {file}.'
       )
 
+  def __validate_objects(self, expected_objects: dict[str, dict], open_dash_output: dict):
+    objects = {obj['key']: obj for obj in open_dash_output['cloudFrontConfig']['origins']['s3']['objects']}
+    for key, expected in expected_objects.items():
+      self.assertIn(key, objects, f'{key} is missing from the S3 objects.')
+      self.assertEqual(expected['contentType'], objects[key]['contentType'], f'Content type does not match for {key}.')
+      self.assertEqual(
+        expected['fingerprinted'],
+        objects[key]['fingerprinted'],
+        f'Fingerprinted status does not match for {key}.'
+      )
+
+    for key, obj in objects.items():
+      self.assertEqual(
+        os.path.getsize(os.path.join(self._output_path, obj['source'])),
+        obj['size'],
+        f'Size does not match for {key}.'
+      )
+
+  def __validate_cache_policies(self, expected_policies: dict[str, str], open_dash_output: dict):
+    cloud_front_config = open_dash_output['cloudFrontConfig']
+    behavior_policies = {behavior['pattern']: behavior['cachePolicy'] for behavior in cloud_front_config['behaviors']}
+    for pattern, policy in expected_policies.items():
+      self.assertEqual(policy, behavior_policies.get(pattern), f'Cache policy does not match for {pattern}.')
+
+    for pattern, policy in behavior_policies.items():
+      self.assertIn(policy, cloud_front_config['cachePolicies'], f'Cache policy {policy} for {pattern} is not defined.')
+
   def __validate_behavior_patterns(self, origin: str, expected_patterns: list[str], open_dash_output: dict):
     current_patterns = []
     for pattern in open_dash_output['cloudFrontConfig']['behaviors']:
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+
+from opendash.cache import BuildCache, output_key
+from opendash.config import Config
+from unittest import TestCase
+
+
+def write(path: str, content: bytes) -> None:
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, 'wb') as file:
+    file.write(content)
+
+
+class BuildCacheTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    self.__root = self.__directory.name
+    self.__cache = BuildCache(os.path.join(self.__root, 'cache'), max_bytes=1000)
+
+  def tearDown(self):
+    self.__directory.cleanup()
+
+  def output(self, name: str, files: dict[str, bytes]) -> str:
+    path = os.path.join(self.__root, name, '.open-dash')
+    for relative_path, content in files.items():
+      write(os.path.join(path, *relative_path.split('/')), content)
+    os.makedirs(os.path.join(path, 'data'), exist_ok=True)
+    return path
+
+  def test_outputs_are_restored_and_shared_content_is_stored_once(self):
+    suite = b'suite' * 50
+    main = self.output('main', {'static/dcc.js': suite, 'open-dash.output.json': b'{"main": 1}', 'open-dash.log': b''})
+    branch = self.output('branch', {'static/dcc.js': suite, 'open-dash.output.json': b'{"branch": 1}'})
+
+    self.assertEqual(0, self.__cache.store('main', main).reused_files)
+    result = self.__cache.store('branch', branch)
+    self.assertEqual((2, 1, len(suite)), (result.files, result.reused_files, result.reused_bytes))
+
+    target = os.path.join(self.__root, 'restored', '.open-dash')
+    write(os.path.join(target, 'stale.txt'), b'stale')
+    self.assertTrue(self.__cache.restore('main', target))
+    self.assertFalse(self.__cache.restore('missing', target))
+
+    with open(os.path.join(target, 'static', 'dcc.js'), 'rb') as file:
+      self.assertEqual(suite, file.read())
+    self.assertTrue(os.path.isdir(os.path.join(target, 'data')))
+    self.assertFalse(os.path.exists(os.path.join(target, 'stale.txt')))
+    self.assertFalse(os.path.exists(os.path.join(target, 'open-dash.log')))
+
+  def test_least_recently_used_entries_are_evicted_over_the_size_limit(self):
+    self.__cache.store('old', self.output('old', {'a.js': b'a' * 400}))
+    self.__cache.store('used', self.output('used', {'b.js': b'b' * 400}))
+    past = time.time() - 60
+    os.utime(os.path.join(self.__cache.path, 'entries', 'old.json'), (past, past))
+    os.utime(os.path.join(self.__cache.path, 'entries', 'used.json'), (past - 60, past - 60))
+    self.assertTrue(self.__cache.has('used'))
+
+    self.__cache.store('new', self.output('new', {'c.js': b'c' * 400}))
+
+    self.assertFalse(self.__cache.has('old'))
+    self.assertTrue(self.__cache.has('used'))
+    self.assertTrue(self.__cache.restore('new', os.path.join(self.__root, 'restored')))
+
+  def test_least_recently_used_images_count_towards_the_size_limit(self):
+    write(os.path.join(self.__cache.path, 'images', 'old', 'image'), b'o' * 300)
+    write(os.path.join(self.__cache.path, 'images', 'used', 'webp'), b'u' * 300)
+    write(os.path.join(self.__cache.path, 'images', '.partial', 'image'), b'p' * 300)
+    past = time.time() - 60
+    os.utime(os.path.join(self.__cache.path, 'images', 'old'), (past - 60, past - 60))
+    os.utime(os.path.join(self.__cache.path, 'images', 'used'), (past, past))
+
+    self.__cache.store('new', self.output('new', {'c.js': b'c' * 500}))
+
+    self.assertEqual(['.partial', 'used'], sorted(os.listdir(os.path.join(self.__cache.path, 'images'))))
+    self.assertTrue(self.__cache.has('new'))
+    self.assertEqual([], self.__cache.evict())
+
+  def test_output_keys_change_with_the_source_but_not_the_target(self):
+    source_path = os.path.join(self.__root, 'app', 'src')
+    write(os.path.join(source_path, 'app.py'), b'app = 1')
+    write(os.path.join(source_path, 'requirements.txt'), b'dash==2.18.2')
+    config = Config.from_path(os.path.join(self.__root, 'missing.json'))
+    config.source_path = source_path
+
+    key = output_key(config)
+    config.target_base_path = os.path.join(self.__root, 'elsewhere')
+    self.assertEqual(key, output_key(config))
+
+    write(os.path.join(source_path, 'requirements.txt'), b'dash==2.18.1')
+    self.assertNotEqual(key, output_key(config))
@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import subprocess
+
+from opendash.assets import open_dash_callbacks
+from unittest import TestCase, skipUnless
+
+
+CLIENT_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'opendash', 'assets', 'client')
+
+# Runs the static callbacks shim with a stub window and prints the URLs it fetches for one request.
+SHIM_RUNNER = '''
+const fs = require('fs');
+const [scriptPath, config, body] = process.argv.slice(1);
+const requests = [];
+globalThis.document = { baseURI: 'http://localhost/' };
+globalThis.window = {
+  crypto: globalThis.crypto,
+  TextEncoder: TextEncoder,
+  location: { origin: 'http://localhost' },
+  fetch: function (input) {
+    requests.push(String(input));
+    return Promise.resolve({ ok: true });
+  },
+};
+eval(fs.readFileSync(scriptPath, 'utf8').replace('__OPEN_DASH_CONFIG__', config));
+window.fetch('/_dash-update-component', { method: 'POST', body: body }).then(function () {
+  console.log(JSON.stringify(requests));
+});
+'''
+
+
+class CanonicalJsonTest(TestCase):
+  def test_numbers_are_written_like_javascript_writes_them(self):
+    self.assertEqual(
+      '[1e-7,0.00001,0.0001,2,-0.5,10000000000000000,1e+21,1152921504606847000,null]',
+      open_dash_callbacks.canonical_json([1e-07, 1e-05, 0.0001, 2.0, -0.5, 1e16, 1e21, 2 ** 60, float('nan')]),
+    )
+
+  def test_keys_are_sorted_and_strings_are_not_escaped_to_ascii(self):
+    self.assertEqual(
+      '{"a":"Zürich\\n","b":{"c":true,"d":null}}',
+      open_dash_callbacks.canonical_json({'b': {'d': None, 'c': True}, 'a': 'Zürich\n'}),
+    )
+
+  def test_requests_are_identified_by_their_output_and_values(self):
+    request = {
+      'output': 'graph.figure',
+      'outputs': {'id': 'graph', 'property': 'figure'},
+      'inputs': [{'id': 'threshold', 'property': 'value', 'value': 1e-07}],
+      'changedPropIds': ['threshold.value'],
+    }
+
+    self.assertEqual(
+      '{"inputs":[{"id":"threshold","property":"value","value":1e-7}],"output":"graph.figure","state":[]}',
+      open_dash_callbacks.canonical_request(request),
+    )
+
+
+@skipUnless(shutil.which('node'), 'Node.js is not installed')
+class ClientShimTest(TestCase):
+  def fetched_urls(self, hashes: list[str], request: dict) -> list[str]:
+    result = subprocess.run(
+      [
+        'node',
+        '-e',
+        SHIM_RUNNER,
+        os.path.join(CLIENT_PATH, 'static-callbacks.js'),
+        json.dumps({'hashes': hashes, 'prefix': '/'}),
+        json.dumps(request),
+      ],
+      text=True,
+      capture_output=True,
+      check=True,
+    )
+    return json.loads(result.stdout)
+
+  def test_the_shim_hashes_requests_like_the_bundler(self):
+    request = {
+      'output': '..graph.figure...table.data..',
+      'outputs': [{'id': 'graph', 'property': 'figure'}, {'id': 'table', 'property': 'data'}],
+      'inputs': [
+        {'id': 'range', 'property': 'value', 'value': [1e-07, 2.0, 0.5, 1e21, 12345678901234567890]},
+        {'id': 'city', 'property': 'value', 'value': 'Zürich "centre"'},
+        {'id': 'options', 'property': 'data', 'value': {'z': None, 'a': [True, {'nested': 1e-05}]}},
+      ],
+      'state': [{'id': 'store', 'property': 'data'}],
+      'changedPropIds': [],
+    }
+    request_hash = open_dash_callbacks.request_hash(request)
+
+    self.assertListEqual(
+      [f'/_dash-update-component/_callbacks/{request_hash}'],
+      self.fetched_urls([request_hash], request),
+    )
+    self.assertListEqual(['/_dash-update-component'], self.fetched_urls(['0' * 64], request))
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+
+from opendash.assets.server import open_dash_data
+from unittest import TestCase
+
+
+class Dataset:
+  def __init__(self, path: str, nbytes: int):
+    self.path = path
+    self.nbytes = nbytes
+
+
+class DatasetCacheTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    self.__previous_data_path = os.environ.get('OPEN_DASH_DATA_PATH')
+    os.environ['OPEN_DASH_DATA_PATH'] = self.__directory.name
+    self.__loads = []
+    self.__manifest_writes = 0
+    self.write_manifest('v1')
+
+  def tearDown(self):
+    if self.__previous_data_path is None:
+      del os.environ['OPEN_DASH_DATA_PATH']
+    else:
+      os.environ['OPEN_DASH_DATA_PATH'] = self.__previous_data_path
+    self.__directory.cleanup()
+
+  def write_manifest(self, version: str) -> None:
+    path = os.path.join(self.__directory.name, open_dash_data.MANIFEST_FILE)
+    with open(path, 'w') as file:
+      json.dump({'version': version}, file)
+
+    # The cache re-reads the manifest when its modification time changes, which a fast rewrite may not do.
+    self.__manifest_writes += 1
+    os.utime(path, (self.__manifest_writes, self.__manifest_writes))
+
+  def loader(self, nbytes: int):
+    def load(path: str) -> Dataset:
+      self.__loads.append(os.path.relpath(path, self.__directory.name))
+      return Dataset(path, nbytes)
+
+    return load
+
+  def test_least_recently_used_datasets_are_evicted_over_the_byte_limit(self):
+    cache = open_dash_data.DatasetCache(max_bytes=250)
+
+    cache.get('a.bin', self.loader(100))
+    cache.get('b.bin', self.loader(100))
+    cache.get('a.bin', self.loader(100))
+    cache.get('c.bin', self.loader(100))
+    cache.get('a.bin', self.loader(100))
+    cache.get('b.bin', self.loader(100))
+
+    self.assertListEqual(['a.bin', 'b.bin', 'c.bin', 'b.bin'], self.__loads)
+
+  def test_a_dataset_larger_than_the_limit_is_still_cached_on_its_own(self):
+    cache = open_dash_data.DatasetCache(max_bytes=50)
+
+    first = cache.get('large.bin', self.loader(100))
+
+    self.assertIs(first, cache.get('large.bin', self.loader(100)))
+    self.assertListEqual(['large.bin'], self.__loads)
+
+  def test_datasets_are_reloaded_when_the_manifest_version_changes(self):
+    cache = open_dash_data.DatasetCache(max_bytes=1000)
+    first = cache.get('a.bin', self.loader(100))
+    self.assertEqual('v1', cache.manifest_version())
+
+    self.write_manifest('v2')
+
+    self.assertEqual('v2', cache.manifest_version())
+    self.assertIsNot(first, cache.get('a.bin', self.loader(100)))
+    cache.get('a.bin', self.loader(100))
+    self.assertListEqual(['a.bin', 'a.bin'], self.__loads)
+
+  def test_load_stats_count_loads_hits_and_bytes(self):
+    open_dash_data.load('stats.bin', self.loader(123))
+    open_dash_data.load('stats.bin', self.loader(123))
+    open_dash_data.load('stats.bin', self.loader(123))
+
+    stats = open_dash_data.load_stats()['stats.bin']
+    self.assertEqual((1, 2, 123), (stats['loads'], stats['hits'], stats['bytes']))
+    self.assertGreaterEqual(stats['seconds'], 0)
+    open_dash_data.cache.clear()
+
+  def test_files_without_a_registered_loader_are_rejected(self):
+    with self.assertRaises(ValueError):
+      open_dash_data.DatasetCache(max_bytes=1000).get('notes.txt')
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from opendash.deploy import deploy
+from unittest import TestCase
+
+
+class InMemoryS3Client:
+  """
+  A local stand-in for the subset of the boto3 S3 client interface used by open-dash deploy.
+  """
+  def __init__(self):
+    self.objects: dict[str, dict] = {}
+    self.uploads: list[str] = []
+    self.copies: list[str] = []
+    self.__lock = threading.Lock()
+
+  def head_object(self, *, Bucket: str, Key: str) -> dict:
+    if Key not in self.objects:
+      error = Exception('Not Found')
+      error.response = {'Error': {'Code': '404'}}
+      raise error
+
+    return {'Metadata': self.objects[Key]['Metadata']}
+
+  def upload_file(self, *, Filename: str, Bucket: str, Key: str, ExtraArgs: dict) -> None:
+    with open(Filename, 'rb') as file, self.__lock:
+      self.objects[Key] = {'Body': file.read(), **ExtraArgs}
+      self.uploads.append(Key)
+
+  def copy_object(self, *, Bucket: str, Key: str, CopySource: dict, MetadataDirective: str, **kwargs) -> None:
+    with self.__lock:
+      self.objects[Key] = {'Body': self.objects[CopySource['Key']]['Body'], **kwargs}
+      self.copies.append(Key)
+
+
+class DeployTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    self.__static_path = os.path.join(self.__directory.name, '.open-dash', 'static')
+    os.makedirs(os.path.join(self.__static_path, 'dcc'))
+
+    objects = []
+    for key, content in [
+      ('index.html', b'<html></html>'),
+      ('dcc/async-graph.js', b'graph'),
+      ('dcc/async-graph.v1m1.js', b'graph'),
+    ]:
+      with open(os.path.join(self.__static_path, key), 'wb') as file:
+        file.write(content)
+
+      objects.append({
+        'key': key,
+        'size': len(content),
+        'contentType': 'text/javascript',
+        'cacheControl': 'public, max-age=60',
+        'hash': hashlib.sha256(content).hexdigest(),
+        'source': os.path.join('.open-dash', 'static', key),
+      })
+
+    with open(os.path.join(self.__directory.name, '.open-dash', 'open-dash.output.json'), 'w') as file:
+      json.dump({'cloudFrontConfig': {'defaultRootObject': 'index.html', 'origins': {'s3': {'objects': objects}}}}, file)
+
+  def tearDown(self):
+    self.__directory.cleanup()
+
+  def test_uploads_once_and_copies_aliases(self):
+    client = InMemoryS3Client()
+
+    result = deploy(os.path.join(self.__directory.name, '.open-dash'), bucket='bucket', client=client)
+
+    self.assertEqual(2, len(client.uploads))
+    self.assertEqual(1, len(client.copies))
+    self.assertEqual(b'graph', client.objects['dcc/async-graph.js']['Body'])
+    self.assertEqual(b'graph', client.objects['dcc/async-graph.v1m1.js']['Body'])
+    self.assertEqual('public, max-age=60', client.objects['index.html']['CacheControl'])
+    self.assertEqual(len(b'<html></html>') + len(b'graph'), result.bytes_uploaded)
+
+  def test_dry_run_lists_changed_objects_without_uploading_them(self):
+    client = InMemoryS3Client()
+    output_path = os.path.join(self.__directory.name, '.open-dash')
+
+    result = deploy(output_path, bucket='bucket', client=client, dry_run=True)
+
+    self.assertListEqual([], client.uploads + client.copies)
+    self.assertListEqual([], result.uploaded + result.copied)
+    self.assertListEqual(['dcc/async-graph.js', 'dcc/async-graph.v1m1.js', 'index.html'], result.would_upload)
+    self.assertTrue(result.summary().startswith('Would upload 3 objects, skipped 0 unchanged'))
+
+  def test_skips_unchanged_objects(self):
+    client = InMemoryS3Client()
+    output_path = os.path.join(self.__directory.name, '.open-dash')
+    deploy(output_path, bucket='bucket', client=client)
+
+    result = deploy(output_path, bucket='bucket', client=client)
+
+    self.assertListEqual([], result.uploaded + result.copied)
+    self.assertListEqual(['dcc/async-graph.js', 'dcc/async-graph.v1m1.js', 'index.html'], result.skipped)
+    self.assertEqual(2, len(client.uploads))
+
+  def test_prefix_is_joined_to_keys_as_a_folder(self):
+    client = InMemoryS3Client()
+    output_path = os.path.join(self.__directory.name, '.open-dash')
+    deploy(output_path, bucket='bucket', prefix='site', client=client)
+
+    result = deploy(output_path, bucket='bucket', prefix='/site/', client=client)
+
+    self.assertListEqual(
+      ['site/dcc/async-graph.js', 'site/dcc/async-graph.v1m1.js', 'site/index.html'],
+      sorted(client.objects),
+    )
+    self.assertEqual(3, len(result.skipped))
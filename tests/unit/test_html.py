@@ -0,0 +1,175 @@
+import json
+import shutil
+import subprocess
+
+from opendash.assets import open_dash_html
+from unittest import TestCase, skipUnless
+
+
+DOCUMENT = '''<!DOCTYPE html>
+<html>
+<head>
+<title>Dash</title>
+<link rel="icon" href="/_favicon.ico?v=2.18.2">
+<link rel="stylesheet" href="/assets/style.css?m=1&amp;v=2">
+</head>
+<body>
+<footer>
+<script src="/_dash-component-suites/dash/deps/react@16.v2_18_2m1.min.js"></script>
+<script src="/_dash-component-suites/dash/deps/react-dom@16.v2_18_2m1.min.js"></script>
+<script src="/assets/async-graph.js"></script>
+<script defer src="/assets/analytics.js?id=a&amp;b"></script>
+<script id="_dash-config" type="application/json">{}</script>
+<script src="/_dash-component-suites/dash/dash-renderer/build/dash_renderer.v2_18_2m1.min.js"></script>
+</footer>
+</body>
+</html>
+'''
+
+# Runs a script bundle with a stub document whose currentScript is the bundle's own tag, and prints what it recorded.
+BUNDLE_RUNNER = '''
+const log = [];
+const reported = [];
+globalThis.window = globalThis;
+globalThis.log = log;
+globalThis.setTimeout = function (callback) {
+  try {
+    callback();
+  } catch (error) {
+    reported.push(error.message);
+  }
+};
+globalThis.document = Object.create({ get currentScript() { return { src: 'bundle' }; } });
+document.baseURI = 'https://example.com/app/';
+eval(process.argv[1]);
+console.log(JSON.stringify({
+  log: log,
+  reported: reported,
+  currentScript: document.currentScript.src,
+  helpers: Object.keys(window).filter(function (key) { return key.startsWith('__openDash'); }),
+}));
+'''
+
+
+class ScriptTagsTest(TestCase):
+  def test_external_scripts_are_listed_in_document_order(self):
+    scripts = open_dash_html.script_tags(DOCUMENT)
+
+    self.assertListEqual([
+      '/_dash-component-suites/dash/deps/react@16.v2_18_2m1.min.js',
+      '/_dash-component-suites/dash/deps/react-dom@16.v2_18_2m1.min.js',
+      '/assets/async-graph.js',
+      '/assets/analytics.js?id=a&b',
+      '/_dash-component-suites/dash/dash-renderer/build/dash_renderer.v2_18_2m1.min.js',
+    ], [script.src for script in scripts])
+    self.assertListEqual([True, True, True, False, True], [script.is_plain for script in scripts])
+    self.assertEqual(scripts[0].tag, DOCUMENT[scripts[0].start:scripts[0].end])
+    self.assertTrue(scripts[0].tag.endswith('</script>\n'))
+
+  def test_only_async_and_defer_attributes_make_scripts_non_blocking(self):
+    html = (
+      '<script src="/assets/async-graph.js"></script>'
+      '<script src="/assets/defer.js" data-note="async defer"></script>'
+      '<script async src="/assets/a.js"></script>'
+      '<script src="/assets/b.js" DEFER></script>'
+      "<script type='module' src=\"/assets/c.js\"></script>"
+    )
+
+    self.assertListEqual(
+      [True, True, False, False, False],
+      [script.is_blocking for script in open_dash_html.script_tags(html)],
+    )
+
+  def test_attributes_are_parsed_rather_than_matched_in_the_markup(self):
+    html = (
+      '<script src="/assets/a.js" data-note="crossorigin"></script>'
+      '<script src="/assets/b.js" CrossOrigin></script>'
+    )
+
+    self.assertListEqual(
+      [False, True],
+      ['crossorigin' in script.attributes for script in open_dash_html.script_tags(html)],
+    )
+
+
+class ScriptRunsTest(TestCase):
+  def test_scripts_separated_by_other_markup_start_new_runs(self):
+    scripts = open_dash_html.script_tags(DOCUMENT)
+
+    runs = open_dash_html.script_runs(DOCUMENT, scripts)
+
+    self.assertListEqual([scripts[:4], scripts[4:]], runs)
+
+  def test_replacing_a_run_keeps_the_surrounding_markup(self):
+    scripts = open_dash_html.script_tags(DOCUMENT)
+    run = open_dash_html.script_runs(DOCUMENT, scripts)[0][:2]
+
+    html = open_dash_html.replace_scripts(DOCUMENT, run, '/assets/bundle.js?a=1&b=2')
+
+    self.assertIn('<footer>\n<script src="/assets/bundle.js?a=1&amp;b=2"></script>\n<script src="/assets/async', html)
+    self.assertListEqual(
+      ['/assets/bundle.js?a=1&b=2', *[script.src for script in scripts[2:]]],
+      [script.src for script in open_dash_html.script_tags(html)],
+    )
+
+
+class ConcatenateScriptsTest(TestCase):
+  def test_scripts_are_concatenated_in_order_without_source_maps(self):
+    bundle = open_dash_html.concatenate_scripts([
+      ('/a.js', 'var a = 1\n//# sourceMappingURL=a.js.map'),
+      ('/b.js', '"use strict";\nvar b = a + 1;'),
+    ])
+
+    self.assertLess(bundle.index('__openDashSetCurrentScript("/a.js")'), bundle.index('var a = 1'))
+    self.assertLess(bundle.index('var a = 1'), bundle.index('__openDashSetCurrentScript("/b.js")'))
+    self.assertNotIn('sourceMappingURL', bundle)
+
+  @skipUnless(shutil.which('node'), 'Node.js is not installed')
+  def test_a_throwing_script_does_not_leave_current_script_overridden(self):
+    bundle = open_dash_html.concatenate_scripts([
+      ('/a.js', 'log.push(document.currentScript.src); throw new Error("a failed")'),
+      ('b.js', 'log.push(document.currentScript.src)'),
+    ])
+
+    result = subprocess.run(['node', '-e', BUNDLE_RUNNER, bundle], text=True, capture_output=True, check=True)
+
+    self.assertDictEqual({
+      'log': ['https://example.com/a.js', 'https://example.com/app/b.js'],
+      'reported': ['a failed'],
+      'currentScript': 'bundle',
+      'helpers': [],
+    }, json.loads(result.stdout))
+
+  @skipUnless(shutil.which('node'), 'Node.js is not installed')
+  def test_use_strict_directives_apply_to_their_own_script_only(self):
+    bundle = open_dash_html.concatenate_scripts([
+      ('/a.js', '"use strict";\nlog.push((function () { return this === undefined; })());'),
+      ('/b.js', 'log.push((function () { return this === undefined; })());'),
+    ])
+
+    result = subprocess.run(['node', '-e', BUNDLE_RUNNER, bundle], text=True, capture_output=True, check=True)
+
+    self.assertListEqual([True, False], json.loads(result.stdout)['log'])
+
+
+class LinkHrefsTest(TestCase):
+  def test_hrefs_are_unescaped_and_filtered_by_rel(self):
+    self.assertListEqual(['/assets/style.css?m=1&v=2'], open_dash_html.link_hrefs(DOCUMENT, 'stylesheet'))
+    self.assertListEqual(['/_favicon.ico?v=2.18.2'], open_dash_html.link_hrefs(DOCUMENT, 'icon'))
+    self.assertListEqual([], open_dash_html.link_hrefs(DOCUMENT, 'preload'))
+
+
+class SetTitleTest(TestCase):
+  def test_the_existing_title_is_replaced_with_an_escaped_title(self):
+    html = open_dash_html.set_title(DOCUMENT, 'Sales & <Costs>')
+
+    self.assertIn('<head>\n<title>Sales &amp; &lt;Costs&gt;</title>\n<link', html)
+    self.assertEqual(1, html.count('<title>'))
+
+  def test_a_title_is_added_to_the_head_when_there_is_none(self):
+    html = open_dash_html.set_title('<html><head></head><body></body></html>', 'About')
+
+    self.assertEqual('<html><head><title>About</title>\n</head><body></body></html>', html)
+
+  def test_titles_with_backslashes_are_inserted_literally(self):
+    self.assertIn('<title>C:\\1 \\g&lt;0&gt;</title>', open_dash_html.set_title(DOCUMENT, 'C:\\1 \\g<0>'))
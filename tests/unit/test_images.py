@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+
+from opendash.assets import open_dash_images
+from unittest import TestCase, skipUnless
+
+
+@skipUnless(open_dash_images.Image, 'Pillow is not installed')
+class ImagesTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    self.__assets_path = os.path.join(self.__directory.name, 'assets')
+    self.__cache_path = os.path.join(self.__directory.name, 'cache')
+    os.makedirs(os.path.join(self.__assets_path, 'img'))
+
+    image = open_dash_images.Image.linear_gradient('L').resize((512, 512)).convert('RGB')
+    image.save(os.path.join(self.__assets_path, 'img', 'chart.png'), compress_level=0)
+    with open(os.path.join(self.__assets_path, 'broken.png'), 'wb') as file:
+      file.write(b'not a png')
+
+  def tearDown(self):
+    self.__directory.cleanup()
+
+  def optimize(self) -> dict[str, open_dash_images.ImageResult]:
+    results = open_dash_images.optimize_directory(
+      self.__assets_path,
+      formats=['webp'],
+      quality=80,
+      cache_path=self.__cache_path,
+      workers=2,
+    )
+    return {result.path: result for result in results}
+
+  def test_images_are_recompressed_with_smaller_variants(self):
+    results = self.optimize()
+
+    chart = results[os.path.join('img', 'chart.png')]
+    self.assertLess(chart.size, chart.original_size)
+    self.assertEqual(chart.size, os.path.getsize(os.path.join(self.__assets_path, 'img', 'chart.png')))
+    self.assertEqual([os.path.join('img', 'chart.png.webp')], list(chart.variants))
+    self.assertLess(chart.variants[os.path.join('img', 'chart.png.webp')], chart.size)
+    self.assertFalse(chart.cached)
+
+    self.assertIsNotNone(results['broken.png'].error)
+    self.assertEqual(9, os.path.getsize(os.path.join(self.__assets_path, 'broken.png')))
+
+  def test_unchanged_images_are_copied_from_the_cache(self):
+    original_path = os.path.join(self.__directory.name, 'chart.png')
+    shutil.copyfile(os.path.join(self.__assets_path, 'img', 'chart.png'), original_path)
+    first = self.optimize()[os.path.join('img', 'chart.png')]
+
+    shutil.copyfile(original_path, os.path.join(self.__assets_path, 'img', 'chart.png'))
+    os.remove(os.path.join(self.__assets_path, 'img', 'chart.png.webp'))
+    second = self.optimize()[os.path.join('img', 'chart.png')]
+
+    self.assertTrue(second.cached)
+    self.assertEqual(first.size, second.size)
+    self.assertEqual(first.variants, second.variants)
@@ -0,0 +1,80 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+
+from unittest import TestCase, skipUnless
+
+try:
+  from dash import Dash, dcc, html
+except ImportError:
+  Dash = None
+
+
+SERVER_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'opendash', 'assets', 'server')
+
+APP = '''
+from dash import Dash
+
+def create_app():
+    return Dash(__name__)
+'''
+
+
+@skipUnless(Dash, 'Dash is not installed')
+class PruneIndexTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    with open(os.path.join(self.__directory.name, 'app.py'), 'w') as file:
+      file.write(APP)
+
+    sys.path[:0] = [self.__directory.name, os.path.abspath(SERVER_PATH)]
+    self.__index = importlib.import_module('index')
+    self.__index.PRUNED_COMPONENTS_PATH = os.path.join(self.__directory.name, 'open-dash.components.json')
+
+  def tearDown(self):
+    for name in ['index', 'app']:
+      sys.modules.pop(name, None)
+    sys.path[:] = [path for path in sys.path if path not in [self.__directory.name, os.path.abspath(SERVER_PATH)]]
+    self.__directory.cleanup()
+
+  def app(self, **kwargs) -> Dash:
+    app = Dash(__name__, **kwargs)
+    app.layout = html.Div(dcc.Graph(id='graph'))
+    return app
+
+  def write_pruned(self, paths: list[str]) -> None:
+    with open(self.__index.PRUNED_COMPONENTS_PATH, 'w') as file:
+      json.dump({'pruned': paths}, file)
+
+  def test_pruned_suites_are_removed_from_the_index(self):
+    self.write_pruned(['dash/dash_table/bundle.js', 'dash/dash_table/async-table.js'])
+    app = self.app()
+    unpruned = app.index()
+
+    self.__index.prune_index(app)
+    pruned = app.index()
+
+    self.assertIn('/_dash-component-suites/dash/dash_table/bundle.', unpruned)
+    self.assertNotIn('dash_table/bundle.', pruned)
+    self.assertIn('/_dash-component-suites/dash/dcc/dash_core_components.', pruned)
+    self.assertIn('/_dash-component-suites/dash/dash-renderer/build/dash_renderer.', pruned)
+    self.assertEqual(unpruned.count('<script') - 1, pruned.count('<script'))
+
+  def test_suites_are_matched_under_the_requests_pathname_prefix(self):
+    self.write_pruned(['dash/dash_table/bundle.js'])
+    app = self.app(requests_pathname_prefix='/reports/')
+
+    self.__index.prune_index(app)
+
+    self.assertNotIn('/reports/_dash-component-suites/dash/dash_table/bundle.', app.index())
+    self.assertIn('/reports/_dash-component-suites/dash/dcc/dash_core_components.', app.index())
+
+  def test_the_index_is_unchanged_without_a_pruned_list(self):
+    app = self.app()
+    unpruned = app.index()
+
+    self.__index.prune_index(app)
+
+    self.assertEqual(unpruned, app.index())
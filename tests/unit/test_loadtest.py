@@ -0,0 +1,67 @@
+import json
+
+from opendash.loadtest import WorkloadRequest, navigation_requests, percentile, route_name, run
+from opendash.serve import Response
+from unittest import TestCase
+
+
+class StubDistribution:
+  def __init__(self):
+    self.cold = True
+
+  def dispatch(self, *, method: str, path: str, query: str = '', headers: dict[str, str], body: bytes) -> Response:
+    if path.endswith('_dash-layout'):
+      return Response(status=200, origin='s3')
+
+    cold_start, self.cold = self.cold, False
+    return Response(status=500 if 'fail' in path else 200, origin='default', cold_start=cold_start)
+
+
+class LoadTestTest(TestCase):
+  def test_percentiles_use_the_nearest_rank(self):
+    values = [float(value) for value in range(1, 101)]
+
+    self.assertEqual(50.0, percentile(values, 50))
+    self.assertEqual(95.0, percentile(values, 95))
+    self.assertEqual(99.0, percentile(values, 99))
+    self.assertEqual(0.0, percentile([], 50))
+
+  def test_navigations_cover_pages_without_path_variables(self):
+    requests, skipped = navigation_requests([
+      {'relative_path': '/app/', 'path_template': None},
+      {'relative_path': '/app/reports/none', 'path_template': '/reports/<report_id>'},
+    ], '/app/')
+
+    self.assertListEqual(['/reports/<report_id>'], skipped)
+    self.assertListEqual([
+      'GET /app/',
+      'GET /app/_dash-layout',
+      'GET /app/_dash-dependencies',
+      'POST /app/_dash-update-component (page /app/)',
+    ], [request.route for request in requests])
+    self.assertEqual('/app/', json.loads(requests[-1].body)['inputs'][0]['value'])
+
+    single_page, _ = navigation_requests([], '/')
+    self.assertListEqual(['GET /', 'GET /_dash-layout', 'GET /_dash-dependencies'], [r.route for r in single_page])
+
+  def test_callback_routes_are_named_after_their_output(self):
+    body = json.dumps({'output': 'graph.figure', 'inputs': []}).encode('UTF-8')
+
+    self.assertEqual('POST /_dash-update-component (graph.figure)', route_name('POST', '/_dash-update-component', body))
+    self.assertEqual('GET /about', route_name('GET', '/about', b''))
+
+  def test_run_reports_origins_cold_starts_and_errors_per_route(self):
+    workload = [
+      WorkloadRequest(route='GET /_dash-layout', method='GET', path='/_dash-layout'),
+      WorkloadRequest(route='GET /', method='GET', path='/'),
+      WorkloadRequest(route='GET /fail', method='GET', path='/fail'),
+    ]
+
+    result = run(StubDistribution(), workload, concurrency=2, count=9)
+
+    self.assertEqual(9, result.requests)
+    self.assertAlmostEqual(1 / 3, result.static_ratio)
+    self.assertDictEqual({'s3': 3}, result.routes['GET /_dash-layout'].origins)
+    self.assertEqual(1, sum(stats.cold_starts for stats in result.routes.values()))
+    self.assertEqual(3, result.routes['GET /fail'].errors)
+    self.assertEqual(9, json.loads(result.to_json())['requests'])
@@ -0,0 +1,68 @@
+from opendash.manifest import Manifest, diff
+from unittest import TestCase
+
+
+def s3_object(key: str, hash: str, fingerprinted: bool = False) -> dict:
+  return {'key': key, 'hash': hash, 'size': 1, 'fingerprinted': fingerprinted}
+
+
+def manifest(*objects: dict) -> Manifest:
+  return Manifest(default_root_object='index.html', objects={obj['key']: obj for obj in objects})
+
+
+class ManifestDiffTest(TestCase):
+  def test_unchanged_manifest_has_no_invalidations(self):
+    old = manifest(s3_object('index.html', 'a'), s3_object('_dash-layout', 'b'))
+
+    result = diff(old, old)
+
+    self.assertListEqual([], result.added + result.modified + result.removed)
+    self.assertListEqual([], result.invalidation_paths)
+
+  def test_fingerprinted_and_added_objects_are_not_invalidated(self):
+    old = manifest(
+      s3_object('index.html', 'a'),
+      s3_object('_dash-component-suites/dash/dcc/dcc.v1m1.js', 'b', fingerprinted=True),
+    )
+    new = manifest(
+      s3_object('index.html', 'c'),
+      s3_object('_dash-component-suites/dash/dcc/dcc.v1m2.js', 'd', fingerprinted=True),
+    )
+
+    result = diff(old, new)
+
+    self.assertListEqual(['_dash-component-suites/dash/dcc/dcc.v1m2.js'], result.added)
+    self.assertListEqual(['_dash-component-suites/dash/dcc/dcc.v1m1.js'], result.removed)
+    self.assertListEqual(['index.html'], result.modified)
+    self.assertListEqual(['/', '/index.html'], result.invalidation_paths)
+
+  def test_fully_changed_directory_collapses_to_wildcard(self):
+    old = manifest(
+      s3_object('_dash-update-component/index', 'a'),
+      s3_object('_dash-update-component/about', 'b'),
+      s3_object('_dash-layout', 'c'),
+    )
+    new = manifest(
+      s3_object('_dash-update-component/index', 'd'),
+      s3_object('_dash-update-component/about', 'e'),
+      s3_object('_dash-layout', 'c'),
+    )
+
+    self.assertListEqual(['/_dash-update-component/*'], diff(old, new).invalidation_paths)
+
+  def test_partially_changed_directory_lists_each_key(self):
+    old = manifest(
+      s3_object('_dash-update-component/index', 'a'),
+      s3_object('_dash-update-component/about', 'b'),
+      s3_object('_dash-update-component/404', 'c'),
+    )
+    new = manifest(
+      s3_object('_dash-update-component/index', 'd'),
+      s3_object('_dash-update-component/about', 'e'),
+      s3_object('_dash-update-component/404', 'c'),
+    )
+
+    self.assertListEqual(
+      ['/_dash-update-component/about', '/_dash-update-component/index'],
+      diff(old, new).invalidation_paths,
+    )
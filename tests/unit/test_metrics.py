@@ -0,0 +1,54 @@
+import contextlib
+import io
+import json
+
+from opendash.assets.server import open_dash_metrics
+from unittest import TestCase
+
+
+def event(path: str, body: str = '') -> dict:
+  return {
+    'requestContext': {'requestId': 'request-1', 'http': {'method': 'POST' if body else 'GET', 'path': path}},
+    'body': body,
+    'isBase64Encoded': False,
+  }
+
+
+class MetricsTest(TestCase):
+  def setUp(self):
+    self.__settings = (open_dash_metrics.ENABLED, open_dash_metrics.SAMPLE_RATE, open_dash_metrics._cold)
+    open_dash_metrics.ENABLED, open_dash_metrics._cold = True, True
+
+  def tearDown(self):
+    open_dash_metrics.ENABLED, open_dash_metrics.SAMPLE_RATE, open_dash_metrics._cold = self.__settings
+
+  def test_requests_are_written_as_embedded_metric_format_lines(self):
+    body = json.dumps({'output': 'graph.figure', 'inputs': [{'id': 'dropdown', 'property': 'value', 'value': 'a'}]})
+    metrics = open_dash_metrics.start(event('/_dash-update-component', body))
+    metrics.time('WsgiDuration', lambda: None)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      metrics.emit({'statusCode': 200, 'body': '{"response": {}}'})
+
+    line = json.loads(output.getvalue())
+    definition = line['_aws']['CloudWatchMetrics'][0]
+    self.assertEqual('OpenDash', definition['Namespace'])
+    self.assertListEqual([['Callback']], definition['Dimensions'])
+    self.assertIn({'Name': 'WsgiDuration', 'Unit': 'Milliseconds'}, definition['Metrics'])
+    self.assertEqual(('graph.figure', 1, 16, 200), (
+      line['Callback'],
+      line['ColdStart'],
+      line['ResponseBytes'],
+      line['StatusCode'],
+    ))
+
+  def test_warm_requests_are_sampled_and_cold_starts_always_recorded(self):
+    open_dash_metrics.SAMPLE_RATE = 0
+
+    self.assertIsNotNone(open_dash_metrics.start(event('/')))
+    self.assertIsNone(open_dash_metrics.start(event('/')))
+
+    open_dash_metrics.ENABLED = False
+    open_dash_metrics.SAMPLE_RATE = 1
+    self.assertIsNone(open_dash_metrics.start(event('/')))
@@ -0,0 +1,58 @@
+from opendash.assets.open_dash_prerender import apply_updates, render
+from unittest import TestCase
+
+
+def component(namespace: str, type: str, **props) -> dict:
+  return {'namespace': namespace, 'type': type, 'props': props}
+
+
+def html_component(type: str, **props) -> dict:
+  return component('dash_html_components', type, **props)
+
+
+class PrerenderTest(TestCase):
+  def test_html_components_render_as_elements(self):
+    layout = html_component(
+      'Div',
+      id='root',
+      className='page',
+      n_clicks=0,
+      style={'marginTop': 10, 'opacity': 0.5},
+      children=[html_component('H1', children='<Sales>'), html_component('Br'), 42],
+    )
+
+    self.assertEqual(
+      '<div id="root" class="page" style="margin-top: 10px; opacity: 0.5"><h1>&lt;Sales&gt;</h1><br>42</div>',
+      render(layout),
+    )
+
+  def test_other_components_render_as_placeholders_with_children(self):
+    layout = component(
+      'dash_bootstrap_components',
+      'Container',
+      className='app',
+      children=[component('dash_core_components', 'Graph', id='graph', figure={})],
+    )
+
+    self.assertEqual(
+      '<div class="_open-dash-placeholder app" data-dash-type="dash_bootstrap_components.Container">'
+      '<div id="graph" class="_open-dash-placeholder" data-dash-type="dash_core_components.Graph" '
+      'style="height: 450px"></div></div>',
+      render(layout),
+    )
+
+  def test_scripts_and_pattern_matching_ids_are_not_rendered(self):
+    layout = html_component(
+      'Div',
+      id={'type': 'card', 'index': 1},
+      children=[html_component('Script', children='alert(1)')],
+    )
+
+    self.assertEqual('<div></div>', render(layout))
+
+  def test_page_content_is_applied_by_id(self):
+    layout = html_component('Div', children=[html_component('Div', id='_pages_content', children=None)])
+
+    apply_updates(layout, {'_pages_content': {'children': html_component('P', children='About')}})
+
+    self.assertEqual('<div><div id="_pages_content"><p>About</p></div></div>', render(layout))
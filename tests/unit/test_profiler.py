@@ -0,0 +1,60 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from opendash.assets.server import open_dash_profiler
+from unittest import TestCase
+
+
+SETTINGS = ['ENABLED', 'SECRET', 'SAMPLE_RATE', 'THRESHOLD_MS', 'MODE', 'INTERVAL_MS', 'DIRECTORY']
+
+
+def event(headers: dict[str, str]) -> dict:
+  return {'headers': headers, 'requestContext': {'http': {'method': 'POST', 'path': '/_dash-update-component'}}}
+
+
+def slow_callback() -> dict:
+  time.sleep(0.05)
+  return {'statusCode': 200, 'headers': {}}
+
+
+class ProfilerTest(TestCase):
+  def setUp(self):
+    self.__settings = {name: getattr(open_dash_profiler, name) for name in SETTINGS}
+    self.__directory = tempfile.TemporaryDirectory()
+    open_dash_profiler.DIRECTORY = self.__directory.name
+    open_dash_profiler.INTERVAL_MS = 1
+
+  def tearDown(self):
+    for name, value in self.__settings.items():
+      setattr(open_dash_profiler, name, value)
+    self.__directory.cleanup()
+
+  def test_requests_with_the_secret_are_profiled(self):
+    open_dash_profiler.SECRET = 'secret'
+    headers = {'x-open-dash-profile': 'secret'}
+    profile = open_dash_profiler.start(event(headers))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+      response = profile.run(slow_callback)
+
+    self.assertNotIn('x-open-dash-profile', headers)
+    self.assertEqual(profile.id, response['headers']['X-Open-Dash-Profile-Id'])
+    with open(os.path.join(self.__directory.name, f'{profile.id}.folded'), 'r') as file:
+      self.assertIn('slow_callback (test_profiler.py:', file.read())
+
+    self.assertIsNone(open_dash_profiler.start(event({'x-open-dash-profile': 'guess'})))
+
+  def test_sampled_requests_under_the_threshold_are_discarded(self):
+    open_dash_profiler.ENABLED = True
+    open_dash_profiler.MODE = 'cprofile'
+    open_dash_profiler.THRESHOLD_MS = 10000
+    response = open_dash_profiler.start(event({})).run(slow_callback)
+
+    self.assertNotIn('X-Open-Dash-Profile-Id', response['headers'])
+    self.assertListEqual([], os.listdir(self.__directory.name))
+
+    open_dash_profiler.ENABLED = False
+    self.assertIsNone(open_dash_profiler.start(event({})))
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from opendash.assets.server import open_dash_queue
+from unittest import TestCase
+
+
+class QueueTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    self.__queue = open_dash_queue.queue_from_url(f'file:{os.path.join(self.__directory.name, "queue")}')
+    self.__store = open_dash_queue.store_from_url(f'file:{os.path.join(self.__directory.name, "store")}')
+    self.__discarded = []
+
+  def tearDown(self):
+    self.__directory.cleanup()
+
+  def jobs(self, run) -> open_dash_queue.Jobs:
+    return open_dash_queue.Jobs(self.__queue, self.__store, run, lambda message: self.__discarded.append(message))
+
+  def test_queued_jobs_are_run_by_a_worker_and_forgotten_once_read(self):
+    def run(message: dict) -> None:
+      self.assertEqual(open_dash_queue.RUNNING, jobs.status(message['job']))
+      self.__store.set(message['key'], f"{message['args'][0] * 2}")
+
+    jobs = self.jobs(run)
+    job = jobs.submit({'key': 'result', 'args': [21]})
+    self.assertEqual(open_dash_queue.QUEUED, jobs.status(job))
+    self.assertIsNone(self.__store.get('result'))
+
+    worker = self.jobs(run)
+    messages = list(self.__queue.receive())
+    self.assertEqual([job], [message['job'] for message in messages])
+    self.assertEqual([], list(self.__queue.receive()))
+    self.assertTrue(worker.run(messages[0]))
+
+    self.assertEqual('42', self.__store.get('result'))
+    self.assertEqual(open_dash_queue.DONE, jobs.status(job))
+    jobs.terminate(job)
+    self.assertIsNone(jobs.status(job))
+
+  def test_terminated_jobs_are_skipped_or_discarded(self):
+    jobs = self.jobs(lambda message: jobs.terminate(message['job']))
+
+    queued = jobs.submit({'key': 'queued'})
+    jobs.terminate(queued)
+    running = jobs.submit({'key': 'running'})
+
+    ran = {message['key']: jobs.run(message) for message in self.__queue.receive()}
+    self.assertEqual({'queued': False, 'running': True}, ran)
+    self.assertEqual(['running'], [message['key'] for message in self.__discarded])
+    self.assertEqual([None, None], [jobs.status(queued), jobs.status(running)])
+    self.assertEqual([], os.listdir(os.path.join(self.__directory.name, 'store')))
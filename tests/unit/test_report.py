@@ -0,0 +1,59 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from opendash.config import Budgets
+from opendash.report import check, measure
+from unittest import TestCase
+
+
+class SizeReportTest(TestCase):
+  def setUp(self):
+    self.__directory = tempfile.TemporaryDirectory()
+    self.__open_dash_path = os.path.join(self.__directory.name, '.open-dash')
+    server_functions_path = os.path.join(self.__open_dash_path, 'server-functions', 'default')
+    os.makedirs(os.path.join(server_functions_path, 'pages'))
+    for path, size in [('app.py', 100), (os.path.join('pages', 'about.py'), 50)]:
+      with open(os.path.join(server_functions_path, path), 'wb') as file:
+        file.write(b'x' * size)
+
+    objects = []
+    for key, content in [
+      ('app/index.html', b'<html></html>'),
+      ('app/_dash-layout', b'{"props": {}}'),
+      ('app/_dash-update-component/about', b'{"multi": true}'),
+      ('app/_dash-update-component/_callbacks/abc', b'{"multi": true, "response": {}}'),
+      ('app/_dash-component-suites/dash/dcc/async-graph.js', b'graph'),
+      ('app/_dash-component-suites/dash/dcc/async-graph.v1m1.js', b'graph'),
+      ('app/_dash-component-suites/dash/dcc/async-graph.js.map', b'{"mappings": ""}'),
+      ('app/_dash-component-suites/dash_bootstrap_components/_components/dbc.min.js', b'bootstrap'),
+    ]:
+      objects.append({'key': key, 'size': len(content), 'hash': hashlib.sha256(content).hexdigest()})
+
+    with open(os.path.join(self.__open_dash_path, 'open-dash.output.json'), 'w') as file:
+      json.dump({'cloudFrontConfig': {'origins': {'s3': {'originPathPrefix': 'app', 'objects': objects}}}}, file)
+
+  def tearDown(self):
+    self.__directory.cleanup()
+
+  def test_sizes_are_broken_down_by_namespace_page_and_file(self):
+    report = measure(self.__open_dash_path)
+
+    self.assertEqual(107, report.static_bytes)
+    self.assertDictEqual({'dash/dcc': 5, 'dash_bootstrap_components': 9}, report.suites)
+    self.assertDictEqual({'about': 15}, report.pages)
+    self.assertEqual(13, report.layout_bytes)
+    self.assertDictEqual({'app.py': 100, 'pages': 50}, report.server_function)
+    self.assertEqual(150, report.server_function_bytes)
+
+  def test_budgets_report_every_exceeding_subject(self):
+    report = measure(self.__open_dash_path)
+
+    violations = check(report, Budgets(suite_bytes=6, layout_bytes=13, server_function_bytes=149))
+
+    self.assertListEqual(
+      [('suite-bytes', 'dash_bootstrap_components', 9), ('server-function-bytes', '', 150)],
+      [(violation.budget, violation.subject, violation.actual) for violation in violations],
+    )
+    self.assertListEqual([], check(report, Budgets()))
@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from opendash.serve import Distribution, pattern_regex
+from unittest import TestCase
+
+
+HANDLER = '''
+def handler(event, context):
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json'},
+        'body': '{"path": "%s", "method": "%s"}' % (event['rawPath'], event['requestContext']['http']['method']),
+    }
+'''
+
+PAGES_OUTPUT = '.._pages_content.children..._pages_store.data..'
+
+
+def pages_request(pathname: str, search: str = '') -> bytes:
+  return json.dumps({
+    'output': PAGES_OUTPUT,
+    'inputs': [
+      {'id': '_pages_location', 'property': 'pathname', 'value': pathname},
+      {'id': '_pages_location', 'property': 'search', 'value': search},
+    ],
+  }).encode('UTF-8')
+
+
+class DistributionTest(TestCase):
+  def setUp(self):
+    self.__cwd = os.getcwd()
+    self.__directory = tempfile.TemporaryDirectory()
+    open_dash_path = os.path.join(self.__directory.name, '.open-dash')
+    function_path = os.path.join(open_dash_path, 'server-functions', 'default')
+    os.makedirs(function_path)
+    with open(os.path.join(function_path, 'index.py'), 'w') as file:
+      file.write(HANDLER)
+
+    objects = []
+    for key, content, content_type in [
+      ('index.html', b'<html>' + b' ' * 2000 + b'</html>', 'text/html'),
+      ('_dash-layout', b'{}', 'application/json'),
+      ('_dash-update-component/about', b'{"multi": true}', 'application/json'),
+    ]:
+      source = os.path.join('.open-dash', 'static', *key.split('/'))
+      os.makedirs(os.path.dirname(os.path.join(self.__directory.name, source)), exist_ok=True)
+      with open(os.path.join(self.__directory.name, source), 'wb') as file:
+        file.write(content)
+
+      objects.append({
+        'key': key,
+        'source': source,
+        'size': len(content),
+        'contentType': content_type,
+        'cacheControl': 'public, max-age=0',
+        'hash': hashlib.sha256(content).hexdigest(),
+      })
+
+    with open(os.path.join(open_dash_path, 'open-dash.output.json'), 'w') as file:
+      json.dump({'cloudFrontConfig': {
+        'defaultRootObject': 'index.html',
+        'behaviors': [
+          {'origin': 's3', 'pattern': '_dash-update-component'},
+          {'origin': 's3', 'pattern': '_dash-layout'},
+          {'origin': 's3', 'pattern': 'index.html'},
+          {'origin': 'default', 'pattern': '*'},
+        ],
+        'origins': {
+          's3': {'type': 's3', 'originPathPrefix': '', 'objects': objects},
+          'default': {'type': 'function', 'handler': 'index.handler', 'bundle': '.open-dash/server-functions/default'},
+        },
+      }}, file)
+
+    self.__distribution = Distribution(open_dash_path)
+
+  def tearDown(self):
+    os.chdir(self.__cwd)
+    sys.modules.pop('index', None)
+    sys.path[:] = [path for path in sys.path if not path.startswith(self.__directory.name)]
+    self.__directory.cleanup()
+
+  def test_s3_objects_are_served_with_their_metadata(self):
+    response = self.__distribution.dispatch(method='GET', path='/', headers={'accept-encoding': 'gzip'}, body=b'')
+
+    headers = dict(response.headers)
+    self.assertEqual(('s3', 200), (response.origin, response.status))
+    self.assertEqual('text/html', headers['Content-Type'])
+    self.assertEqual('public, max-age=0', headers['Cache-Control'])
+    self.assertEqual('gzip', headers['Content-Encoding'])
+    self.assertTrue(gzip.decompress(response.body).startswith(b'<html>'))
+
+    revalidated = self.__distribution.dispatch(
+      method='GET',
+      path='/index.html',
+      headers={'if-none-match': headers['ETag']},
+      body=b'',
+    )
+    self.assertEqual(304, revalidated.status)
+
+  def test_page_requests_are_answered_from_exported_payloads(self):
+    response = self.__distribution.dispatch(
+      method='POST',
+      path='/_dash-update-component',
+      headers={},
+      body=pages_request('/about'),
+    )
+
+    self.assertEqual(('s3', b'{"multi": true}'), (response.origin, response.body))
+
+  def test_other_requests_fall_through_to_the_function(self):
+    with_search = self.__distribution.dispatch(
+      method='POST',
+      path='/_dash-update-component',
+      headers={},
+      body=pages_request('/about', '?tab=1'),
+    )
+    unmatched = self.__distribution.dispatch(method='GET', path='/reports/1', headers={}, body=b'')
+
+    self.assertEqual(('default', True), (with_search.origin, with_search.cold_start))
+    self.assertEqual(('default', False), (unmatched.origin, unmatched.cold_start))
+    self.assertDictEqual({'path': '/reports/1', 'method': 'GET'}, json.loads(unmatched.body))
+
+  def test_patterns_match_like_cloud_front(self):
+    self.assertTrue(pattern_regex('_dash-component-suites/*').match('_dash-component-suites/dash/dcc/dcc.js'))
+    self.assertTrue(pattern_regex('assets/logo.???').match('assets/logo.png'))
+    self.assertFalse(pattern_regex('_dash-layout').match('_dash-layout/extra'))
+    self.assertFalse(pattern_regex('About').match('about'))
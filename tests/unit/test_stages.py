@@ -0,0 +1,54 @@
+import threading
+
+from opendash.assets.open_dash_stages import Stage, order, run_stages
+from unittest import TestCase
+
+
+class StagesTest(TestCase):
+  def test_independent_stages_overlap_and_dependencies_wait(self):
+    events = []
+    both_running = threading.Barrier(2, timeout=5)
+
+    def stage(name: str, wait: bool = False):
+      def run() -> None:
+        events.append((name, threading.current_thread()))
+        if wait:
+          both_running.wait()
+      return run
+
+    timings = run_stages([
+      Stage(name='source', run=stage('source')),
+      Stage(name='install', run=stage('install', wait=True), after=['source']),
+      Stage(name='data', run=stage('data', wait=True), main_thread=True),
+      Stage(name='assets', run=stage('assets'), after=['install', 'data']),
+    ], max_workers=2, group='bundle')
+
+    by_name = {timing.name: timing for timing in timings}
+    self.assertEqual({'source', 'install', 'data', 'assets'}, set(by_name))
+    self.assertLess(by_name['data'].start, by_name['install'].end)
+    self.assertLessEqual(by_name['source'].end, by_name['install'].start)
+    self.assertLessEqual(max(by_name['install'].end, by_name['data'].end), by_name['assets'].start)
+    self.assertEqual('assets', events[-1][0])
+    self.assertIn(('data', threading.current_thread()), events)
+
+  def test_failures_stop_later_stages(self):
+    ran = []
+
+    def fail() -> None:
+      raise SystemExit(1)
+
+    with self.assertRaises(SystemExit):
+      run_stages([
+        Stage(name='install', run=fail),
+        Stage(name='data', run=lambda: ran.append('data')),
+        Stage(name='assets', run=lambda: ran.append('assets'), after=['install']),
+      ], max_workers=1, group='bundle')
+
+    self.assertEqual([], ran)
+
+  def test_invalid_graphs_are_rejected(self):
+    with self.assertRaises(ValueError):
+      order([Stage(name='a', run=print, after=['missing'])])
+
+    with self.assertRaises(ValueError):
+      order([Stage(name='a', run=print, after=['b']), Stage(name='b', run=print, after=['a'])])
@@ -0,0 +1,61 @@
+import base64
+import json
+
+from opendash.assets.server import open_dash_typed_arrays
+from unittest import TestCase, skipUnless
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+
+def decode(spec: dict) -> list:
+  array = numpy.frombuffer(base64.b64decode(spec['bdata']), f"<{spec['dtype']}")
+  if 'shape' in spec:
+    array = array.reshape([int(size) for size in spec['shape'].split(',')])
+  return array.tolist()
+
+
+@skipUnless(numpy, 'NumPy is not installed')
+class TypedArraysTest(TestCase):
+  def test_numeric_trace_arrays_are_encoded_without_changing_values(self):
+    trace = {
+      'type': 'heatmap',
+      'x': list(range(-100, 100)),
+      'y': [index * 0.1 for index in range(200)],
+      'z': [[row * 1000 + column for column in range(4)] for row in range(50)],
+      'marker': {'color': [None, 1] * 100, 'size': [70000] * 200},
+      'text': ['label'] * 200,
+      'selected': [True] * 200,
+      'domain': {'x': [0, 1]},
+    }
+    layout = {'xaxis': {'tickvals': list(range(200))}}
+    body = json.dumps({'props': {'figure': {'data': [trace], 'layout': layout}}}).encode('UTF-8')
+
+    encoded = json.loads(open_dash_typed_arrays.encode_payload(body, 100))
+    figure = encoded['props']['figure']
+    trace = figure['data'][0]
+
+    self.assertEqual(['i1', 'f8', 'u2', 'f8', 'i4'], [
+      trace['x']['dtype'], trace['y']['dtype'], trace['z']['dtype'], trace['marker']['color']['dtype'],
+      trace['marker']['size']['dtype'],
+    ])
+    self.assertEqual(list(range(-100, 100)), decode(trace['x']))
+    self.assertEqual([index * 0.1 for index in range(200)], decode(trace['y']))
+    self.assertEqual('50,4', trace['z']['shape'])
+    self.assertEqual([[row * 1000 + column for column in range(4)] for row in range(50)], decode(trace['z']))
+    self.assertTrue(numpy.isnan(decode(trace['marker']['color'])[0]))
+
+    self.assertEqual(['label'] * 200, trace['text'])
+    self.assertEqual([True] * 200, trace['selected'])
+    self.assertEqual([0, 1], trace['domain']['x'])
+    self.assertEqual(list(range(200)), figure['layout']['xaxis']['tickvals'])
+
+  def test_payloads_without_arrays_to_encode_are_unchanged(self):
+    for payload in [
+      {'props': {'children': list(range(1000))}},
+      {'multi': True, 'response': {'graph': {'figure': {'data': [{'x': [1, 2, 3]}]}}}},
+    ]:
+      body = json.dumps(payload).encode('UTF-8')
+      self.assertIs(body, open_dash_typed_arrays.encode_payload(body, 100))
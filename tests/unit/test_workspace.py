@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from opendash.config import Workspace
+from opendash.workspace import AppResult, PipSlot, WorkspaceResult
+from unittest import TestCase
+
+
+class WorkspaceTest(TestCase):
+  def test_paths_are_relative_to_the_workspace_file(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, 'open-dash.workspace.json')
+      with open(path, 'w') as file:
+        json.dump({'configs': ['apps/sales/open-dash.config.json'], 'workers': 4, 'pip-cache-dir': '.cache/pip'}, file)
+
+      workspace = Workspace.from_path(path)
+
+    self.assertListEqual([os.path.join(directory, 'apps/sales/open-dash.config.json')], workspace.config_paths)
+    self.assertEqual(4, workspace.workers)
+    self.assertEqual(1, workspace.pip_workers)
+    self.assertEqual(os.path.join(directory, '.cache/pip'), workspace.pip_cache_dir)
+
+  def test_pip_slots_bound_installs_and_serialize_shared_environments(self):
+    semaphore = threading.Semaphore(2)
+    environment_locks = {'shared': threading.Lock(), 'other': threading.Lock()}
+    active: dict[str, int] = {'total': 0, 'shared': 0}
+    peaks: dict[str, int] = {'total': 0, 'shared': 0}
+    lock = threading.Lock()
+
+    def install(environment: str) -> None:
+      with PipSlot(semaphore, environment_locks[environment]):
+        with lock:
+          active['total'] += 1
+          active['shared'] += environment == 'shared'
+          peaks['total'] = max(peaks['total'], active['total'])
+          peaks['shared'] = max(peaks['shared'], active['shared'])
+        time.sleep(0.02)
+        with lock:
+          active['total'] -= 1
+          active['shared'] -= environment == 'shared'
+
+    threads = [threading.Thread(target=install, args=(environment,)) for environment in ['shared', 'other'] * 3]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(2, peaks['total'])
+    self.assertEqual(1, peaks['shared'])
+
+  def test_summary_lists_each_app_with_its_phases(self):
+    result = WorkspaceResult(seconds=12.0, apps=[
+      AppResult(name='sales', config_path='a', succeeded=True, seconds=10.0, timings={'install': 8.0, 'total': 10.0}),
+      AppResult(name='ops', config_path='b', succeeded=False, seconds=1.0),
+    ])
+
+    self.assertFalse(result.succeeded)
+    self.assertEqual(
+      'Bundled 1 of 2 apps in 12.0s.\n  sales: ok in 10.0s (install 8.0s)\n  ops: FAILED in 1.0s',
+      result.summary(),
+    )